@@ -2,6 +2,7 @@ import pygame
 from typing import Optional, List, Tuple
 from dataclasses import replace
 # Importaciones del Model
+from model.game.events import EventLog, print_events
 from model.game.gamestate import GameState
 from model.game.move import Move, ActionType, Position
 
@@ -33,6 +34,8 @@ class GameController:
         self.game_state: GameState = initial_game_state
         self.view = GameView(self.screen)
         self.ai_controller = ai_controller
+        # Eventos de combate de las jugadas del jugador (se muestran también en consola)
+        self.event_log = EventLog(forward=print_events)
         
         self.running = True
         self.round_number = 1  # Contador de rondas
@@ -694,10 +697,9 @@ class GameController:
 
         # Aplicar el movimiento, pero comprobar si tuvo efecto
         try:
-            prev_state = self.game_state
-            new_state = self.game_state.apply_move(move)
+            new_state, changed = self.game_state.try_move(move, self.event_log)
 
-            if new_state == prev_state:
+            if not changed:
                 # El movimiento no se aplicó (válido pero sin efecto o inválido)
                 print(f"Invocación de {card.name} en slot {field_slot} no se aplicó (movimiento inválido o sin efecto).")
                 return
@@ -731,7 +733,7 @@ class GameController:
         )
         
         try:
-            self.game_state = self.game_state.apply_move(move)
+            self.game_state = self.game_state.apply_move(move, self.event_log)
             pos_name = "Ataque" if new_position == Position.FACE_UP_ATK else "Defensa"
             print(f"Carta en slot {field_index} cambió a posición {pos_name}.")
         except Exception as e:
@@ -760,7 +762,7 @@ class GameController:
         
         try:
             # Aplicamos el movimiento al estado
-            self.game_state = self.game_state.apply_move(pass_move)
+            self.game_state = self.game_state.apply_move(pass_move, self.event_log)
             print(f"Fase avanzada a: {next_phase}")
             
             # Si entramos en Main Phase, robar una carta automáticamente (excepto en el primer turno)
@@ -1163,7 +1165,7 @@ class GameController:
         )
         
         try:
-            new_state = self.game_state.apply_move(move)
+            new_state = self.game_state.apply_move(move, self.event_log)
             self.game_state = new_state
             
             if target_index == -1:
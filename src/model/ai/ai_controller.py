@@ -1,6 +1,14 @@
+import random
+from typing import List, Optional, Union
+from model.game.events import EventSink, print_events
 from model.game.gamestate import GameState
 from model.game.move import Move, ActionType
-from model.ai.minimax import find_best_move
+from model.ai.minimax import search
+from model.ai.beam import beam_search, should_use_beam
+from model.ai.learned_eval import LearnedEvaluator
+from model.ai.move_ordering import lethal_attack
+from model.ai.profiles import DifficultyProfile, get_profile
+from model.ai.time_manager import TimeManager
 
 class AIController:
     """
@@ -8,10 +16,109 @@ class AIController:
     utilizando el algoritmo MiniMax.
     """
 
-    def __init__(self, depth: int = 3):
-        """Inicializa el controlador con la profundidad de búsqueda para MiniMax."""
-        self.depth = depth
-        print(f"AIController real inicializado con profundidad {depth}.")
+    def __init__(
+        self,
+        depth: int = 3,
+        profile: Optional[Union[str, DifficultyProfile]] = None,
+        turn_time_ceiling: Optional[float] = None,
+        seed: Optional[int] = None,
+        log_stats: bool = False,
+        evaluator: Optional[LearnedEvaluator] = None,
+        events: Optional[EventSink] = print_events
+    ):
+        """
+        Inicializa el controlador.
+
+        Args:
+            depth: Profundidad fija de MiniMax (sólo se usa si no hay perfil).
+            profile: Perfil de dificultad (nombre o instancia). Si se indica, cada
+                decisión recibe una parte del presupuesto de tiempo del turno.
+            turn_time_ceiling: Techo duro (segundos) del turno de la IA, por despliegue.
+            seed: Semilla para la elección aleatoria entre jugadas candidatas.
+            log_stats: Si es True, imprime las estadísticas de búsqueda de cada decisión.
+            evaluator: Evaluador aprendido que sustituye a GameState.evaluate en la búsqueda.
+            events: Sumidero de los eventos de combate de las jugadas que se aplican
+                (por defecto se imprimen; None = silencio). La búsqueda nunca los emite.
+        """
+        if isinstance(profile, str):
+            profile = get_profile(profile)
+        self.profile: Optional[DifficultyProfile] = profile
+        self.depth = profile.max_depth if profile else depth
+        self.time_manager: Optional[TimeManager] = None
+        if profile:
+            self.time_manager = TimeManager(profile.turn_time_budget, hard_ceiling=turn_time_ceiling)
+        self.rng = random.Random(seed)
+        self.log_stats = log_stats
+        self.evaluator = evaluator
+        self.events = events
+        # Argumentos de evaluación para search() (vacíos = heurística fija)
+        self._eval_kwargs = {}
+        if evaluator is not None:
+            self._eval_kwargs = {
+                'evaluate': evaluator.evaluate,
+                'batch_evaluate': evaluator.evaluate_batch,
+                'caches': evaluator.extractor.cache_counters()
+            }
+        if profile:
+            print(f"AIController real inicializado con perfil '{profile.name}' "
+                  f"({self.time_manager.turn_budget:.2f}s por turno, profundidad máx. {self.depth}).")
+        else:
+            print(f"AIController real inicializado con profundidad {depth}.")
+
+    def _choose_move(self, state: GameState, moves: List[Move]) -> Optional[Move]:
+        """
+        Elige el movimiento para una decisión entre `moves` (las jugadas
+        distintas del estado, que se pasan tal cual a la búsqueda). Sin perfil
+        se usa MiniMax a profundidad fija; con perfil, la búsqueda (MiniMax o
+        en haz) se limita al tiempo asignado por el TimeManager y puede elegir
+        una alternativa según la aleatoriedad.
+        """
+        if self.profile is None:
+            result = search(
+                state, depth=self.depth, collect_stats=self.log_stats, root_moves=moves, **self._eval_kwargs
+            )
+            if self.log_stats:
+                print(f"IA: [stats] {result.stats.summary()}")
+            return result.best_move
+
+        profile = self.profile
+        # El presupuesto de la decisión vale para los dos motores
+        branching = len(moves)
+        time_limit = self.time_manager.allocate(branching)
+        use_beam = profile.engine == 'beam' or should_use_beam(branching, profile.beam_branching_threshold)
+        if use_beam:
+            result = beam_search(
+                state,
+                depth=profile.max_depth,
+                width=profile.beam_width,
+                multi_pv=profile.multi_pv,
+                score=self.evaluator.evaluate if self.evaluator else None,
+                score_batch=self.evaluator.evaluate_batch if self.evaluator else None,
+                time_limit=time_limit,
+                max_nodes=profile.max_nodes,
+                root_moves=moves
+            )
+        else:
+            result = search(
+                state,
+                depth=profile.max_depth,
+                multi_pv=profile.multi_pv,
+                time_limit=time_limit,
+                max_nodes=profile.max_nodes,
+                collect_stats=self.log_stats,
+                order_moves=profile.order_moves,
+                staged_moves=profile.staged_moves,
+                root_moves=moves,
+                **self._eval_kwargs
+            )
+        print(f"IA: Búsqueda ({'haz' if use_beam else 'MiniMax'}) a profundidad {result.depth} ({result.nodes} nodos, {result.elapsed:.3f}s).")
+        if self.log_stats:
+            print(f"IA: [stats] {result.stats.summary()}")
+
+        alternatives = [line for line in result.lines[1:] if line.score != -float('inf')]
+        if alternatives and self.rng.random() < profile.randomness:
+            return self.rng.choice(alternatives).move
+        return result.best_move
 
     def execute_ai_turn(self, initial_state: GameState) -> GameState:
         """
@@ -32,6 +139,9 @@ class AIController:
             print("ERROR: AIController llamado cuando no es el turno de la IA.")
             return current_state
 
+        if self.time_manager:
+            self.time_manager.start_turn()
+
         print(f"\n=== TURNO DE LA IA (Ronda/Turno) ===")
         print(f"IA LP: {current_state.ai_player.life_points} | Jugador LP: {current_state.player.life_points}")
         print(f"Fase actual: {current_state.phase}")
@@ -54,7 +164,7 @@ class AIController:
                 None
             )
             if draw_pass_move:
-                current_state = current_state.apply_move(draw_pass_move)
+                current_state = current_state.apply_move(draw_pass_move, self.events)
                 print("IA: Pasó a Main Phase.")
             else:
                 print("ERROR: No se encontró movimiento de PASS en Draw Phase.")
@@ -67,36 +177,35 @@ class AIController:
             action_count = 0
             while True:
                 # La IA usa MiniMax para elegir el mejor movimiento en el estado actual
-                possible_moves = current_state.get_possible_moves()
+                possible_moves = current_state.get_distinct_moves()
                 print(f"IA: Movimientos posibles en Main: {len(possible_moves)} opciones")
                 
-                best_move = find_best_move(current_state, depth=self.depth)
+                best_move = self._choose_move(current_state, possible_moves)
 
                 if best_move is None:
                     print("IA: No hay movimientos para elegir en Main Phase. Pasando a Battle.")
                     pass_to_battle = Move(action_type=ActionType.PASS, target_zone='battle')
-                    current_state = current_state.apply_move(pass_to_battle)
+                    current_state = current_state.apply_move(pass_to_battle, self.events)
                     break 
                 
                 # Si el mejor movimiento es una transición de fase, ejecutarla y salir
                 if best_move.action_type == ActionType.PASS:
                     if best_move.target_zone == 'battle':
                         print("IA: Mejor movimiento es PASS a Battle Phase.")
-                        current_state = current_state.apply_move(best_move)
+                        current_state = current_state.apply_move(best_move, self.events)
                         break
                     elif best_move.target_zone == 'end':
                         print("IA: Mejor movimiento es PASS a End Phase (saltando Battle).")
-                        current_state = current_state.apply_move(best_move)
+                        current_state = current_state.apply_move(best_move, self.events)
                         break
                         
                 # Si es un movimiento de acción (Summon, Fusion, CHANGE_POSITION, etc.), ejecutar
                 print(f"IA: Ejecutando acción #{action_count + 1}: {best_move.action_type.name}")
-                prev_state = current_state
-                current_state = current_state.apply_move(best_move)
-                if current_state == prev_state:
+                current_state, changed = current_state.try_move(best_move, self.events)
+                if not changed:
                     print("IA: El movimiento seleccionado no tuvo efecto o fue inválido, pasando a Battle.")
                     pass_to_battle = Move(action_type=ActionType.PASS, target_zone='battle')
-                    current_state = current_state.apply_move(pass_to_battle)
+                    current_state = current_state.apply_move(pass_to_battle, self.events)
                     break
                 action_count += 1
                 
@@ -111,20 +220,24 @@ class AIController:
             
             attack_count = 0
             while True:
-                possible_moves = current_state.get_possible_moves()
+                possible_moves = current_state.get_distinct_moves()
                 print(f"IA: Movimientos posibles en Battle: {len(possible_moves)} opciones")
                 
-                best_move = find_best_move(current_state, depth=self.depth)
+                best_move = lethal_attack(current_state)
+                if best_move is not None:
+                    print("IA: Ataque letal detectado con la tabla de combates.")
+                else:
+                    best_move = self._choose_move(current_state, possible_moves)
                 
                 if best_move is None:
                     print("IA: No hay movimientos en Battle Phase. Pasando a End.")
                     pass_to_end = Move(action_type=ActionType.PASS, target_zone='end')
-                    current_state = current_state.apply_move(pass_to_end)
+                    current_state = current_state.apply_move(pass_to_end, self.events)
                     break 
 
                 if best_move.action_type == ActionType.PASS and best_move.target_zone == 'end':
                     print("IA: Mejor movimiento es PASS a End Phase.")
-                    current_state = current_state.apply_move(best_move)
+                    current_state = current_state.apply_move(best_move, self.events)
                     break 
                 
                 # Si es un ataque
@@ -139,12 +252,11 @@ class AIController:
                             if target_slot:
                                 target_name = target_slot[0].name
                         print(f"IA: Ataque #{attack_count + 1}: {attacker_name} ataca a {target_name}")
-                        prev_state = current_state
-                        current_state = current_state.apply_move(best_move)
-                        if current_state == prev_state:
+                        current_state, changed = current_state.try_move(best_move, self.events)
+                        if not changed:
                             print("IA: Ataque inválido o sin efecto, pasando a End.")
                             pass_to_end = Move(action_type=ActionType.PASS, target_zone='end')
-                            current_state = current_state.apply_move(pass_to_end)
+                            current_state = current_state.apply_move(pass_to_end, self.events)
                             break
                         attack_count += 1
                 
@@ -152,7 +264,7 @@ class AIController:
                     # Otros movimientos no deberían generarse en Battle Phase.
                     print(f"IA: Movimiento inesperado en Battle Phase. Pasando a End.")
                     pass_to_end = Move(action_type=ActionType.PASS, target_zone='end')
-                    current_state = current_state.apply_move(pass_to_end)
+                    current_state = current_state.apply_move(pass_to_end, self.events)
                     break
                     
                 # Después de un ataque, salir si el juego terminó
@@ -168,7 +280,7 @@ class AIController:
                 None
             )
             if end_pass_move:
-                current_state = current_state.apply_move(end_pass_move)
+                current_state = current_state.apply_move(end_pass_move, self.events)
                 print("IA: Turno terminado, pasando al jugador.")
             else:
                 print("ERROR: No se encontró movimiento de cambio de turno en End Phase.")
@@ -0,0 +1,163 @@
+'''
+Interfaz asyncio para el motor de búsqueda.
+
+La búsqueda MiniMax se ejecuta en un hilo del executor para no bloquear el
+bucle de eventos (interfaz gráfica o servidor). Cada búsqueda se controla con
+un SearchHandle, que permite seguir su progreso profundidad a profundidad,
+detenerla en cualquier momento y obtener siempre la mejor jugada encontrada
+hasta ese instante.
+
+Ejemplo:
+    engine = AsyncEngine()
+    handle = engine.start(state, depth=6, timeout=2.0)
+    async for progress in handle.progress():
+        print(progress)
+    result = await handle.result()
+'''
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterator, Optional
+
+from model.game.gamestate import GameState
+from model.game.move import Move
+from model.ai.minimax import MAX_DEPTH, SearchResult, search
+
+
+@dataclass(frozen=True)
+class SearchProgress:
+    """Información publicada al terminar cada profundidad de la búsqueda."""
+    depth: int
+    best_move: Optional[Move]
+    score: float
+    nodes: int
+    elapsed: float
+
+
+class SearchHandle:
+    """
+    Controla una búsqueda en curso.
+
+    - `cancel()` detiene la búsqueda; `result()` devuelve entonces la mejor
+      jugada de la última profundidad completada.
+    - Si se cancela la tarea que espera `result()`, la búsqueda también se
+      detiene (no queda un hilo consumiendo CPU) y la mejor jugada encontrada
+      queda disponible en `best_so_far`.
+    """
+
+    _DONE = object()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._stop_event = threading.Event()
+        self._updates: 'asyncio.Queue' = asyncio.Queue()
+        self._future: Optional[asyncio.Future] = None
+        self.best_so_far: Optional[SearchResult] = None
+
+    # --- Llamado desde el hilo de búsqueda ---
+
+    def _on_iteration(self, result: SearchResult):
+        self._loop.call_soon_threadsafe(self._publish, result)
+
+    def _publish(self, result: SearchResult):
+        self.best_so_far = result
+        self._updates.put_nowait(SearchProgress(
+            depth=result.depth,
+            best_move=result.best_move,
+            score=result.best_score,
+            nodes=result.nodes,
+            elapsed=result.elapsed
+        ))
+
+    def _on_done(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None:
+            self.best_so_far = future.result()
+        self._updates.put_nowait(self._DONE)
+
+    # --- API pública ---
+
+    @property
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def cancel(self):
+        """Pide detener la búsqueda lo antes posible (es seguro llamarlo varias veces)."""
+        self._stop_event.set()
+
+    async def result(self) -> SearchResult:
+        """Espera el final de la búsqueda (completa, por tiempo o cancelada)."""
+        try:
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    async def progress(self) -> AsyncIterator[SearchProgress]:
+        """Itera sobre el progreso de la búsqueda hasta que termina."""
+        while True:
+            update = await self._updates.get()
+            if update is self._DONE:
+                return
+            yield update
+
+
+class AsyncEngine:
+    """Lanza búsquedas MiniMax en un executor y las expone como corrutinas."""
+
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Args:
+            executor: Executor basado en hilos (por defecto, uno propio de un hilo).
+        """
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-search')
+
+    def start(
+        self,
+        state: GameState,
+        depth: int = MAX_DEPTH,
+        timeout: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        multi_pv: int = 1
+    ) -> SearchHandle:
+        """
+        Inicia una búsqueda sin bloquear. Debe llamarse desde el bucle de eventos.
+
+        Args:
+            state: Estado desde el que buscar.
+            depth: Profundidad máxima (se alcanza por profundización iterativa).
+            timeout: Plazo en segundos; al vencer se devuelve la mejor jugada hasta entonces.
+            max_nodes: Límite opcional de nodos.
+            multi_pv: Número de jugadas de la raíz a devolver.
+        """
+        loop = asyncio.get_running_loop()
+        handle = SearchHandle(loop)
+        job = partial(
+            search,
+            state,
+            depth=depth,
+            multi_pv=multi_pv,
+            time_limit=timeout,
+            max_nodes=max_nodes,
+            stop_event=handle._stop_event,
+            on_iteration=handle._on_iteration
+        )
+        handle._future = loop.run_in_executor(self.executor, job)
+        handle._future.add_done_callback(handle._on_done)
+        return handle
+
+    async def search(self, state: GameState, depth: int = MAX_DEPTH, timeout: Optional[float] = None, **kwargs) -> SearchResult:
+        """Atajo: inicia la búsqueda y espera su resultado."""
+        return await self.start(state, depth=depth, timeout=timeout, **kwargs).result()
+
+    async def find_best_move(self, state: GameState, depth: int = MAX_DEPTH, timeout: Optional[float] = None) -> Optional[Move]:
+        result = await self.search(state, depth=depth, timeout=timeout)
+        return result.best_move
+
+    def shutdown(self):
+        """Libera el executor si lo creó el propio motor."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,63 @@
+'''
+Evaluación por lotes de hojas con NumPy.
+
+En la búsqueda en haz, en el último ply de MiniMax o en simulaciones hay
+decenas o cientos de hojas hermanas que se evalúan a la vez. Aquí se extraen
+sus características a una matriz (una fila por estado) y se puntúan todas en
+una sola pasada vectorizada, con exactamente el mismo resultado que
+GameState.evaluate(): mismas operaciones en coma flotante y en el mismo orden.
+
+Uso:
+    scores = evaluate_batch(states)
+    search(state, depth=4, batch_evaluate=evaluate_batch)
+    beam_search(state, depth=4, score_batch=evaluate_batch)
+'''
+
+from typing import Sequence
+
+import numpy as np
+
+from model.game import gamestate
+from model.game.gamestate import GameState
+
+# Columnas de la matriz de características
+FEATURES = ('ai_lp', 'player_lp', 'ai_power', 'player_power', 'ai_hand', 'player_hand')
+AI_LP, PLAYER_LP, AI_POWER, PLAYER_POWER, AI_HAND, PLAYER_HAND = range(len(FEATURES))
+
+
+def state_features(state: GameState) -> np.ndarray:
+    """Vector de características (int64) de un estado, en el orden de FEATURES."""
+    return features_matrix((state,))[0]
+
+
+def features_matrix(states: Sequence[GameState]) -> np.ndarray:
+    """Matriz (n, len(FEATURES)) de enteros con las características de cada estado."""
+    rows = [
+        (a.life_points, p.life_points, a.field.power, p.field.power, len(a.hand), len(p.hand))
+        for a, p in ((state.ai_player, state.player) for state in states)
+    ]
+    return np.array(rows, dtype=np.int64).reshape(len(rows), len(FEATURES))
+
+
+def evaluate_features(features: np.ndarray) -> np.ndarray:
+    """
+    Puntúa una matriz de características. Equivale fila a fila a
+    GameState.evaluate(), incluidos los ±inf de los estados terminales.
+    """
+    lp_advantage = (features[:, AI_LP] - features[:, PLAYER_LP]).astype(np.float64)
+    field_advantage = (features[:, AI_POWER] - features[:, PLAYER_POWER]).astype(np.float64) * gamestate.BOARD_POWER_WEIGHT
+    hand_advantage = (features[:, AI_HAND] - features[:, PLAYER_HAND]).astype(np.float64) * gamestate.HAND_WEIGHT
+
+    scores = (lp_advantage * gamestate.LP_WEIGHT) + field_advantage + hand_advantage
+
+    # Estados terminales: la derrota de la IA tiene prioridad, como en evaluate()
+    scores[features[:, PLAYER_LP] <= 0] = np.inf
+    scores[features[:, AI_LP] <= 0] = -np.inf
+    return scores
+
+
+def evaluate_batch(states: Sequence[GameState]) -> np.ndarray:
+    """Evalúa una secuencia de estados en una sola pasada vectorizada."""
+    if not states:
+        return np.empty(0, dtype=np.float64)
+    return evaluate_features(features_matrix(states))
@@ -0,0 +1,163 @@
+'''
+Motor de búsqueda en haz (beam search) para posiciones muy anchas.
+
+Con manos grandes, la enumeración de fusiones (O(mano²)) más las 2·mano
+invocaciones hace que incluso MiniMax a profundidad 2 sea lento. La búsqueda
+en haz conserva sólo los B mejores estados de cada ply según la heurística,
+por lo que su coste está acotado por O(B · ramificación · profundidad).
+'''
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from model.game.gamestate import GameState
+from model.game.move import Move
+from model.ai.minimax import BatchEvaluator, RootLine, SearchAborted, SearchResult, _SearchContext
+from model.ai.stats import SearchStats
+
+DEFAULT_BEAM_WIDTH = 8
+
+# Entrada del haz: (índice de la jugada raíz, estado, variante desde la raíz)
+_BeamEntry = Tuple[int, GameState, Tuple[Move, ...]]
+
+
+def beam_search(
+    initial_state: GameState,
+    depth: int,
+    width: int = DEFAULT_BEAM_WIDTH,
+    multi_pv: int = 1,
+    score: Optional[Callable[[GameState], float]] = None,
+    score_batch: Optional[BatchEvaluator] = None,
+    time_limit: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+    stop_event: Optional[threading.Event] = None,
+    root_moves: Optional[Sequence[Move]] = None
+) -> SearchResult:
+    """
+    Búsqueda en haz desde la perspectiva de la IA.
+
+    En cada ply se expanden todos los estados del haz. Para los estados en los
+    que mueve el oponente sólo se conserva su mejor respuesta (la de menor
+    puntuación); después se quedan los `width` mejores estados del ply.
+
+    Con `time_limit`, `max_nodes` o `stop_event` la búsqueda se detiene al
+    agotarse el presupuesto (comprobado antes de expandir cada estado del
+    haz) y devuelve las líneas del último ply completo. El primer ply (las
+    jugadas de la raíz) siempre se completa.
+
+    Args:
+        initial_state: El estado actual del juego.
+        depth: Número de plies a explorar.
+        width: Tamaño del haz (B).
+        multi_pv: Número de jugadas de la raíz a devolver.
+        score: Función de puntuación estática (por defecto GameState.evaluate).
+        score_batch: Alternativa por lotes a `score`: puntúa de una vez todos los
+            hijos de cada ply (p. ej. model.ai.batch_eval.evaluate_batch).
+        time_limit: Tiempo máximo en segundos (opcional).
+        max_nodes: Número máximo de nodos a generar (opcional).
+        stop_event: Evento que, al activarse desde otro hilo, detiene la búsqueda.
+        root_moves: Jugadas de la raíz ya generadas (get_distinct_moves), como en search().
+
+    Returns:
+        Un SearchResult con las jugadas raíz ordenadas por la mejor puntuación
+        alcanzada por alguno de sus descendientes en el haz final; `depth` es
+        el número de plies completados.
+    """
+    start = time.perf_counter()
+    # Sólo se usa para comprobar el presupuesto, como en search()
+    limits = _SearchContext(
+        deadline=start + time_limit if time_limit is not None else None,
+        max_nodes=max_nodes,
+        stop_event=stop_event
+    )
+    score = score or GameState.evaluate
+    score_all = score_batch or (lambda states: [score(state) for state in states])
+    width = max(1, width)
+    nodes = 0
+
+    root_moves = list(root_moves) if root_moves is not None else initial_state.get_distinct_moves()
+    if not root_moves:
+        return SearchResult(lines=(), depth=0, nodes=0, elapsed=time.perf_counter() - start)
+
+    # Ply 1: todas las jugadas de la raíz
+    children = [initial_state.apply_trusted(move) for move in root_moves]
+    nodes += len(children)
+    scored: List[Tuple[float, _BeamEntry]] = [
+        (float(value), (index, child, (move,)))
+        for index, (move, child, value) in enumerate(zip(root_moves, children, score_all(children)))
+    ]
+    beam = _select(scored, width)
+    completed_depth = 1
+
+    for current_depth in range(2, depth + 1):
+        # Se generan todos los hijos del ply y se puntúan en un único lote
+        expansions: List[Tuple[float, _BeamEntry, List[Move]]] = []
+        children = []
+        try:
+            for value, entry in beam:
+                limits.nodes = nodes + len(children)
+                limits.check_limits()
+                state = entry[1]
+                moves = state.get_distinct_moves() if not state.is_game_over() else []
+                expansions.append((value, entry, moves))
+                children.extend(state.apply_trusted(move) for move in moves)
+        except SearchAborted:
+            # Ply incompleto: se descarta y se responde con el haz del anterior
+            nodes += len(children)
+            break
+        nodes += len(children)
+        values = score_all(children)
+
+        scored = []
+        offset = 0
+        for value, (index, state, pv), moves in expansions:
+            if not moves:
+                # Estado terminal o sin movimientos: pasa al siguiente ply tal cual
+                scored.append((value, (index, state, pv)))
+                continue
+
+            family = [
+                (float(values[offset + i]), (index, children[offset + i], pv + (move,)))
+                for i, move in enumerate(moves)
+            ]
+            offset += len(moves)
+
+            if state.current_turn == 'ai':
+                scored.extend(family)
+            else:
+                # El oponente juega su mejor respuesta (mínimo para la IA)
+                scored.append(min(family, key=lambda entry: entry[0]))
+        beam = _select(scored, width)
+        completed_depth = current_depth
+
+    # Puntuación de cada jugada raíz: el mejor estado final que desciende de ella
+    best_by_root: Dict[int, Tuple[float, Tuple[Move, ...]]] = {}
+    for value, (index, _, pv) in beam:
+        if index not in best_by_root or value > best_by_root[index][0]:
+            best_by_root[index] = (value, pv)
+
+    ranked = sorted(best_by_root.items(), key=lambda item: (-item[1][0], item[0]))
+    lines = tuple(
+        RootLine(move=root_moves[index], score=value, pv=pv)
+        for index, (value, pv) in ranked[:max(1, multi_pv)]
+    )
+    elapsed = time.perf_counter() - start
+    return SearchResult(
+        lines=lines,
+        depth=completed_depth,
+        nodes=nodes,
+        elapsed=elapsed,
+        stats=SearchStats(nodes=nodes, elapsed=elapsed)
+    )
+
+
+def _select(scored: List[Tuple[float, _BeamEntry]], width: int) -> List[Tuple[float, _BeamEntry]]:
+    """Conserva los `width` estados con mayor puntuación (estable ante empates)."""
+    order = sorted(range(len(scored)), key=lambda i: (-scored[i][0], i))
+    return [scored[i] for i in order[:width]]
+
+
+def should_use_beam(branching: int, threshold: Optional[int]) -> bool:
+    """Indica si una decisión es lo bastante ancha para pasar a búsqueda en haz."""
+    return threshold is not None and branching > threshold
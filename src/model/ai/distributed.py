@@ -0,0 +1,396 @@
+'''
+Búsqueda MiniMax distribuida entre procesos trabajadores conectados por sockets.
+
+Un trabajador (SearchWorker) escucha en un socket TCP o Unix, recibe
+subproblemas (GameState + profundidad + ventana alpha/beta) y devuelve la
+puntuación de cada uno. El coordinador (DistributedSearch) reparte las jugadas
+de la raíz entre los trabajadores con una cola compartida, de modo que cada
+trabajador pide trabajo nuevo en cuanto termina el anterior.
+
+Los mensajes se serializan con pickle: usar sólo en redes de confianza
+(p. ej. el clúster de análisis o localhost).
+
+Uso como trabajador (desde src/):
+    python -m model.ai.distributed --host 0.0.0.0 --port 5055
+    python -m model.ai.distributed --unix /tmp/yugioh-worker.sock
+
+Comprobación con trabajadores locales (misma jugada que find_best_move en serie):
+    python -m model.ai.distributed --check --workers 2 --positions 15
+'''
+
+import argparse
+import multiprocessing
+import pickle
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple, Union
+
+from model.game.gamestate import GameState
+from model.game.move import Move
+from model.game.setup import load_catalog
+from model.ai.minimax import INF, MAX_DEPTH, RootLine, SearchResult, find_best_move, search_subtree
+from model.ai.selfplay import SearchPlayer, play_game
+from model.ai.stats import SearchStats
+
+# Dirección de un trabajador: (host, puerto) para TCP o ruta para socket Unix
+Address = Union[Tuple[str, int], str]
+
+_HEADER = struct.Struct('>I')
+
+# Centinela de la cola de trabajos del coordinador: no quedan más
+_NO_MORE_JOBS = None
+
+
+# ----------------------------------------------------------------------
+# --- Protocolo: mensajes pickle precedidos de su longitud ---
+# ----------------------------------------------------------------------
+
+def _send_message(sock: socket.socket, message) -> None:
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_message(sock: socket.socket):
+    """
+    Lee un mensaje completo; devuelve None si la conexión se cerró. Si el
+    socket tiene timeout y vence, lanza socket.timeout (un OSError).
+    """
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return pickle.loads(payload)
+
+
+def _connect(address: Address, timeout: Optional[float] = None) -> socket.socket:
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(timeout)
+    sock.connect(address)
+    return sock
+
+
+# ----------------------------------------------------------------------
+# --- Trabajador ---
+# ----------------------------------------------------------------------
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    """
+    Atiende a un coordinador. Mensajes aceptados:
+        ('catalog', all_cards, all_recipes)
+        ('search', job_id, state, depth, alpha, beta, is_maximizing_player)
+    Cada 'search' se responde con ('score', job_id, valor, pv, nodos).
+    """
+
+    def handle(self):
+        all_cards, all_recipes = {}, []
+        while True:
+            message = _recv_message(self.request)
+            if message is None or message[0] == 'close':
+                return
+
+            if message[0] == 'catalog':
+                _, all_cards, all_recipes = message
+            elif message[0] == 'search':
+                _, job_id, state, depth, alpha, beta, is_maximizing_player = message
+                state = replace(state, all_cards=all_cards, all_recipes=all_recipes)
+                value, pv, nodes = search_subtree(state, depth, alpha, beta, is_maximizing_player)
+                _send_message(self.request, ('score', job_id, value, pv, nodes))
+
+
+class _TCPWorkerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _UnixWorkerServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class SearchWorker:
+    """Proceso trabajador que resuelve subproblemas MiniMax recibidos por socket."""
+
+    def __init__(self, address: Address):
+        """
+        Args:
+            address: (host, puerto) para TCP (puerto 0 = cualquiera libre) o una ruta para socket Unix.
+        """
+        if isinstance(address, str):
+            self.server = _UnixWorkerServer(address, _WorkerHandler)
+        else:
+            self.server = _TCPWorkerServer(address, _WorkerHandler)
+
+    @property
+    def address(self) -> Address:
+        return self.server.server_address
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+def _run_local_worker(ready: 'multiprocessing.Queue'):
+    worker = SearchWorker(('127.0.0.1', 0))
+    ready.put(worker.address)
+    worker.serve_forever()
+
+
+class LocalWorkerPool:
+    """
+    Lanza `count` trabajadores en procesos locales (localhost). Útil para
+    probar el coordinador sin un clúster:
+
+        with LocalWorkerPool(4) as addresses:
+            move = DistributedSearch(addresses).find_best_move(state, depth=3)
+    """
+
+    def __init__(self, count: int):
+        self.count = count
+        self.processes: List[multiprocessing.Process] = []
+        self.addresses: List[Address] = []
+
+    def __enter__(self) -> List[Address]:
+        ready = multiprocessing.Queue()
+        for _ in range(self.count):
+            process = multiprocessing.Process(target=_run_local_worker, args=(ready,), daemon=True)
+            process.start()
+            self.processes.append(process)
+        self.addresses = [ready.get(timeout=30) for _ in range(self.count)]
+        return self.addresses
+
+    def __exit__(self, *exc):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        return False
+
+
+# ----------------------------------------------------------------------
+# --- Coordinador ---
+# ----------------------------------------------------------------------
+
+class DistributedSearch:
+    """
+    Reparte una búsqueda MiniMax entre varios trabajadores.
+
+    La primera jugada de la raíz se busca con ventana completa; el resto se
+    reparte en paralelo usando su valor como alpha. Así la jugada elegida es
+    exactamente la misma que la de find_best_move en serie a igual profundidad.
+
+    Un trabajador que no responde a un trabajo en `job_timeout` segundos (se
+    ha colgado o la red está partida sin cerrar la conexión) se da por caído:
+    su conexión se cierra y el trabajo vuelve a la cola para los demás.
+    """
+
+    DEFAULT_JOB_TIMEOUT = 60.0
+
+    def __init__(self, addresses: Sequence[Address], job_timeout: Optional[float] = DEFAULT_JOB_TIMEOUT):
+        """
+        Args:
+            addresses: Direcciones de los trabajadores.
+            job_timeout: Segundos máximos de espera por cada trabajo (y por la
+                conexión); None = sin límite.
+        """
+        if not addresses:
+            raise ValueError("Se necesita al menos un trabajador.")
+        self.addresses = list(addresses)
+        self.job_timeout = job_timeout
+
+    def find_best_move(self, initial_state: GameState, depth: int = MAX_DEPTH) -> Optional[Move]:
+        return self.search(initial_state, depth).best_move
+
+    def search(self, initial_state: GameState, depth: int = MAX_DEPTH) -> SearchResult:
+        start = time.perf_counter()
+        possible_moves = initial_state.get_distinct_moves()
+        if not possible_moves:
+            return SearchResult(lines=(), depth=0, nodes=0, elapsed=time.perf_counter() - start)
+
+        catalog = ('catalog', initial_state.all_cards, initial_state.all_recipes)
+        children = [
+            replace(initial_state.apply_trusted(move), all_cards={}, all_recipes=[])
+            for move in possible_moves
+        ]
+
+        # 1. Hermano mayor: ventana completa para fijar alpha
+        first = self._run_jobs(catalog, [(0, children[0], depth - 1, -INF, INF)])
+        alpha = first[0][0]
+
+        # 2. Hermanos menores en paralelo con la ventana (alpha, INF)
+        jobs = [(i, children[i], depth - 1, alpha, INF) for i in range(1, len(children))]
+        results = dict(first)
+        results.update(self._run_jobs(catalog, jobs))
+
+        # Misma regla que en serie: gana el valor estrictamente mayor, y ante empate la jugada anterior
+        best_value, best_index = -INF, None
+        for index in range(len(possible_moves)):
+            if results[index][0] > best_value:
+                best_value, best_index = results[index][0], index
+
+        nodes = len(possible_moves) + sum(result[2] for result in results.values())
+        lines: Tuple[RootLine, ...] = ()
+        if best_index is not None:
+            move = possible_moves[best_index]
+            lines = (RootLine(move=move, score=best_value, pv=(move,) + results[best_index][1]),)
+        else:
+            lines = (RootLine(move=possible_moves[0], score=-INF, pv=(possible_moves[0],)),)
+        elapsed = time.perf_counter() - start
+        return SearchResult(
+            lines=lines,
+            depth=depth,
+            nodes=nodes,
+            elapsed=elapsed,
+            stats=SearchStats(nodes=nodes, elapsed=elapsed)
+        )
+
+    def _run_jobs(self, catalog, jobs) -> dict:
+        """
+        Ejecuta los trabajos en los trabajadores disponibles. Cada hilo de
+        conexión toma el siguiente trabajo de la cola al terminar el anterior.
+        Si un trabajador falla o agota job_timeout, su trabajo vuelve a la
+        cola. Al completarse todos, se encola un centinela por conexión para
+        que cada hilo salga de su espera.
+        """
+        if not jobs:
+            return {}
+
+        pending: 'queue.Queue' = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+        results = {}
+        lock = threading.Lock()
+
+        def serve(address: Address):
+            try:
+                sock = _connect(address, self.job_timeout)
+            except OSError as e:
+                print(f"[Distributed] No se pudo conectar con {address}: {e}")
+                return
+            job = None
+            try:
+                _send_message(sock, catalog)
+                while True:
+                    job = pending.get()
+                    if job is _NO_MORE_JOBS:
+                        job = None
+                        break
+                    job_id, state, depth, alpha, beta = job
+                    _send_message(sock, ('search', job_id, state, depth, alpha, beta, False))
+                    reply = _recv_message(sock)
+                    if reply is None:
+                        raise ConnectionError("el trabajador cerró la conexión")
+                    _, reply_id, value, pv, nodes = reply
+                    job = None
+                    with lock:
+                        results[reply_id] = (value, pv, nodes)
+                        if len(results) == len(jobs):
+                            for _ in self.addresses:
+                                pending.put(_NO_MORE_JOBS)
+                _send_message(sock, ('close',))
+            except (OSError, ConnectionError, EOFError) as e:
+                # socket.timeout es un OSError: un trabajador colgado cuenta como caído
+                print(f"[Distributed] Trabajador {address} falló: {e}")
+                if job is not None:
+                    pending.put(job)
+            finally:
+                sock.close()
+
+        threads = [threading.Thread(target=serve, args=(address,), daemon=True) for address in self.addresses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if len(results) != len(jobs):
+            raise RuntimeError("No quedan trabajadores disponibles para completar la búsqueda.")
+        return results
+
+
+# ----------------------------------------------------------------------
+# --- Comprobación ---
+# ----------------------------------------------------------------------
+
+def check_against_serial(
+    workers: int = 2,
+    positions: int = 15,
+    depths: Sequence[int] = (1, 2, 3),
+    seed: int = 0
+) -> int:
+    """
+    Compara la búsqueda distribuida (`workers` trabajadores locales) con
+    find_best_move en serie sobre `positions` posiciones de autojuego, a cada
+    profundidad de `depths`. Devuelve el número de discrepancias (0 = correcto).
+    """
+    all_cards, all_recipes = load_catalog()
+    states: List[GameState] = []
+    game = 0
+    while len(states) < positions:
+        record = play_game(all_cards, all_recipes, seed + game, ai=SearchPlayer(depth=1),
+                           player=SearchPlayer(depth=1), exploration=0.3)
+        states.extend(state for state in record.positions[::7] if not state.is_game_over())
+        game += 1
+    states = states[:positions]
+
+    mismatches = 0
+    with LocalWorkerPool(workers) as addresses:
+        coordinator = DistributedSearch(addresses)
+        for index, state in enumerate(states):
+            for depth in depths:
+                serial = find_best_move(state, depth)
+                distributed = coordinator.find_best_move(state, depth)
+                if serial != distributed:
+                    mismatches += 1
+                    print(f"Posición {index}, profundidad {depth}: serie {serial!r} / distribuida {distributed!r}")
+    print(f"{len(states)} posiciones x profundidades {list(depths)} con {workers} trabajadores: "
+          f"{mismatches} discrepancias.")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trabajador de búsqueda MiniMax distribuida.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--unix', help="Ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument('--check', action='store_true',
+                        help="Compara con la búsqueda en serie usando trabajadores locales y termina")
+    parser.add_argument('--workers', type=int, default=2, help="Trabajadores locales de --check")
+    parser.add_argument('--positions', type=int, default=15, help="Posiciones de --check")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de las partidas de --check")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(1 if check_against_serial(args.workers, args.positions, seed=args.seed) else 0)
+
+    worker = SearchWorker(args.unix if args.unix else (args.host, args.port))
+    print(f"Trabajador de búsqueda escuchando en {worker.address}")
+    worker.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
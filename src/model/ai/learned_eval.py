@@ -0,0 +1,408 @@
+'''
+Evaluador aprendido a partir de partidas de autojuego (NumPy, sólo CPU).
+
+La heurística de GameState.evaluate() sólo mira LP, tamaño de mano y poder en
+campo. Este evaluador extrae más características por jugador (potencial de
+fusión, cartas bloqueadas por falta de tributos, calidad de la mano...) y las
+combina con un modelo lineal o un MLP de una capa oculta entrenado para
+predecir el resultado de la partida (regresión logística sobre victorias).
+
+La inferencia es por lotes: evaluate_batch() se enchufa directamente en
+search(batch_evaluate=...) y beam_search(score_batch=...). El modelo se guarda
+en un .npz comprimido de unos pocos KB.
+
+Entrenamiento (desde src/):
+    python -m model.ai.learned_eval --games 300 --depth 2 --hidden 16 --out ../data/learned_eval.npz
+'''
+
+import argparse
+import os
+import time
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model.cards.card import Card
+from model.fusions.fusion_recipe import FusionRecipe
+from model.game.gamestate import GameState, INF
+from model.game.hand import Hand
+from model.game.move import Position
+from model.game.player import Player
+from model.game.setup import DATA_DIR, load_catalog
+from model.ai.minimax import search
+from model.ai.selfplay import SearchPlayer, mirror, play_game
+from model.ai.stats import CacheCounter
+
+MODEL_FILE = os.path.join(DATA_DIR, 'learned_eval.npz')
+
+# Escala de la salida: logit de victoria × SCORE_SCALE, para que las
+# puntuaciones tengan un orden de magnitud parecido al de la heurística.
+SCORE_SCALE = 1000.0
+
+# Pérdida máxima de nodos/segundo admitida frente a GameState.evaluate()
+MAX_NPS_OVERHEAD = 0.35
+
+PLAYER_FEATURES = (
+    'lp', 'atk_power', 'def_power', 'monsters', 'hand',
+    'hand_best_attack', 'blocked_tributes', 'best_fusion_attack', 'deck'
+)
+FEATURE_NAMES = (
+    tuple(f'ai_{name}' for name in PLAYER_FEATURES)
+    + tuple(f'player_{name}' for name in PLAYER_FEATURES)
+    + ('ai_to_move',)
+)
+# Escala fija de cada característica (para que todas queden en torno a [0, 1])
+_PLAYER_SCALES = (8000.0, 10000.0, 10000.0, 5.0, 5.0, 3000.0, 5.0, 3000.0, 40.0)
+_SCALES = np.array(_PLAYER_SCALES * 2 + (1.0,), dtype=np.float64)
+
+
+class FeatureExtractor:
+    """Convierte estados en la matriz de características del modelo."""
+
+    def __init__(self, all_cards: Dict[str, Card], all_recipes: Sequence[FusionRecipe]):
+        # Por cada carta, sus compañeras de fusión y el ATK del resultado
+        self.fusions: Dict[str, Dict[str, int]] = {}
+        for recipe in all_recipes:
+            result = all_cards.get(recipe.result_id)
+            if result is None:
+                continue
+            for a, b in ((recipe.material_1_id, recipe.material_2_id), (recipe.material_2_id, recipe.material_1_id)):
+                partners = self.fusions.setdefault(a, {})
+                partners[b] = max(partners.get(b, 0), result.attack)
+        # Cachés por objeto con referencias débiles: no mantienen vivos los
+        # subárboles de búsquedas anteriores (ni frenan el internado de
+        # model.game.interning) y las entradas desaparecen con sus objetos.
+        self._row_cache: 'weakref.WeakKeyDictionary[Player, Tuple[float, ...]]' = weakref.WeakKeyDictionary()
+        self._hand_cache: 'weakref.WeakKeyDictionary[Hand, Tuple[int, int, int, int]]' = weakref.WeakKeyDictionary()
+        # Consultas y aciertos de las dos cachés (ver cache_counters)
+        self.row_lookups = self.row_hits = 0
+        self.hand_lookups = self.hand_hits = 0
+
+    def player_row(self, player: Player) -> Tuple[float, ...]:
+        # Los hijos de un nodo comparten el objeto Player del bando que no movió
+        # (y, con el internado, los jugadores iguales son el mismo objeto)
+        self.row_lookups += 1
+        cached = self._row_cache.get(player)
+        if cached is not None:
+            self.row_hits += 1
+            return cached
+
+        atk_power = def_power = monsters = 0
+        for slot in player.field.monsters:
+            if slot:
+                card, position, _ = slot
+                monsters += 1
+                if position == Position.FACE_UP_ATK:
+                    atk_power += card.attack
+                else:
+                    def_power += card.defense
+
+        best_attack, best_fusion, five_stars, six_stars = self._hand_terms(player.hand)
+        # Cartas de 5+ estrellas sin suficientes monstruos propios para tributar
+        blocked = (six_stars if monsters < 2 else 0) + (five_stars if monsters < 1 else 0)
+
+        row = (
+            player.life_points, atk_power, def_power, monsters, len(player.hand),
+            best_attack, blocked, best_fusion, len(player.deck)
+        )
+        self._row_cache[player] = row
+        return row
+
+    def _hand_terms(self, hand: Hand) -> Tuple[int, int, int, int]:
+        """(mejor ATK, mejor ATK de fusión, nº de 5 estrellas, nº de 6+) de una mano, cacheado por mano."""
+        self.hand_lookups += 1
+        cached = self._hand_cache.get(hand)
+        if cached is not None:
+            self.hand_hits += 1
+            return cached
+
+        cards = hand.cards
+        numbers = {card.number for card in cards}
+        best_fusion = 0
+        for number in numbers:
+            partners = self.fusions.get(number)
+            if partners:
+                for other in numbers:
+                    attack = partners.get(other, 0)
+                    if attack > best_fusion:
+                        best_fusion = attack
+
+        terms = (
+            max((card.attack for card in cards), default=0),
+            best_fusion,
+            sum(1 for card in cards if card.stars == 5),
+            sum(1 for card in cards if card.stars >= 6),
+        )
+        self._hand_cache[hand] = terms
+        return terms
+
+    def cache_counters(self) -> Dict[str, CacheCounter]:
+        """Contadores de las cachés de filas y de manos, para search(caches=...)."""
+        return {
+            'filas': lambda: (self.row_lookups, self.row_hits),
+            'manos': lambda: (self.hand_lookups, self.hand_hits),
+        }
+
+    def matrix(self, states: Sequence[GameState]) -> np.ndarray:
+        rows = [
+            self.player_row(state.ai_player) + self.player_row(state.player) + (state.current_turn == 'ai',)
+            for state in states
+        ]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES)) / _SCALES
+
+
+class LearnedEvaluator:
+    """
+    Modelo lineal (hidden=0) o MLP con una capa oculta tanh que predice el
+    logit de victoria de la IA a partir de FEATURE_NAMES.
+    """
+
+    def __init__(
+        self,
+        extractor: FeatureExtractor,
+        w1: Optional[np.ndarray],
+        b1: Optional[np.ndarray],
+        w2: np.ndarray,
+        b2: float
+    ):
+        self.extractor = extractor
+        self.w1, self.b1, self.w2, self.b2 = w1, b1, w2, float(b2)
+
+    @property
+    def hidden(self) -> int:
+        return 0 if self.w1 is None else self.w1.shape[1]
+
+    # --- Inferencia ---
+
+    def logits(self, features: np.ndarray) -> np.ndarray:
+        if self.w1 is None:
+            return features @ self.w2 + self.b2
+        return np.tanh(features @ self.w1 + self.b1) @ self.w2 + self.b2
+
+    def evaluate_batch(self, states: Sequence[GameState]) -> np.ndarray:
+        """Puntúa un lote de estados; los terminales valen ±inf como en evaluate()."""
+        if not states:
+            return np.empty(0, dtype=np.float64)
+        features = self.extractor.matrix(states)
+        scores = self.logits(features) * SCORE_SCALE
+        ai_lp = features[:, FEATURE_NAMES.index('ai_lp')]
+        player_lp = features[:, FEATURE_NAMES.index('player_lp')]
+        scores[player_lp <= 0] = INF
+        scores[ai_lp <= 0] = -INF
+        return scores
+
+    def evaluate(self, state: GameState) -> float:
+        return float(self.evaluate_batch((state,))[0])
+
+    # --- Serialización ---
+
+    def save(self, path: str = MODEL_FILE):
+        arrays = {
+            'features': np.array(FEATURE_NAMES),
+            'w2': self.w2.astype(np.float32),
+            'b2': np.float32(self.b2),
+        }
+        if self.w1 is not None:
+            arrays['w1'] = self.w1.astype(np.float32)
+            arrays['b1'] = self.b1.astype(np.float32)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str, all_cards: Dict[str, Card], all_recipes: Sequence[FusionRecipe]) -> 'LearnedEvaluator':
+        with np.load(path) as data:
+            if tuple(data['features']) != FEATURE_NAMES:
+                raise ValueError(f"{path} se entrenó con otras características.")
+            w1 = data['w1'].astype(np.float64) if 'w1' in data else None
+            b1 = data['b1'].astype(np.float64) if 'b1' in data else None
+            return cls(FeatureExtractor(all_cards, all_recipes), w1, b1, data['w2'].astype(np.float64), float(data['b2']))
+
+
+def load_learned_evaluator(
+    all_cards: Dict[str, Card],
+    all_recipes: Sequence[FusionRecipe],
+    path: str = MODEL_FILE
+) -> Optional[LearnedEvaluator]:
+    """Carga el modelo si existe; si no, la IA usa la heurística fija."""
+    if not os.path.exists(path):
+        print(f"Advertencia: no existe el modelo de evaluación {path}; se usa la heurística fija.")
+        return None
+    try:
+        evaluator = LearnedEvaluator.load(path, all_cards, all_recipes)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Advertencia: no se pudo cargar el modelo de evaluación {path}: {e}")
+        return None
+    print(f"Evaluador aprendido cargado ({'lineal' if not evaluator.hidden else f'MLP {evaluator.hidden}'}).")
+    return evaluator
+
+
+# ----------------------------------------------------------------------
+# --- Entrenamiento ---
+# ----------------------------------------------------------------------
+
+def build_dataset(records, extractor: FeatureExtractor) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte partidas en (X, y): cada posición de decisión etiquetada con el
+    resultado final para la IA. Cada posición se añade también espejada
+    (bandos intercambiados, etiqueta 1 - y) para que el modelo sea simétrico.
+    """
+    states: List[GameState] = []
+    labels: List[float] = []
+    for record in records:
+        outcome = record.outcome('ai')
+        for state in record.positions:
+            states.append(state)
+            labels.append(outcome)
+            states.append(mirror(state))
+            labels.append(1.0 - outcome)
+    if not states:
+        return np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+    return extractor.matrix(states), np.array(labels, dtype=np.float64)
+
+
+def train(
+    X: np.ndarray,
+    y: np.ndarray,
+    extractor: FeatureExtractor,
+    hidden: int = 0,
+    epochs: int = 200,
+    learning_rate: float = 0.01,
+    l2: float = 1e-4,
+    batch_size: int = 256,
+    seed: int = 0
+) -> LearnedEvaluator:
+    """Ajusta el modelo por entropía cruzada con Adam en minilotes."""
+    rng = np.random.default_rng(seed)
+    n_features = X.shape[1]
+    params: Dict[str, np.ndarray] = {'w2': np.zeros(hidden or n_features), 'b2': np.zeros(1)}
+    if hidden:
+        params['w1'] = rng.normal(0.0, 1.0 / np.sqrt(n_features), (n_features, hidden))
+        params['b1'] = np.zeros(hidden)
+        params['w2'] = rng.normal(0.0, 1.0 / np.sqrt(hidden), hidden)
+
+    moments = {name: (np.zeros_like(value), np.zeros_like(value)) for name, value in params.items()}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+
+    for _ in range(epochs):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), batch_size):
+            batch = order[start:start + batch_size]
+            xb, yb = X[batch], y[batch]
+
+            # Paso hacia delante
+            if hidden:
+                h = np.tanh(xb @ params['w1'] + params['b1'])
+                logits = h @ params['w2'] + params['b2'][0]
+            else:
+                logits = xb @ params['w2'] + params['b2'][0]
+            error = (1.0 / (1.0 + np.exp(-logits)) - yb) / len(batch)
+
+            # Gradientes de la entropía cruzada (+ L2 en los pesos)
+            grads = {'b2': np.array([error.sum()])}
+            if hidden:
+                grads['w2'] = h.T @ error + l2 * params['w2']
+                dh = np.outer(error, params['w2']) * (1.0 - h ** 2)
+                grads['w1'] = xb.T @ dh + l2 * params['w1']
+                grads['b1'] = dh.sum(axis=0)
+            else:
+                grads['w2'] = xb.T @ error + l2 * params['w2']
+
+            step += 1
+            for name, grad in grads.items():
+                m, v = moments[name]
+                m[:] = beta1 * m + (1 - beta1) * grad
+                v[:] = beta2 * v + (1 - beta2) * grad ** 2
+                m_hat = m / (1 - beta1 ** step)
+                v_hat = v / (1 - beta2 ** step)
+                params[name] -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    return LearnedEvaluator(
+        extractor,
+        params.get('w1'),
+        params.get('b1'),
+        params['w2'],
+        params['b2'][0]
+    )
+
+
+def log_loss(evaluator: LearnedEvaluator, X: np.ndarray, y: np.ndarray) -> float:
+    p = 1.0 / (1.0 + np.exp(-evaluator.logits(X)))
+    p = np.clip(p, 1e-9, 1 - 1e-9)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def measure_overhead(
+    evaluator: LearnedEvaluator,
+    states: Sequence[GameState],
+    depth: int,
+    repeats: int = 3
+) -> float:
+    """
+    Pérdida relativa de nodos/segundo de la búsqueda con el evaluador
+    aprendido (por lotes) frente a GameState.evaluate(). 0.2 = un 20% más lenta.
+    Las dos búsquedas se alternan `repeats` veces y se toma la mejor de cada una
+    para reducir el ruido de la máquina.
+    """
+    def nps(**kwargs) -> float:
+        nodes, elapsed = 0, 0.0
+        for state in states:
+            result = search(state, depth=depth, **kwargs)
+            nodes += result.nodes
+            elapsed += result.elapsed
+        return nodes / elapsed if elapsed > 0 else 0.0
+
+    base = learned = 0.0
+    for _ in range(repeats):
+        base = max(base, nps())
+        learned = max(learned, nps(evaluate=evaluator.evaluate, batch_evaluate=evaluator.evaluate_batch))
+    return 1.0 - learned / base if base > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el evaluador aprendido por autojuego.")
+    parser.add_argument('--games', type=int, default=300)
+    parser.add_argument('--depth', type=int, default=2, help="Profundidad de búsqueda en el autojuego")
+    parser.add_argument('--exploration', type=float, default=0.1)
+    parser.add_argument('--hidden', type=int, default=16, help="Neuronas ocultas (0 = modelo lineal)")
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-overhead', type=float, default=MAX_NPS_OVERHEAD)
+    parser.add_argument('--out', default=MODEL_FILE)
+    args = parser.parse_args()
+
+    all_cards, all_recipes = load_catalog()
+    extractor = FeatureExtractor(all_cards, all_recipes)
+
+    start = time.perf_counter()
+    config = SearchPlayer(depth=args.depth)
+    records = [
+        play_game(all_cards, all_recipes, args.seed + i, ai=config, player=config, exploration=args.exploration)
+        for i in range(args.games)
+    ]
+    print(f"{len(records)} partidas de autojuego en {time.perf_counter() - start:.1f}s.")
+
+    # Validación por partidas: una posición, su espejo y el resto de su partida
+    # caen del mismo lado, así que la pérdida de validación mide generalización
+    order = np.random.default_rng(args.seed).permutation(len(records))
+    split = max(1, int(len(records) * 0.9))
+    X_train, y_train = build_dataset([records[i] for i in order[:split]], extractor)
+    X_test, y_test = build_dataset([records[i] for i in order[split:]], extractor)
+    evaluator = train(X_train, y_train, extractor, hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+    print(f"Posiciones: {len(X_train)} + {len(X_test)} ({split} + {len(records) - split} partidas)"
+          f" | log-loss entrenamiento {log_loss(evaluator, X_train, y_train):.4f}"
+          f" | validación {log_loss(evaluator, X_test, y_test):.4f}")
+
+    sample = [state for record in records[:5] for state in record.positions[::10]]
+    overhead = measure_overhead(evaluator, sample, depth=3)
+    print(f"Coste en nodos/segundo frente a la heurística fija: {overhead:.0%} (máximo {args.max_overhead:.0%})")
+    if overhead > args.max_overhead:
+        print("El modelo es demasiado lento: no se guarda (reduzca --hidden o suba --max-overhead).")
+        raise SystemExit(1)
+
+    evaluator.save(args.out)
+    print(f"Modelo guardado en {args.out} ({os.path.getsize(args.out)} bytes).")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,130 +1,616 @@
-from typing import  Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from model.game.gamestate import GameState
 from model.game.move import Move
+from model.game.packed import PackedCodec, get_codec
+from model.game.search_board import SearchBoard
+from model.ai.move_ordering import order_moves as order_by_battle_table
+from model.game import interning
+from model.ai.stats import CacheCounter, SearchStats, timed_apply, timed_evaluate, timed_evaluate_batch, timed_movegen
+from model.ai.trace import SearchTracer
 
 # --- Parámetros de Configuración del Algoritmo ---
 # Se pueden ajustar la profundidad y los valores de infinito según el rendimiento deseado.
-MAX_DEPTH = 3  
+MAX_DEPTH = 3
 INF = float('inf')
 
-def find_best_move(initial_state: GameState, depth: int = MAX_DEPTH) -> Optional[Move]:
+# Evaluador de un lote de hojas: devuelve una puntuación por estado (ver model.ai.batch_eval)
+BatchEvaluator = Callable[[Sequence[GameState]], Sequence[float]]
+
+
+@dataclass(frozen=True)
+class RootLine:
     """
-    Función principal para encontrar el mejor movimiento utilizando MiniMax 
-    con poda Alpha-Beta.
-    
+    Una línea candidata desde la raíz: el movimiento, su puntuación y la
+    variante principal (PV) que MiniMax espera a partir de él.
+    """
+    move: Move
+    score: float
+    pv: Tuple[Move, ...]
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    Resultado completo de una búsqueda MiniMax.
+
+    `lines` contiene las k mejores jugadas de la raíz ordenadas de mejor a peor;
+    sus puntuaciones son exactas. El resto de datos (profundidad, nodos, tiempo,
+    estadísticas) sirven para depuración y para los niveles de dificultad.
+    """
+    lines: Tuple[RootLine, ...]
+    depth: int
+    nodes: int
+    elapsed: float
+    stats: SearchStats = field(default_factory=SearchStats, compare=False)
+
+    @property
+    def best_move(self) -> Optional[Move]:
+        """Mejor movimiento, o None si no hay ninguno que evite la derrota segura."""
+        if not self.lines or self.lines[0].score == -INF:
+            return None
+        return self.lines[0].move
+
+    @property
+    def best_score(self) -> float:
+        return self.lines[0].score if self.lines else -INF
+
+
+class SearchAborted(Exception):
+    """Se lanza dentro de la búsqueda cuando se agota el tiempo o los nodos, o se pide detenerla."""
+
+
+class _SearchContext:
+    """Estado mutable compartido por todos los nodos de una misma búsqueda."""
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        collect_stats: bool = False,
+        tracer: Optional[SearchTracer] = None,
+        evaluate: Optional[Callable[[GameState], float]] = None,
+        evaluate_batch: Optional[BatchEvaluator] = None,
+        order_moves: bool = False,
+        codec: Optional[PackedCodec] = None,
+        board: bool = False,
+        distinct_hand: bool = True,
+        staged_moves: bool = False,
+        caches: Optional[Dict[str, CacheCounter]] = None
+    ):
+        self.nodes = 0
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.stop_event = stop_event
+        self.tracer = tracer
+
+        # Operaciones del juego usadas por la búsqueda; con estadísticas se envuelven
+        # para medirlas, sin ellas se llaman directamente (sin coste añadido).
+        self.stats: Optional[SearchStats] = SearchStats(enabled=True) if collect_stats else None
+        # Con distinct_hand la mano es un multiconjunto: una jugada por carta
+        # (o pareja de cartas) distinta en lugar de una por copia
+        self.get_moves = GameState.get_distinct_moves if distinct_hand else GameState.get_possible_moves
+        # La raíz usa siempre la lista completa, en el orden del generador
+        self.get_root_moves = self.get_moves
+        if staged_moves:
+            # Por debajo de la raíz, generador por etapas (GameState.iter_moves)
+            self.get_moves = GameState.iter_moves if distinct_hand else (lambda state: state.iter_moves(False))
+        # Las jugadas vienen del generador: camino de aplicación sin validar
+        self.apply = GameState.apply_trusted
+        self.evaluate = evaluate or GameState.evaluate
+        self.is_game_over = GameState.is_game_over
+        if codec is not None:
+            # Nodos empaquetados (model.game.packed): las reglas las pone el códec
+            self.get_moves = codec.distinct_moves if distinct_hand else codec.moves
+            self.get_root_moves = self.get_moves
+            self.apply = codec.apply
+            self.evaluate = codec.evaluate
+            self.is_game_over = codec.is_game_over
+        # Con tablero mutable (model.game.search_board) cada apply es un make()
+        # que se deshace con unmake() al volver del hijo
+        self.unmake = None
+        if board:
+            self.get_moves = SearchBoard.distinct_moves if distinct_hand else SearchBoard.moves
+            self.get_root_moves = self.get_moves
+            self.apply = SearchBoard.make
+            self.evaluate = SearchBoard.evaluate
+            self.is_game_over = SearchBoard.is_game_over
+            self.unmake = SearchBoard.unmake
+        self.evaluate_batch = evaluate_batch
+        self.order_moves = order_moves
+        if self.stats is not None:
+            self.get_moves = timed_movegen(self.stats, self.get_moves)
+            self.get_root_moves = timed_movegen(self.stats, self.get_root_moves)
+            self.apply = timed_apply(self.stats, self.apply)
+            self.evaluate = timed_evaluate(self.stats, self.evaluate)
+            if self.evaluate_batch is not None:
+                self.evaluate_batch = timed_evaluate_batch(self.stats, self.evaluate_batch)
+        # Cachés cuyas consultas y aciertos se miden (sólo con estadísticas): el
+        # internado, la caché de jugadas del códec y las que pase quien llama
+        self.caches: Dict[str, CacheCounter] = {}
+        if self.stats is not None:
+            self.caches.update(interning.cache_counters())
+            if codec is not None:
+                self.caches['jugadas'] = codec.cache_counts
+            self.caches.update(caches or {})
+        self.cache_start = {name: counts() for name, counts in self.caches.items()}
+
+    def finish_stats(self, elapsed: float) -> SearchStats:
+        """Devuelve las estadísticas de la búsqueda con los totales actualizados."""
+        stats = self.stats if self.stats is not None else SearchStats()
+        stats.nodes = self.nodes
+        stats.elapsed = elapsed
+        for name, counts in self.caches.items():
+            probes, hits = counts()
+            start_probes, start_hits = self.cache_start[name]
+            stats.record_cache(name, probes - start_probes, hits - start_hits)
+        return stats
+
+    def check_limits(self):
+        """Aborta la búsqueda si se superó el presupuesto o se pidió detenerla."""
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted()
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchAborted()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted()
+
+
+def search(
+    initial_state: GameState,
+    depth: int = MAX_DEPTH,
+    multi_pv: int = 1,
+    time_limit: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+    stop_event: Optional[threading.Event] = None,
+    on_iteration: Optional[Callable[[SearchResult], None]] = None,
+    collect_stats: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    evaluate: Optional[Callable[[GameState], float]] = None,
+    batch_evaluate: Optional[BatchEvaluator] = None,
+    order_moves: bool = False,
+    packed: bool = False,
+    board: bool = False,
+    distinct_hand: bool = True,
+    staged_moves: bool = False,
+    caches: Optional[Dict[str, CacheCounter]] = None,
+    root_moves: Optional[Sequence[Move]] = None
+) -> SearchResult:
+    """
+    Búsqueda MiniMax con poda Alpha-Beta que conserva las `multi_pv` mejores
+    jugadas de la raíz, con su puntuación y su variante principal.
+
+    Todas las líneas salen de la misma búsqueda: la ventana de cada jugada de la
+    raíz se abre con la k-ésima mejor puntuación encontrada hasta el momento, de
+    modo que sólo se podan las jugadas que no pueden entrar en el top-k.
+
+    Si se indica `time_limit` (segundos), `max_nodes`, `stop_event` u
+    `on_iteration`, la búsqueda se hace por profundización iterativa
+    (1, 2, ..., depth) y, al agotarse el presupuesto o activarse `stop_event`,
+    se devuelve el resultado de la última profundidad completada. La
+    profundidad 1 siempre se completa (como el primer ply de beam_search):
+    con el presupuesto agotado se juega la mejor jugada a un ply, no la
+    primera generada.
+
     Args:
         initial_state: El estado actual del juego.
         depth: Profundidad máxima de búsqueda.
-        
+        multi_pv: Número de jugadas de la raíz que se quieren conocer.
+        time_limit: Tiempo máximo en segundos (opcional).
+        max_nodes: Número máximo de nodos a expandir (opcional).
+        stop_event: Evento que, al activarse desde otro hilo, detiene la búsqueda.
+        on_iteration: Se llama con el resultado parcial al completar cada profundidad.
+        collect_stats: Si es True, se recogen estadísticas detalladas (SearchStats).
+        tracer: Si se indica, se vuelca el árbol explorado (ver model.ai.trace).
+        evaluate: Heurística de las hojas (por defecto GameState.evaluate).
+        batch_evaluate: Si se indica, las hojas hermanas del último ply se puntúan
+            juntas con este evaluador (p. ej. model.ai.batch_eval.evaluate_batch)
+            en lugar de llamar a evaluate() por nodo. Debe puntuar igual que `evaluate`.
+        order_moves: Si es True, por debajo de la raíz los ataques se prueban
+            ordenados por la ganancia que predice la tabla de combates (más
+            podas). El orden de la raíz se mantiene, así que las líneas
+            devueltas son las mismas.
+        packed: Si es True, los nodos se guardan empaquetados en bytes
+            (model.game.packed) en lugar de como GameState: menos memoria y
+            nodos más baratos, con las mismas jugadas, puntuaciones y líneas.
+            Usa GameState.evaluate, así que no admite `evaluate`,
+            `batch_evaluate` ni `order_moves`.
+        board: Si es True, se busca sobre un único tablero mutable
+            (model.game.search_board) con make/unmake en lugar de crear un
+            estado por nodo. Mismas líneas y mismas restricciones que `packed`.
+        distinct_hand: Si es True (por defecto), la mano se trata como
+            multiconjunto: las copias repetidas de una carta (y las parejas de
+            fusión repetidas) generan una sola jugada, con el índice concreto
+            de la primera copia. Las jugadas omitidas llevan a posiciones
+            equivalentes, así que la mejor jugada no cambia; sí desaparecen
+            las líneas duplicadas de multi_pv.
+        staged_moves: Si es True, por debajo de la raíz las jugadas salen del
+            generador por etapas GameState.iter_moves (ataques letales
+            primero, fusiones antes que invocaciones) y cada etapa se genera
+            sólo si no ha habido poda antes. Como con `order_moves`,
+            el orden de la raíz se mantiene y las líneas devueltas son las
+            mismas. No se combina con `order_moves`, `packed` ni `board`.
+        caches: Contadores de cachés externas a la búsqueda (p. ej. las del
+            evaluador aprendido, LearnedEvaluator.cache_counters()). Con
+            collect_stats se añaden a los del internado y del códec, y las
+            estadísticas dan las consultas y aciertos de cada una.
+        root_moves: Jugadas de la raíz ya generadas por quien llama, para no
+            volver a generarlas (las mismas que daría get_distinct_moves, o
+            get_possible_moves con distinct_hand=False).
+
     Returns:
-        El mejor objeto Move encontrado para la IA, o None si no hay movimientos.
+        Un SearchResult con las líneas encontradas (vacío si no hay movimientos).
     """
-    
-    # El turno actual en este punto siempre será la IA ('ai')
-    
-    best_value = -INF
-    best_move: Optional[Move] = None
-    
-    # Generar todos los movimientos posibles desde el estado inicial
-    possible_moves = initial_state.get_possible_moves()
-    
+    start = time.perf_counter()
+    deadline = start + time_limit if time_limit is not None else None
+    codec = None
+    if staged_moves and order_moves:
+        raise ValueError("staged_moves y order_moves son ordenaciones alternativas; elige una.")
+    if packed or board:
+        if packed and board:
+            raise ValueError("packed y board son representaciones alternativas; elige una.")
+        if evaluate is not None or batch_evaluate is not None or order_moves or staged_moves:
+            raise ValueError("La búsqueda empaquetada no admite evaluate, batch_evaluate, order_moves ni staged_moves.")
+        if board:
+            initial_state = SearchBoard.from_state(initial_state)
+            # El tablero genera sus jugadas con la caché del códec
+            caches = {'jugadas': initial_state.codec.cache_counts, **(caches or {})}
+        else:
+            codec = get_codec(initial_state.all_cards, initial_state.all_recipes)
+            initial_state = codec.pack(initial_state)
+    ctx = _SearchContext(
+        deadline=deadline,
+        max_nodes=max_nodes,
+        stop_event=stop_event,
+        collect_stats=collect_stats,
+        tracer=tracer,
+        evaluate=evaluate,
+        evaluate_batch=batch_evaluate,
+        order_moves=order_moves,
+        codec=codec,
+        board=board,
+        distinct_hand=distinct_hand,
+        staged_moves=staged_moves,
+        caches=caches
+    )
+    multi_pv = max(1, multi_pv)
+
+    possible_moves = list(root_moves) if root_moves is not None else ctx.get_root_moves(initial_state)
     if not possible_moves:
-        return None
+        elapsed = time.perf_counter() - start
+        return SearchResult(lines=(), depth=0, nodes=0, elapsed=elapsed, stats=ctx.finish_stats(elapsed))
 
-    # Iterar sobre los movimientos, aplicando MiniMax
-    # Usamos alpha = -INF y beta = INF para el llamado inicial
-    for move in possible_moves:
-        
-        # 1. Aplicar el movimiento para obtener el nuevo estado (Estado sucesor)
-        next_state = initial_state.apply_move(move)
-        
-        # 2. Llamar a la función minimax_value (para el MIN player, que es el oponente)
-        # La poda se inicia con alpha = best_value (el máximo encontrado hasta ahora)
-        # y beta = INF (no hay límite superior para el oponente aún)
-        value = minimax_value(
+    if deadline is None and max_nodes is None and stop_event is None and on_iteration is None:
+        lines = _search_root(ctx, initial_state, possible_moves, depth, multi_pv)
+        elapsed = time.perf_counter() - start
+        return SearchResult(lines=lines, depth=depth, nodes=ctx.nodes, elapsed=elapsed, stats=ctx.finish_stats(elapsed))
+
+    # --- Profundización iterativa con presupuesto ---
+    lines: Tuple[RootLine, ...] = ()
+    completed_depth = 0
+    for current_depth in range(1, depth + 1):
+        if ctx.stats is not None:
+            ctx.stats.begin_iteration()
+        try:
+            # La profundidad 1 no se interrumpe: siempre hay una jugada puntuada
+            lines = _search_root(ctx, initial_state, possible_moves, current_depth, multi_pv, current_depth > 1)
+            completed_depth = current_depth
+        except SearchAborted:
+            if ctx.stats is not None:
+                ctx.stats.discard_iteration()
+            if tracer is not None:
+                tracer.unwind()
+            if board:
+                initial_state.unmake_all()
+            break
+        if on_iteration is not None:
+            elapsed = time.perf_counter() - start
+            on_iteration(SearchResult(
+                lines=lines,
+                depth=completed_depth,
+                nodes=ctx.nodes,
+                elapsed=elapsed,
+                stats=ctx.finish_stats(elapsed)
+            ))
+
+    if not lines:
+        # Sólo con depth < 1 (la profundidad 1 siempre termina): se juega el primer
+        # movimiento generado (en Main/Battle es siempre un PASS).
+        fallback = possible_moves[0]
+        score = ctx.evaluate(ctx.apply(initial_state, fallback))
+        if ctx.unmake is not None:
+            ctx.unmake(initial_state)
+        lines = (RootLine(move=fallback, score=score, pv=(fallback,)),)
+
+    elapsed = time.perf_counter() - start
+    return SearchResult(
+        lines=lines,
+        depth=completed_depth,
+        nodes=ctx.nodes,
+        elapsed=elapsed,
+        stats=ctx.finish_stats(elapsed)
+    )
+
+
+def _search_root(
+    ctx: _SearchContext,
+    initial_state: GameState,
+    possible_moves: List[Move],
+    depth: int,
+    multi_pv: int,
+    enforce_limits: bool = True
+) -> Tuple[RootLine, ...]:
+    """
+    Busca todas las jugadas de la raíz a profundidad fija y devuelve las k
+    mejores. Con enforce_limits=False no se comprueba el presupuesto.
+    """
+    # Cada entrada: (valor, índice original, movimiento, pv)
+    scored: List[Tuple[float, int, Move, Tuple[Move, ...]]] = []
+    if ctx.tracer is not None:
+        ctx.tracer.enter(0, None, -INF, INF)
+
+    for index, move in enumerate(possible_moves):
+        # El límite inferior es la k-ésima mejor puntuación: lo que no la supere
+        # no entra en las líneas que se devuelven.
+        if len(scored) >= multi_pv:
+            alpha = _ranked(scored)[multi_pv - 1][0]
+        else:
+            alpha = -INF
+
+        next_state = ctx.apply(initial_state, move)
+        ctx.nodes += 1
+        if ctx.stats is not None:
+            ctx.stats.record_node(1)
+        if enforce_limits:
+            ctx.check_limits()
+
+        if ctx.tracer is not None:
+            ctx.tracer.enter(1, move, alpha, INF)
+        value, child_pv = _alphabeta(
+            ctx,
             state=next_state,
-            depth=depth - 1, # Reducir la profundidad
-            alpha=best_value, 
+            depth=depth - 1,
+            alpha=alpha,
             beta=INF,
-            is_maximizing_player=False # El siguiente jugador es el MIN player
+            is_maximizing_player=False,  # El siguiente jugador es el MIN player
+            ply=1
         )
-        
-        # 3. Actualizar el mejor movimiento si el valor es superior
-        if value > best_value:
-            best_value = value
-            best_move = move
-            
-    # print(f"MiniMax ha terminado. Mejor Valor: {best_value}, Mejor Movimiento: {best_move}")
-    return best_move
+        if ctx.unmake is not None:
+            ctx.unmake(next_state)
+        if ctx.tracer is not None:
+            ctx.tracer.exit(value)
+        scored.append((value, index, move, (move,) + child_pv))
+
+    ranked = _ranked(scored)
+    if ctx.tracer is not None:
+        ctx.tracer.exit(ranked[0][0])
+    return tuple(
+        RootLine(move=move, score=value, pv=pv)
+        for value, _, move, pv in ranked[:multi_pv]
+    )
+
+
+def _ranked(scored):
+    """Ordena de mejor a peor; en caso de empate gana la jugada generada antes."""
+    return sorted(scored, key=lambda entry: (-entry[0], entry[1]))
+
+
+def find_best_move(initial_state: GameState, depth: int = MAX_DEPTH) -> Optional[Move]:
+    """
+    Función principal para encontrar el mejor movimiento utilizando MiniMax
+    con poda Alpha-Beta.
+
+    Args:
+        initial_state: El estado actual del juego.
+        depth: Profundidad máxima de búsqueda.
+
+    Returns:
+        El mejor objeto Move encontrado para la IA, o None si no hay movimientos.
+    """
+    return search(initial_state, depth=depth).best_move
 
 
 def minimax_value(
-    state: GameState, 
-    depth: int, 
-    alpha: float, 
-    beta: float, 
+    state: GameState,
+    depth: int,
+    alpha: float,
+    beta: float,
     is_maximizing_player: bool
 ) -> float:
     """
     Implementación recursiva de MiniMax con poda Alpha-Beta.
-    
+
     Args:
         state: El estado actual a evaluar.
         depth: Profundidad restante.
         alpha: El mejor valor encontrado para el MAX player (IA).
         beta: El mejor valor encontrado para el MIN player (Oponente).
         is_maximizing_player: True si es el turno de la IA (MAX), False si es del oponente (MIN).
-        
+
     Returns:
         El valor heurístico del estado.
     """
-    
+    value, _, _ = search_subtree(state, depth, alpha, beta, is_maximizing_player)
+    return value
+
+
+def search_subtree(
+    state: GameState,
+    depth: int,
+    alpha: float,
+    beta: float,
+    is_maximizing_player: bool
+) -> Tuple[float, Tuple[Move, ...], int]:
+    """
+    Resuelve un subárbol con MiniMax Alpha-Beta (sin presupuesto), como hace
+    search() con cada hijo de la raíz. Es el subproblema que se reparte en la
+    búsqueda distribuida (model.ai.distributed).
+
+    Returns:
+        (valor, variante principal desde `state`, nodos expandidos).
+    """
+    ctx = _SearchContext()
+    value, pv = _alphabeta(ctx, state, depth, alpha, beta, is_maximizing_player)
+    return value, pv, ctx.nodes
+
+
+def _alphabeta(
+    ctx: _SearchContext,
+    state: GameState,
+    depth: int,
+    alpha: float,
+    beta: float,
+    is_maximizing_player: bool,
+    ply: int = 0
+) -> Tuple[float, Tuple[Move, ...]]:
+    """
+    Núcleo recursivo de MiniMax. Devuelve el valor del estado y la variante
+    principal (secuencia de movimientos) que lleva a ese valor. `ply` es la
+    distancia a la raíz (sólo se usa para las estadísticas).
+    """
+
     # --- 1. Caso Base: El juego terminó o se alcanzó la profundidad máxima ---
-    if depth == 0 or state.is_game_over():
-        # Retornar la evaluación heurística del estado
+    if depth == 0 or ctx.is_game_over(state):
         # La función state.evaluate() ya está orientada a la IA (MAX player)
-        return state.evaluate()
+        return ctx.evaluate(state), ()
 
     # --- 2. Generar Movimientos ---
-    possible_moves = state.get_possible_moves()
-    
+    possible_moves = ctx.get_moves(state)
+
     # Caso Base Adicional: No hay movimientos legales (ej: Deck Out si se implementa, o fin de fase)
     if not possible_moves:
-        # En este caso, simplemente evaluamos el estado actual
-        return state.evaluate()
+        return ctx.evaluate(state), ()
+
+    if ctx.order_moves:
+        possible_moves = order_by_battle_table(state, possible_moves, is_maximizing_player)
+
+    # Último ply: todas las hojas hermanas se evalúan en un solo lote
+    if depth == 1 and ctx.evaluate_batch is not None:
+        return _alphabeta_frontier(ctx, state, list(possible_moves), alpha, beta, is_maximizing_player, ply)
 
     # --- 3. Búsqueda (Maximización o Minimización) ---
-    
+    best_pv: Tuple[Move, ...] = ()
+
     if is_maximizing_player:
         # Turno de la IA (MAX player)
         max_eval = -INF
-        for move in possible_moves:
-            next_state = state.apply_move(move)
-            
+        for child_index, move in enumerate(possible_moves):
+            next_state = ctx.apply(state, move)
+            ctx.nodes += 1
+            if ctx.stats is not None:
+                ctx.stats.record_node(ply + 1)
+            ctx.check_limits()
+
             # Llamada recursiva: el siguiente es el MIN player
-            eval_value = minimax_value(next_state, depth - 1, alpha, beta, False)
+            if ctx.tracer is not None:
+                ctx.tracer.enter(ply + 1, move, alpha, beta)
+            eval_value, child_pv = _alphabeta(ctx, next_state, depth - 1, alpha, beta, False, ply + 1)
+            if ctx.unmake is not None:
+                ctx.unmake(next_state)
+            if ctx.tracer is not None:
+                ctx.tracer.exit(eval_value)
+            if eval_value > max_eval or not best_pv:
+                best_pv = (move,) + child_pv
             max_eval = max(max_eval, eval_value)
-            
+
             # Poda Alpha
             alpha = max(alpha, max_eval)
             if beta <= alpha:
-                # print("Poda Alpha activada.")
+                if ctx.stats is not None:
+                    ctx.stats.record_cutoff(child_index)
+                if ctx.tracer is not None:
+                    ctx.tracer.mark_cutoff()
                 break
-        return max_eval
+        if not best_pv:
+            # Generador por etapas vacío: sin jugadas legales
+            return ctx.evaluate(state), ()
+        return max_eval, best_pv
 
     else:
         # Turno del Oponente (MIN player)
         min_eval = INF
-        for move in possible_moves:
-            next_state = state.apply_move(move)
-            
+        for child_index, move in enumerate(possible_moves):
+            next_state = ctx.apply(state, move)
+            ctx.nodes += 1
+            if ctx.stats is not None:
+                ctx.stats.record_node(ply + 1)
+            ctx.check_limits()
+
             # Llamada recursiva: el siguiente es el MAX player
-            eval_value = minimax_value(next_state, depth - 1, alpha, beta, True)
+            if ctx.tracer is not None:
+                ctx.tracer.enter(ply + 1, move, alpha, beta)
+            eval_value, child_pv = _alphabeta(ctx, next_state, depth - 1, alpha, beta, True, ply + 1)
+            if ctx.unmake is not None:
+                ctx.unmake(next_state)
+            if ctx.tracer is not None:
+                ctx.tracer.exit(eval_value)
+            if eval_value < min_eval or not best_pv:
+                best_pv = (move,) + child_pv
             min_eval = min(min_eval, eval_value)
-            
+
             # Poda Beta
             beta = min(beta, min_eval)
             if beta <= alpha:
-                # print("Poda Beta activada.")
+                if ctx.stats is not None:
+                    ctx.stats.record_cutoff(child_index)
+                if ctx.tracer is not None:
+                    ctx.tracer.mark_cutoff()
                 break
-        return min_eval
\ No newline at end of file
+        if not best_pv:
+            return ctx.evaluate(state), ()
+        return min_eval, best_pv
+
+
+def _alphabeta_frontier(
+    ctx: _SearchContext,
+    state: GameState,
+    possible_moves: List[Move],
+    alpha: float,
+    beta: float,
+    is_maximizing_player: bool,
+    ply: int
+) -> Tuple[float, Tuple[Move, ...]]:
+    """
+    Nodo a profundidad 1 con evaluación por lotes: genera todos los hijos, los
+    puntúa con ctx.evaluate_batch y recorre las puntuaciones con la misma regla
+    de poda que _alphabeta, por lo que devuelve el mismo valor y la misma PV.
+    """
+    children = []
+    for move in possible_moves:
+        children.append(ctx.apply(state, move))
+        ctx.nodes += 1
+        if ctx.stats is not None:
+            ctx.stats.record_node(ply + 1)
+        ctx.check_limits()
+
+    values = ctx.evaluate_batch(children)
+
+    best_value = -INF if is_maximizing_player else INF
+    best_pv: Tuple[Move, ...] = ()
+    for child_index, move in enumerate(possible_moves):
+        value = float(values[child_index])
+        if ctx.tracer is not None:
+            ctx.tracer.enter(ply + 1, move, alpha, beta)
+            ctx.tracer.exit(value)
+
+        if is_maximizing_player:
+            if value > best_value or not best_pv:
+                best_pv = (move,)
+            best_value = max(best_value, value)
+            alpha = max(alpha, best_value)
+        else:
+            if value < best_value or not best_pv:
+                best_pv = (move,)
+            best_value = min(best_value, value)
+            beta = min(beta, best_value)
+
+        if beta <= alpha:
+            if ctx.stats is not None:
+                ctx.stats.record_cutoff(child_index)
+            if ctx.tracer is not None:
+                ctx.tracer.mark_cutoff()
+            break
+    return best_value, best_pv
@@ -0,0 +1,90 @@
+'''
+Ordenación de jugadas y detección de ataques letales a partir de la tabla de
+combates (model.game.battle_table).
+
+La poda alpha-beta es más eficaz cuanto antes se prueban las mejores jugadas.
+En Battle Phase el resultado de cada ataque se conoce sin aplicarlo, así que
+los ataques se ordenan por la ganancia que predice la tabla. El resto de
+jugadas conserva el orden del generador.
+'''
+
+from typing import List, Optional
+
+from model.game.battle_table import get_battle_table
+from model.game.gamestate import GameState
+from model.game.move import ActionType, Move, Position
+
+
+def attack_gain(state: GameState, move: Move) -> int:
+    """
+    Ganancia estimada de un ataque para el jugador que lo realiza: daño causado
+    más poder destruido del rival, menos daño recibido y poder propio perdido.
+    """
+    acting, opponent = state._get_current_players()
+    attacking_slot = acting.field.monsters[move.source_index]
+    if attacking_slot is None:
+        return 0
+    attacker = attacking_slot[0]
+    if move.target_index == -1:
+        return attacker.attack
+
+    target_slot = opponent.field.monsters[move.target_index]
+    if target_slot is None:
+        return 0
+    defender, defender_position, _ = target_slot
+    outcome = get_battle_table(state.all_cards).outcome(attacker, defender, defender_position)
+
+    gain = outcome.defender_damage - outcome.attacker_damage
+    if outcome.defender_destroyed:
+        gain += defender.attack if defender_position == Position.FACE_UP_ATK else defender.defense
+    if outcome.attacker_destroyed:
+        gain -= attacker.attack
+    return gain
+
+
+def order_moves(state: GameState, moves: List[Move], maximizing: bool = True) -> List[Move]:
+    """
+    Ordena los ataques por la ganancia que predice la tabla, vista desde la IA.
+    En los nodos MAX van primero los mejores para la IA y en los MIN los
+    peores; el resto de jugadas queda en medio, en el orden del generador.
+    Fuera de Battle Phase la lista no cambia.
+    """
+    if state.phase != 'battle':
+        return moves
+    sign = 1 if state.current_turn == 'ai' else -1
+    if not maximizing:
+        sign = -sign
+    gains = [sign * attack_gain(state, move) if move.action_type == ActionType.ATTACK else 0 for move in moves]
+    order = sorted(range(len(moves)), key=lambda i: -gains[i])
+    return [moves[i] for i in order]
+
+
+def lethal_attack(state: GameState) -> Optional[Move]:
+    """
+    Devuelve un ataque que forma parte de una secuencia letal en esta Battle
+    Phase, o None. Se detectan dos casos sin buscar:
+        - un único ataque cuyo daño deja al rival sin LP;
+        - con el campo rival vacío, los ataques directos disponibles suman sus LP.
+    """
+    if state.phase != 'battle' or state.is_game_over():
+        return None
+    acting, opponent = state._get_current_players()
+    attacks = [move for move in state.get_possible_moves() if move.action_type == ActionType.ATTACK]
+    if not attacks:
+        return None
+
+    direct = [move for move in attacks if move.target_index == -1]
+    if direct:
+        total = sum(acting.field.monsters[move.source_index][0].attack for move in direct)
+        if total >= opponent.life_points:
+            # El de más ATK primero: si no se terminara la secuencia, es el que más daño hace
+            return max(direct, key=lambda move: acting.field.monsters[move.source_index][0].attack)
+        return None
+
+    table = get_battle_table(state.all_cards)
+    for move in attacks:
+        defender, defender_position, _ = opponent.field.monsters[move.target_index]
+        attacker = acting.field.monsters[move.source_index][0]
+        if table.outcome(attacker, defender, defender_position).defender_damage >= opponent.life_points:
+            return move
+    return None
@@ -0,0 +1,372 @@
+'''
+Libro de aperturas para las primeras decisiones de la IA (herramienta offline).
+
+La primera decisión de la IA en Main Phase se toma con su campo vacío, pero no
+necesariamente con el del rival: si empieza el jugador, la IA responde a lo
+que este invocó en su primer turno. El libro guarda, para cada posición
+(firma de la mano de la IA = ids de carta ordenados, más la firma del campo
+rival = (id, posición) de cada monstruo), la mejor jugada calculada offline
+con una búsqueda profunda.
+
+El juego no lo consulta: la clave es la mano exacta de la IA (5 cartas de un
+mazo aleatorio) y en partidas reales esas manos prácticamente no se repiten,
+así que el libro no acierta a ningún tamaño práctico (0 de 200 primeras
+decisiones con 500 muestras). Sirve para analizar aperturas offline y para
+medir la tasa de aciertos (--measure) de cualquier cambio de clave antes de
+volver a conectarlo a AIController.
+
+Las posiciones del libro salen de primeros turnos reales: partidas creadas con
+new_game (con los mismos mazos aleatorios que el juego) y jugadas hasta la
+primera decisión de la IA.
+
+Formato binario (big-endian):
+    cabecera: b'YGOB' | versión u8 | profundidad u8 | nº entradas u32
+    entrada:  n u8 | n × id u16 | m u8 | m × (id u16 | posición u8)
+              | acción u8 | a u8 | b u8 | posición u8 | puntuación f32
+donde `a` y `b` son posiciones dentro de la firma ordenada de la mano (no
+índices de la mano real), así que la jugada vale para cualquier orden de las
+cartas.
+
+Construcción y medida (desde src/):
+    python -m model.ai.opening_book --samples 500 --depth 4 --out ../data/opening_book.bin
+    python -m model.ai.opening_book --out ../data/opening_book.bin --measure 200
+'''
+
+import argparse
+import os
+import random
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from model.cards.card import Card
+from model.fusions.fusion_recipe import FusionRecipe
+from model.game.field import Field
+from model.game.gamestate import GameState
+from model.game.hand import Hand
+from model.game.move import ActionType, Move, Position
+from model.game.setup import DATA_DIR, DEFAULT_DECK_SIZE, load_catalog
+from model.ai.minimax import search
+from model.ai.selfplay import SearchPlayer, play_game
+
+BOOK_FILE = os.path.join(DATA_DIR, 'opening_book.bin')
+
+_MAGIC = b'YGOB'
+_VERSION = 2
+_HEADER = struct.Struct('>4sBBI')
+_MOVE = struct.Struct('>BBBBf')
+_MONSTER = struct.Struct('>HB')
+
+_ACTIONS = (ActionType.SUMMON, ActionType.SET, ActionType.FUSION_SUMMON, ActionType.PASS)
+_PASS_TARGETS = ('battle', 'end')
+_POSITIONS = (Position.FACE_UP_ATK, Position.FACE_UP_DEF)
+_STARTING_LP = 8000
+
+# Partidas de las que salen las posiciones del libro: el jugador humano se
+# modela con una búsqueda corta y algo de exploración para variar su primer turno
+_OPENING_PLAYER = SearchPlayer(depth=2)
+_OPENING_AI = SearchPlayer(depth=1)
+_OPENING_EXPLORATION = 0.25
+# La primera decisión de la IA llega a lo sumo tras el primer turno del rival
+_OPENING_PLIES = 12
+
+# Clave del libro: (firma de la mano de la IA, firma del campo rival)
+BookKey = Tuple[Tuple[int, ...], Tuple[Tuple[int, int], ...]]
+# Entrada del libro: (acción, a, b, posición, puntuación)
+BookEntry = Tuple[int, int, int, int, float]
+
+
+def hand_signature(hand: Hand) -> Optional[Tuple[int, ...]]:
+    """Firma canónica de una mano: ids numéricos de las cartas, ordenados."""
+    try:
+        return tuple(sorted(int(card.number) for card in hand.cards))
+    except ValueError:
+        return None
+
+
+def board_signature(field: Field) -> Optional[Tuple[Tuple[int, int], ...]]:
+    """Firma canónica de un campo: (id numérico, posición) de cada monstruo, ordenados."""
+    try:
+        return tuple(sorted(
+            (int(card.number), _POSITIONS.index(position))
+            for card, position, _ in filter(None, field.monsters)
+        ))
+    except ValueError:
+        return None
+
+
+def position_key(state: GameState) -> Optional[BookKey]:
+    """Clave del libro para el estado: mano de la IA y campo del rival."""
+    hand = hand_signature(state.ai_player.hand)
+    board = board_signature(state.player.field)
+    if hand is None or board is None:
+        return None
+    return hand, board
+
+
+def is_book_position(state: GameState) -> bool:
+    """
+    Indica si el estado es la primera decisión de la IA, como las del libro:
+    su Main Phase con la invocación sin usar, su campo y su cementerio vacíos
+    y el rival aún con los LP iniciales (la IA no ha atacado). El campo del
+    rival puede tener lo que invocó en su primer turno (va en la clave) y los
+    LP de la IA pueden haber bajado por un ataque directo.
+    """
+    ai, opponent = state.ai_player, state.player
+    return (
+        state.current_turn == 'ai'
+        and state.phase == 'main'
+        and ai.can_normal_summon
+        and not ai.graveyard
+        and opponent.life_points == _STARTING_LP
+        and all(slot is None for slot in ai.field.monsters)
+    )
+
+
+class OpeningBook:
+    """Tabla (mano de la IA, campo rival) → mejor primera jugada, con lectura/escritura binaria."""
+
+    def __init__(self, depth: int = 0, entries: Optional[Dict[BookKey, BookEntry]] = None):
+        self.depth = depth
+        self.entries: Dict[BookKey, BookEntry] = entries or {}
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # --- Consulta ---
+
+    def probe(self, state: GameState) -> Optional[Move]:
+        """Devuelve la jugada del libro para el estado, o None si no está."""
+        if not is_book_position(state):
+            return None
+        self.probes += 1
+        key = position_key(state)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            return None
+
+        move = _decode_move(entry, state.ai_player.hand, state.get_possible_moves())
+        if move is not None:
+            self.hits += 1
+        return move
+
+    # --- Construcción ---
+
+    @property
+    def hit_rate(self) -> float:
+        """Fracción de consultas (en posiciones de libro) que encontraron jugada."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def add(self, state: GameState, move: Move, score: float) -> bool:
+        """Añade la jugada elegida para la posición de la IA en `state`."""
+        key = position_key(state)
+        encoded = _encode_move(move, state.ai_player.hand)
+        if key is None or encoded is None:
+            return False
+        self.entries[key] = encoded + (score,)
+        return True
+
+    # --- Serialización ---
+
+    def save(self, path: str = BOOK_FILE):
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.depth, len(self.entries)))
+            for (hand, board), (action, a, b, position, score) in sorted(self.entries.items()):
+                f.write(struct.pack(f'>B{len(hand)}H', len(hand), *hand))
+                f.write(bytes((len(board),)))
+                for monster in board:
+                    f.write(_MONSTER.pack(*monster))
+                f.write(_MOVE.pack(action, a, b, position, score))
+
+    @classmethod
+    def load(cls, path: str = BOOK_FILE) -> 'OpeningBook':
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, depth, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} no es un libro de aperturas válido.")
+
+        entries: Dict[BookKey, BookEntry] = {}
+        offset = _HEADER.size
+        for _ in range(count):
+            size = data[offset]
+            offset += 1
+            hand = struct.unpack_from(f'>{size}H', data, offset)
+            offset += 2 * size
+            size = data[offset]
+            offset += 1
+            board = []
+            for _ in range(size):
+                board.append(_MONSTER.unpack_from(data, offset))
+                offset += _MONSTER.size
+            entries[(hand, tuple(board))] = _MOVE.unpack_from(data, offset)
+            offset += _MOVE.size
+        return cls(depth=depth, entries=entries)
+
+
+def load_opening_book(path: str = BOOK_FILE) -> Optional[OpeningBook]:
+    """Carga el libro si existe; None si no existe o no es válido."""
+    if not os.path.exists(path):
+        return None
+    try:
+        book = OpeningBook.load(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Advertencia: no se pudo cargar el libro de aperturas {path}: {e}")
+        return None
+    print(f"Libro de aperturas cargado: {len(book)} posiciones (profundidad {book.depth}).")
+    return book
+
+
+# ----------------------------------------------------------------------
+# --- Codificación de jugadas relativa a la firma ordenada ---
+# ----------------------------------------------------------------------
+
+def _sorted_hand_indices(hand: Hand) -> List[int]:
+    """Índices reales de la mano en el orden de la firma canónica."""
+    return sorted(range(len(hand.cards)), key=lambda i: int(hand.cards[i].number))
+
+
+def _encode_move(move: Move, hand: Hand) -> Optional[Tuple[int, int, int, int]]:
+    if move.action_type not in _ACTIONS:
+        return None
+    order = _sorted_hand_indices(hand)
+    rank = {hand_index: sig_index for sig_index, hand_index in enumerate(order)}
+    action = _ACTIONS.index(move.action_type)
+
+    if move.action_type in (ActionType.SUMMON, ActionType.SET):
+        return action, rank[move.source_index], 0, _POSITIONS.index(move.position)
+    if move.action_type == ActionType.FUSION_SUMMON:
+        i, j = move.fusion_materials_indices
+        return action, rank[i], rank[j], 0
+    if move.target_zone in _PASS_TARGETS:
+        return action, _PASS_TARGETS.index(move.target_zone), 0, 0
+    return None
+
+
+def _decode_move(entry: BookEntry, hand: Hand, legal_moves: List[Move]) -> Optional[Move]:
+    """Traduce la entrada a la jugada legal concreta para el orden actual de la mano."""
+    action_code, a, b, position_code, _ = entry
+    action = _ACTIONS[action_code]
+    order = _sorted_hand_indices(hand)
+
+    for move in legal_moves:
+        if move.action_type != action:
+            continue
+        if action in (ActionType.SUMMON, ActionType.SET):
+            if move.source_index == order[a] and move.position == _POSITIONS[position_code]:
+                return move
+        elif action == ActionType.FUSION_SUMMON:
+            if set(move.fusion_materials_indices) == {order[a], order[b]}:
+                return move
+        elif move.target_zone == _PASS_TARGETS[a]:
+            return move
+    return None
+
+
+# ----------------------------------------------------------------------
+# --- Construcción offline ---
+# ----------------------------------------------------------------------
+
+def sample_opening(
+    all_cards: Dict[str, Card],
+    all_recipes: List[FusionRecipe],
+    rng: random.Random,
+    deck_size: int = DEFAULT_DECK_SIZE
+) -> Optional[GameState]:
+    """
+    Primera decisión de la IA en una partida real: new_game con una semilla
+    aleatoria (empieza uno u otro según su paridad), jugada por autojuego
+    hasta esa decisión. None si no se llega a ella (p. ej. la IA ya perdió).
+    """
+    record = play_game(
+        all_cards,
+        all_recipes,
+        seed=rng.randrange(2 ** 31),
+        ai=_OPENING_AI,
+        player=_OPENING_PLAYER,
+        deck_size=deck_size,
+        exploration=_OPENING_EXPLORATION,
+        max_plies=_OPENING_PLIES
+    )
+    return next((state for state in record.positions if is_book_position(state)), None)
+
+
+def build_book(
+    all_cards: Dict[str, Card],
+    all_recipes: List[FusionRecipe],
+    samples: int,
+    depth: int,
+    seed: int = 0,
+    book: Optional[OpeningBook] = None
+) -> OpeningBook:
+    """
+    Busca a profundidad `depth` la primera decisión de la IA en `samples`
+    partidas nuevas y guarda la mejor jugada de cada posición. Si se pasa un
+    libro, se amplía.
+    """
+    rng = random.Random(seed)
+    book = book or OpeningBook(depth=depth)
+    book.depth = max(book.depth, depth)
+
+    for i in range(samples):
+        state = sample_opening(all_cards, all_recipes, rng)
+        if state is not None and position_key(state) not in book.entries:
+            result = search(state, depth=depth)
+            if result.best_move is not None:
+                book.add(state, result.best_move, result.best_score)
+        if (i + 1) % 50 == 0:
+            print(f"Libro de aperturas: {i + 1}/{samples} muestras, {len(book)} posiciones.")
+    return book
+
+
+def measure_hit_rate(
+    book: OpeningBook,
+    all_cards: Dict[str, Card],
+    all_recipes: List[FusionRecipe],
+    samples: int,
+    seed: int = 1
+) -> float:
+    """
+    Consulta el libro en la primera decisión de la IA de `samples` partidas
+    nuevas (con otra semilla que la de construcción) y devuelve la fracción de
+    aciertos.
+    """
+    rng = random.Random(seed)
+    book.probes = book.hits = 0
+    for _ in range(samples):
+        state = sample_opening(all_cards, all_recipes, rng)
+        if state is not None:
+            book.probe(state)
+    return book.hit_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye el libro de aperturas de la IA.")
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=BOOK_FILE)
+    parser.add_argument('--extend', action='store_true', help="Amplía el libro existente en --out")
+    parser.add_argument('--measure', type=int, metavar='N',
+                        help="No construye: mide la tasa de aciertos del libro en --out sobre N partidas "
+                             "nuevas (semilla --seed + 1, distinta de la de construcción)")
+    args = parser.parse_args()
+
+    all_cards, all_recipes = load_catalog()
+    if args.measure:
+        book = load_opening_book(args.out)
+        if book is None:
+            raise SystemExit(f"No existe el libro {args.out}.")
+        rate = measure_hit_rate(book, all_cards, all_recipes, args.measure, seed=args.seed + 1)
+        print(f"Aciertos: {book.hits} de {book.probes} primeras decisiones ({rate:.1%}).")
+        return
+
+    book = OpeningBook.load(args.out) if args.extend and os.path.exists(args.out) else None
+    book = build_book(all_cards, all_recipes, args.samples, args.depth, seed=args.seed, book=book)
+    book.save(args.out)
+    print(f"Libro guardado en {args.out}: {len(book)} posiciones, {os.path.getsize(args.out)} bytes.")
+
+
+if __name__ == '__main__':
+    main()
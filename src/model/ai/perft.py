@@ -0,0 +1,143 @@
+'''
+Perft: contador de nodos hoja para medir y validar la generación de movimientos.
+
+Recorre el árbol completo (sin poda) hasta una profundidad fija llamando a
+get_possible_moves y apply_move (el camino validado que usan los
+controladores), y cuenta las hojas por tipo de movimiento. Con --trusted
+aplica las jugadas con apply_trusted, el camino sin validación de la búsqueda.
+Con una semilla fija los recuentos son reproducibles, así que cualquier
+cambio en ellos delata una regresión en la generación o aplicación de jugadas.
+
+Uso (desde src/, no necesita pygame):
+    python -m model.ai.perft --depth 4 --seed 7
+    python -m model.ai.perft --depth 3 --seed 7 --phase main --turn ai --divide
+    python -m model.ai.perft --depth 4 --seed 7 --trusted
+'''
+
+import argparse
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Tuple
+
+from model.game.gamestate import GameState
+from model.game.move import Move
+from model.game.setup import DEFAULT_DECK_SIZE, load_catalog, new_game
+
+# Aplica una jugada generada por el motor y devuelve el estado hijo
+Apply = Callable[[GameState, Move], GameState]
+
+
+def _applier(trusted: bool) -> Apply:
+    return GameState.apply_trusted if trusted else GameState.apply_move
+
+
+@dataclass
+class PerftResult:
+    """
+    Recuento de hojas por tipo de movimiento y rendimiento de la generación.
+
+    `nodes` son las hojas; `applies` todas las jugadas aplicadas (nodos
+    interiores incluidos), que es lo que mide nps.
+    """
+    depth: int
+    nodes: int = 0
+    by_type: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+    applies: int = 0
+
+    @property
+    def nps(self) -> float:
+        """Nodos (jugadas aplicadas, no sólo hojas) por segundo."""
+        return self.applies / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _count(state: GameState, depth: int, by_type: Counter, apply: Apply) -> Tuple[int, int]:
+    """(hojas, jugadas aplicadas) del subárbol de `depth` plies."""
+    moves = state.get_possible_moves()
+    if depth == 1:
+        for move in moves:
+            apply(state, move)
+            by_type[move.action_type.name] += 1
+        return len(moves), len(moves)
+
+    leaves = applies = 0
+    for move in moves:
+        child_leaves, child_applies = _count(apply(state, move), depth - 1, by_type, apply)
+        leaves += child_leaves
+        applies += child_applies + 1
+    return leaves, applies
+
+
+def perft(state: GameState, depth: int, trusted: bool = False) -> PerftResult:
+    """
+    Cuenta las hojas a `depth` plies, clasificadas por el tipo del último
+    movimiento. Con trusted=True aplica las jugadas con apply_trusted.
+    """
+    result = PerftResult(depth=depth)
+    start = time.perf_counter()
+    if depth <= 0:
+        result.nodes = 1
+    else:
+        result.nodes, result.applies = _count(state, depth, result.by_type, _applier(trusted))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def divide(state: GameState, depth: int, trusted: bool = False) -> List[Tuple[Move, PerftResult]]:
+    """
+    Perft por cada movimiento de la raíz (útil para localizar diferencias).
+    Cada resultado incluye la jugada de la raíz en `applies`, y en `by_type`
+    cuando el propio hijo es la hoja (depth 1).
+    """
+    apply = _applier(trusted)
+    results = []
+    for move in state.get_possible_moves():
+        start = time.perf_counter()
+        result = perft(apply(state, move), depth - 1, trusted)
+        result.elapsed = time.perf_counter() - start
+        result.applies += 1
+        if depth <= 1:
+            result.by_type[move.action_type.name] += 1
+        results.append((move, result))
+    return results
+
+
+def _format_counts(by_type: Dict[str, int]) -> str:
+    return ', '.join(f"{name}={count}" for name, count in sorted(by_type.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft para la generación de movimientos.")
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--deck-size', type=int, default=DEFAULT_DECK_SIZE)
+    parser.add_argument('--phase', choices=('draw', 'main', 'battle', 'end'), default='draw')
+    parser.add_argument('--turn', choices=('player', 'ai'), default='player')
+    parser.add_argument('--divide', action='store_true', help="Recuento por cada movimiento de la raíz")
+    parser.add_argument('--trusted', action='store_true', help="Aplica con apply_trusted en vez de apply_move")
+    args = parser.parse_args()
+
+    all_cards, all_recipes = load_catalog()
+    state = new_game(all_cards, all_recipes, deck_size=args.deck_size, seed=args.seed)
+    state = replace(state, phase=args.phase, current_turn=args.turn)
+
+    if args.divide:
+        total = PerftResult(depth=args.depth)
+        for move, result in divide(state, args.depth, args.trusted):
+            print(f"{move!r}: {result.nodes}")
+            total.nodes += result.nodes
+            total.by_type.update(result.by_type)
+            total.elapsed += result.elapsed
+            total.applies += result.applies
+        result = total
+    else:
+        result = perft(state, args.depth, args.trusted)
+
+    print(f"\nPerft({args.depth}) semilla={args.seed}: {result.nodes} hojas")
+    print(f"Por tipo: {_format_counts(result.by_type)}")
+    print(f"Tiempo: {result.elapsed:.3f}s ({result.applies} jugadas aplicadas, {result.nps:,.0f} nodos/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+Perfiles de dificultad de la IA.
+
+Cada perfil agrupa los parámetros que controlan cuánto "piensa" la IA en su
+turno: presupuesto de tiempo, límite de nodos, profundidad máxima, motor de
+búsqueda y el grado de aleatoriedad al elegir entre las mejores jugadas.
+'''
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Motores de búsqueda disponibles para los perfiles
+ENGINES = ('minimax', 'beam')
+
+
+@dataclass(frozen=True)
+class DifficultyProfile:
+    """
+    Parámetros de un nivel de dificultad.
+
+    Attributes:
+        name: Nombre del perfil ('easy', 'normal', ...).
+        turn_time_budget: Segundos que la IA puede pensar en todo su turno.
+        max_depth: Profundidad máxima de la búsqueda por decisión.
+        max_nodes: Límite de nodos por decisión (None = sin límite).
+        engine: Motor de búsqueda a utilizar (ver ENGINES).
+        randomness: Probabilidad [0, 1] de jugar una de las alternativas a la mejor jugada.
+        multi_pv: Número de jugadas candidatas entre las que se puede elegir.
+        beam_width: Tamaño del haz cuando se usa el motor 'beam'.
+        beam_branching_threshold: Con más movimientos posibles que este umbral se
+            usa búsqueda en haz aunque el motor sea 'minimax' (None = nunca).
+        order_moves: Ordenar los ataques con la tabla de combates antes de buscar.
+        staged_moves: Generar las jugadas por etapas bajo la raíz (GameState.iter_moves).
+            Es una ordenación alternativa a order_moves.
+    """
+    name: str
+    turn_time_budget: float
+    max_depth: int
+    max_nodes: Optional[int] = None
+    engine: str = 'minimax'
+    randomness: float = 0.0
+    multi_pv: int = 1
+    beam_width: int = 8
+    beam_branching_threshold: Optional[int] = 40
+    order_moves: bool = False
+    staged_moves: bool = False
+
+    def __post_init__(self):
+        if self.engine not in ENGINES:
+            raise ValueError(f"Motor de búsqueda desconocido: {self.engine}")
+        if not 0.0 <= self.randomness <= 1.0:
+            raise ValueError("La aleatoriedad debe estar entre 0 y 1.")
+        if self.turn_time_budget <= 0 or self.max_depth < 1 or self.multi_pv < 1:
+            raise ValueError("Presupuesto, profundidad y multi_pv deben ser positivos.")
+        if self.order_moves and self.staged_moves:
+            raise ValueError("order_moves y staged_moves son ordenaciones alternativas.")
+
+
+PROFILES: Dict[str, DifficultyProfile] = {
+    'easy': DifficultyProfile(
+        name='easy', turn_time_budget=0.5, max_depth=2, max_nodes=2_000,
+        randomness=0.35, multi_pv=3, staged_moves=True
+    ),
+    'normal': DifficultyProfile(
+        name='normal', turn_time_budget=2.0, max_depth=3, max_nodes=20_000,
+        randomness=0.1, multi_pv=2, staged_moves=True
+    ),
+    'hard': DifficultyProfile(
+        name='hard', turn_time_budget=5.0, max_depth=4, order_moves=True
+    ),
+    'expert': DifficultyProfile(
+        name='expert', turn_time_budget=10.0, max_depth=6, order_moves=True
+    ),
+}
+
+DEFAULT_PROFILE = 'normal'
+
+
+def get_profile(name: str) -> DifficultyProfile:
+    """Devuelve el perfil con el nombre dado (sin distinguir mayúsculas)."""
+    try:
+        return PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Perfil de dificultad desconocido: {name}. Opciones: {', '.join(PROFILES)}"
+        ) from None
@@ -0,0 +1,168 @@
+'''
+Partidas IA contra IA sin interfaz gráfica.
+
+Ambos bandos eligen sus jugadas con la misma búsqueda MiniMax. Como la
+búsqueda y la heurística están orientadas a la IA, cuando mueve el jugador se
+busca sobre el estado espejado (jugadores intercambiados); los índices de las
+jugadas se refieren al jugador que actúa, así que valen en el estado original.
+
+El flujo de turno es el mismo que el de la partida real: en Draw Phase se roba
+una carta y se pasa a Main, después se decide jugada a jugada hasta cambiar de
+turno. Sirve para generar datos de entrenamiento y ajustar la evaluación.
+'''
+
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model.cards.card import Card
+from model.fusions.fusion_recipe import FusionRecipe
+from model.game.events import print_events
+from model.game.gamestate import GameState
+from model.game.move import ActionType, Move
+from model.game.setup import DEFAULT_DECK_SIZE, new_game
+from model.ai.minimax import BatchEvaluator, search
+
+MAX_PLIES = 400
+
+# Fase a la que se pasa cuando la jugada elegida no tiene efecto
+_NEXT_PHASE = {'main': 'battle', 'battle': 'end'}
+
+
+@dataclass(frozen=True)
+class SearchPlayer:
+    """Configuración de la búsqueda de un bando en las partidas de autojuego."""
+    depth: int = 2
+    evaluate: Optional[Callable[[GameState], float]] = None
+    batch_evaluate: Optional[BatchEvaluator] = None
+
+
+@dataclass(frozen=True)
+class GameRecord:
+    """
+    Resultado de una partida de autojuego.
+
+    Attributes:
+        seed: Semilla de la partida (mazos y exploración).
+        winner: 'ai', 'player' o None si se alcanzó el límite de plies.
+        plies: Número de jugadas aplicadas.
+        positions: Estados en los que se tomó una decisión (antes de mover).
+    """
+    seed: int
+    winner: Optional[str]
+    plies: int
+    positions: Tuple[GameState, ...] = ()
+
+    def outcome(self, perspective: str = 'ai') -> float:
+        """1.0 si gana `perspective`, 0.0 si pierde y 0.5 en tablas."""
+        if self.winner is None:
+            return 0.5
+        return 1.0 if self.winner == perspective else 0.0
+
+
+def mirror(state: GameState) -> GameState:
+    """Intercambia los jugadores para ver el estado desde el bando contrario."""
+    return GameState(
+        player=state.ai_player,
+        ai_player=state.player,
+        current_turn='player' if state.current_turn == 'ai' else 'ai',
+        phase=state.phase,
+        all_cards=state.all_cards,
+        all_recipes=state.all_recipes
+    )
+
+
+def choose_move(state: GameState, config: SearchPlayer) -> Optional[Move]:
+    """Mejor jugada para el jugador que mueve en `state`."""
+    view = state if state.current_turn == 'ai' else mirror(state)
+    result = search(
+        view,
+        depth=config.depth,
+        evaluate=config.evaluate,
+        batch_evaluate=config.batch_evaluate
+    )
+    if result.best_move is not None:
+        return result.best_move
+    # Todas las jugadas pierden: se juega la primera (igual que la IA del juego)
+    return result.lines[0].move if result.lines else None
+
+
+def _draw_phase(state: GameState) -> GameState:
+    """Roba la carta del turno y pasa a Main Phase, como hacen los controladores."""
+    if state.current_turn == 'ai':
+        new_ai_player, _ = state.ai_player.draw_card()
+        state = state.get_copy_with_players(state.player, new_ai_player)
+    else:
+        new_player, _ = state.player.draw_card()
+        state = state.get_copy_with_players(new_player, state.ai_player)
+    return state.apply_move(Move(action_type=ActionType.PASS, target_zone='main'))
+
+
+def _winner(state: GameState) -> Optional[str]:
+    if state.ai_player.life_points <= 0:
+        return 'player'
+    if state.player.life_points <= 0:
+        return 'ai'
+    return None
+
+
+def play_game(
+    all_cards: Dict[str, Card],
+    all_recipes: List[FusionRecipe],
+    seed: int,
+    ai: SearchPlayer = SearchPlayer(),
+    player: SearchPlayer = SearchPlayer(),
+    deck_size: int = DEFAULT_DECK_SIZE,
+    exploration: float = 0.0,
+    max_plies: int = MAX_PLIES,
+    record_positions: bool = True,
+    quiet: bool = True
+) -> GameRecord:
+    """
+    Juega una partida completa entre dos configuraciones de búsqueda.
+
+    Args:
+        seed: Semilla de los mazos y de la exploración; el bando que empieza
+            alterna con la paridad de la semilla.
+        ai / player: Búsqueda de cada bando.
+        exploration: Probabilidad de jugar un movimiento legal al azar (variedad).
+        max_plies: Límite de jugadas; si se alcanza la partida queda en tablas.
+        record_positions: Si es True, se guardan los estados de decisión.
+        quiet: Si es False, los eventos de combate de las jugadas se imprimen.
+    """
+    rng = random.Random(seed)
+    state = new_game(
+        all_cards,
+        all_recipes,
+        deck_size=deck_size,
+        seed=seed,
+        first_turn='player' if seed % 2 == 0 else 'ai'
+    )
+    positions: List[GameState] = []
+    plies = 0
+
+    events = None if quiet else print_events
+
+    while plies < max_plies and not state.is_game_over():
+        if state.phase == 'draw':
+            state = _draw_phase(state)
+            continue
+
+        moves = state.get_possible_moves()
+        if not moves:
+            break
+        if record_positions:
+            positions.append(state)
+
+        if exploration > 0.0 and rng.random() < exploration:
+            move = rng.choice(moves)
+        else:
+            move = choose_move(state, ai if state.current_turn == 'ai' else player)
+        new_state = state.apply_move(move, events)
+        if new_state is state and state.phase in _NEXT_PHASE:
+            # Jugada sin efecto: se pasa de fase, como hace AIController
+            new_state = state.apply_move(Move(action_type=ActionType.PASS, target_zone=_NEXT_PHASE[state.phase]), events)
+        state = new_state
+        plies += 1
+
+    return GameRecord(seed=seed, winner=_winner(state), plies=plies, positions=tuple(positions))
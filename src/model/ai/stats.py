@@ -0,0 +1,167 @@
+'''
+Instrumentación de la búsqueda: contadores de nodos, podas, llamadas y tiempos.
+
+Las estadísticas detalladas sólo se recogen si se piden (collect_stats=True);
+si no, la búsqueda sólo rellena los contadores básicos (nodos y tiempo) y no
+paga ningún coste extra por nodo.
+'''
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+# Contadores acumulados de una caché: () -> (consultas, aciertos)
+CacheCounter = Callable[[], Tuple[int, int]]
+
+
+@dataclass
+class SearchStats:
+    """
+    Estadísticas de una búsqueda.
+
+    Attributes:
+        enabled: True si se recogieron las estadísticas detalladas.
+        nodes: Nodos expandidos (estados generados con apply_move).
+        elapsed: Duración total de la búsqueda en segundos.
+        nodes_per_depth: Nodos por ply (índice 1 = hijos de la raíz). Con
+            profundización iterativa, los de la última iteración completada.
+        cutoffs: Número de podas alpha-beta.
+        cutoffs_by_child: Índice del hijo en el que se produjo cada poda (0 = primero).
+        apply_calls / apply_time: Llamadas y segundos en apply_move.
+        movegen_calls / movegen_time: Llamadas y segundos en get_possible_moves.
+        eval_calls / eval_time: Llamadas y segundos en evaluate.
+        caches: (consultas, aciertos) de cada caché durante la búsqueda, por nombre
+            (internado, jugadas del códec, filas del evaluador aprendido...).
+    """
+    enabled: bool = False
+    nodes: int = 0
+    elapsed: float = 0.0
+    nodes_per_depth: List[int] = field(default_factory=list)
+    cutoffs: int = 0
+    cutoffs_by_child: Dict[int, int] = field(default_factory=Counter)
+    apply_calls: int = 0
+    apply_time: float = 0.0
+    movegen_calls: int = 0
+    movegen_time: float = 0.0
+    eval_calls: int = 0
+    eval_time: float = 0.0
+    caches: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # Nodos por ply de la última iteración completada (ver begin_iteration)
+    _completed_per_depth: List[int] = field(default_factory=list, repr=False, compare=False)
+
+    # --- Registro (sólo se llama con estadísticas activas) ---
+
+    def record_node(self, ply: int):
+        while len(self.nodes_per_depth) <= ply:
+            self.nodes_per_depth.append(0)
+        self.nodes_per_depth[ply] += 1
+
+    def begin_iteration(self):
+        """
+        Empieza una iteración de la profundización iterativa: los nodos por
+        ply se cuentan de cero (cada iteración vuelve a recorrer la raíz).
+        """
+        self._completed_per_depth = self.nodes_per_depth
+        self.nodes_per_depth = []
+
+    def discard_iteration(self):
+        """La iteración en curso se abortó: vuelven los nodos por ply de la última completada."""
+        self.nodes_per_depth = self._completed_per_depth
+
+    def record_cutoff(self, child_index: int):
+        self.cutoffs += 1
+        self.cutoffs_by_child[child_index] += 1
+
+    def record_cache(self, name: str, probes: int, hits: int):
+        """Consultas y aciertos de la caché `name` en toda la búsqueda (totales, no incrementos)."""
+        self.caches[name] = (probes, hits)
+
+    # --- Métricas derivadas ---
+
+    @property
+    def nps(self) -> float:
+        """Nodos por segundo."""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """Media geométrica del crecimiento de nodos entre plies consecutivos."""
+        counts = [n for n in self.nodes_per_depth if n > 0]
+        if len(counts) < 2:
+            return float(counts[0]) if counts else 0.0
+        return (counts[-1] / counts[0]) ** (1.0 / (len(counts) - 1))
+
+    @property
+    def first_child_cutoff_rate(self) -> float:
+        """Fracción de podas producidas en el primer hijo (mide la calidad del orden de jugadas)."""
+        return self.cutoffs_by_child.get(0, 0) / self.cutoffs if self.cutoffs else 0.0
+
+    def cache_hit_rate(self, name: str) -> float:
+        probes, hits = self.caches.get(name, (0, 0))
+        return hits / probes if probes else 0.0
+
+    def summary(self) -> str:
+        """Resumen de una línea para los logs de la IA."""
+        text = f"{self.nodes} nodos en {self.elapsed:.3f}s ({self.nps:,.0f} nps)"
+        if not self.enabled:
+            return text
+        return (
+            f"{text} | por ply: {self.nodes_per_depth[1:]} | EBF: {self.effective_branching_factor:.2f} | "
+            f"podas: {self.cutoffs} ({self.first_child_cutoff_rate:.0%} en el 1er hijo) | "
+            f"apply: {self.apply_calls} ({self.apply_time:.3f}s) | "
+            f"movegen: {self.movegen_calls} ({self.movegen_time:.3f}s) | "
+            f"eval: {self.eval_calls} ({self.eval_time:.3f}s) | "
+            f"cachés: {self._cache_summary()}"
+        )
+
+    def _cache_summary(self) -> str:
+        used = [
+            f"{name} {hits / probes:.0%} de {probes}"
+            for name, (probes, hits) in self.caches.items() if probes
+        ]
+        return ', '.join(used) if used else '-'
+
+
+def timed_apply(stats: SearchStats, apply: Callable) -> Callable:
+    """Envuelve apply_move para contar llamadas y tiempo."""
+    def wrapper(state, move):
+        start = time.perf_counter()
+        result = apply(state, move)
+        stats.apply_time += time.perf_counter() - start
+        stats.apply_calls += 1
+        return result
+    return wrapper
+
+
+def timed_movegen(stats: SearchStats, get_moves: Callable) -> Callable:
+    """Envuelve get_possible_moves para contar llamadas y tiempo."""
+    def wrapper(state):
+        start = time.perf_counter()
+        result = get_moves(state)
+        stats.movegen_time += time.perf_counter() - start
+        stats.movegen_calls += 1
+        return result
+    return wrapper
+
+
+def timed_evaluate(stats: SearchStats, evaluate: Callable) -> Callable:
+    """Envuelve evaluate para contar llamadas y tiempo."""
+    def wrapper(state):
+        start = time.perf_counter()
+        result = evaluate(state)
+        stats.eval_time += time.perf_counter() - start
+        stats.eval_calls += 1
+        return result
+    return wrapper
+
+
+def timed_evaluate_batch(stats: SearchStats, evaluate_batch: Callable) -> Callable:
+    """Envuelve un evaluador por lotes: cuenta cada estado evaluado como una llamada."""
+    def wrapper(states):
+        start = time.perf_counter()
+        result = evaluate_batch(states)
+        stats.eval_time += time.perf_counter() - start
+        stats.eval_calls += len(states)
+        return result
+    return wrapper
@@ -0,0 +1,70 @@
+'''
+Gestor de tiempo del turno de la IA.
+
+La IA toma varias decisiones por turno (acciones en Main, ataques en Battle).
+El TimeManager reparte el presupuesto del turno entre ellas según el número
+de movimientos posibles de cada una, y garantiza que la suma nunca supere el
+techo duro configurado para el despliegue.
+'''
+
+import time
+from typing import Optional
+
+
+class TimeManager:
+    """
+    Reparte el presupuesto de tiempo de un turno entre sus decisiones.
+
+    Una decisión con muchas alternativas recibe una fracción mayor del tiempo
+    restante que una con pocas; una decisión con una sola alternativa no
+    recibe tiempo, porque no hay nada que buscar.
+    """
+
+    # Peso que se reserva para las decisiones que aún quedan en el turno
+    # (aprox. el factor de ramificación típico de una decisión posterior).
+    RESERVE_WEIGHT = 8.0
+    # Fracción máxima del tiempo restante que se entrega a una sola decisión
+    MAX_FRACTION = 0.6
+    # Margen de seguridad (segundos) para el trabajo fuera de la búsqueda
+    SAFETY_MARGIN = 0.01
+
+    def __init__(self, turn_budget: float, hard_ceiling: Optional[float] = None):
+        """
+        Args:
+            turn_budget: Tiempo (segundos) que la IA puede usar por turno.
+            hard_ceiling: Techo absoluto por turno; si es menor que el presupuesto, prevalece.
+                Debe superar SAFETY_MARGIN: con un techo menor no quedaría tiempo para buscar.
+        """
+        if hard_ceiling is not None:
+            if hard_ceiling <= self.SAFETY_MARGIN:
+                raise ValueError(
+                    f"El techo del turno ({hard_ceiling}s) debe superar el margen de seguridad ({self.SAFETY_MARGIN}s)."
+                )
+            turn_budget = min(turn_budget, hard_ceiling)
+        self.turn_budget = max(0.0, turn_budget)
+        self._turn_start: Optional[float] = None
+
+    def start_turn(self):
+        """Marca el comienzo del turno de la IA."""
+        self._turn_start = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Segundos transcurridos desde el comienzo del turno."""
+        if self._turn_start is None:
+            return 0.0
+        return time.perf_counter() - self._turn_start
+
+    def remaining(self) -> float:
+        """Segundos que quedan del presupuesto del turno."""
+        return max(0.0, self.turn_budget - self.elapsed() - self.SAFETY_MARGIN)
+
+    def allocate(self, branching: int) -> float:
+        """
+        Devuelve el tiempo (segundos) asignado a una decisión con `branching`
+        movimientos posibles. Nunca excede el tiempo restante del turno.
+        """
+        if branching <= 1:
+            return 0.0
+        remaining = self.remaining()
+        fraction = min(self.MAX_FRACTION, branching / (branching + self.RESERVE_WEIGHT))
+        return remaining * fraction
@@ -0,0 +1,171 @@
+'''
+Exportación del árbol de búsqueda para inspección offline.
+
+Un tracer recibe los eventos de la búsqueda (entrar/salir de cada nodo) y
+escribe cada nodo en cuanto se conoce su puntuación, es decir, en post-orden.
+En memoria sólo se guarda la pila de nodos abiertos (tan larga como la
+profundidad), por lo que se pueden volcar árboles de millones de nodos.
+
+Formatos:
+    - JsonlTracer: un objeto JSON por línea con id, parent, ply, move, alpha,
+      beta, score, cutoff (y aborted si la búsqueda se interrumpió).
+    - DotTracer: grafo de Graphviz (una arista y un nodo por línea).
+
+Ejemplo:
+    with JsonlTracer('arbol.jsonl', max_depth=3, sample_rate=0.1) as tracer:
+        search(state, depth=4, tracer=tracer)
+'''
+
+import json
+import random
+from abc import ABC, abstractmethod
+from typing import IO, List, Optional, Union
+
+from model.game.move import Move
+
+
+class SearchTracer(ABC):
+    """
+    Base de los tracers: gestiona la pila de nodos abiertos, el muestreo y el
+    límite de profundidad. Las subclases sólo implementan la escritura
+    (write_node es abstracto: un tracer incompleto no se puede construir).
+    """
+
+    def __init__(
+        self,
+        output: Union[str, IO[str]],
+        max_depth: Optional[int] = None,
+        sample_rate: float = 1.0,
+        seed: Optional[int] = 0
+    ):
+        """
+        Args:
+            output: Ruta del fichero o flujo de texto donde escribir.
+            max_depth: Ply máximo que se registra (None = sin límite).
+            sample_rate: Probabilidad de registrar cada nodo (y su subárbol).
+            seed: Semilla del muestreo, para trazas reproducibles.
+        """
+        self._owns_file = isinstance(output, str)
+        self.file: IO[str] = open(output, 'w', encoding='utf-8') if self._owns_file else output
+        self.max_depth = max_depth
+        self.sample_rate = sample_rate
+        self.rng = random.Random(seed)
+        self.nodes_written = 0
+        self._next_id = 0
+        # Pila de nodos abiertos: [id, parent_id, ply, move, alpha, beta, registrado, poda]
+        self._stack: List[list] = []
+        self.write_header()
+
+    # --- Eventos de la búsqueda ---
+
+    def enter(self, ply: int, move: Optional[Move], alpha: float, beta: float):
+        """Se llama al entrar en un nodo, con la ventana alpha/beta de entrada."""
+        parent = self._stack[-1] if self._stack else None
+        recorded = (
+            (parent is None or parent[6])
+            and (self.max_depth is None or ply <= self.max_depth)
+            and (ply == 0 or self.sample_rate >= 1.0 or self.rng.random() < self.sample_rate)
+        )
+        node_id = -1
+        if recorded:
+            node_id = self._next_id
+            self._next_id += 1
+        parent_id = parent[0] if parent is not None else None
+        self._stack.append([node_id, parent_id, ply, move, alpha, beta, recorded, False])
+
+    def mark_cutoff(self):
+        """El nodo actual produjo una poda alpha-beta."""
+        if self._stack:
+            self._stack[-1][7] = True
+
+    def exit(self, score: float):
+        """Se llama al salir del nodo actual, con su puntuación final."""
+        node = self._stack.pop()
+        if node[6]:
+            self._write(node, score, aborted=False)
+
+    def unwind(self):
+        """Cierra los nodos abiertos cuando la búsqueda se aborta."""
+        while self._stack:
+            node = self._stack.pop()
+            if node[6]:
+                self._write(node, None, aborted=True)
+
+    def close(self):
+        self.unwind()
+        self.write_footer()
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self) -> 'SearchTracer':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # --- Escritura (subclases) ---
+
+    def _write(self, node: list, score: Optional[float], aborted: bool):
+        self.nodes_written += 1
+        self.write_node(node[0], node[1], node[2], node[3], node[4], node[5], score, node[7], aborted)
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    @abstractmethod
+    def write_node(self, node_id, parent_id, ply, move, alpha, beta, score, cutoff, aborted):
+        """Escribe un nodo ya puntuado (score es None si la búsqueda se abortó)."""
+
+
+def _number(value: Optional[float]):
+    """JSON no admite infinitos: se escriben como cadenas."""
+    if value is None:
+        return None
+    if value in (float('inf'), float('-inf')):
+        return 'inf' if value > 0 else '-inf'
+    return value
+
+
+class JsonlTracer(SearchTracer):
+    """Escribe un nodo por línea en formato JSON Lines (post-orden)."""
+
+    def write_node(self, node_id, parent_id, ply, move, alpha, beta, score, cutoff, aborted):
+        record = {
+            'id': node_id,
+            'parent': parent_id,
+            'ply': ply,
+            'move': repr(move) if move is not None else None,
+            'alpha': _number(alpha),
+            'beta': _number(beta),
+            'score': _number(score),
+            'cutoff': cutoff,
+        }
+        if aborted:
+            record['aborted'] = True
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n')
+
+
+class DotTracer(SearchTracer):
+    """Escribe el árbol como grafo de Graphviz (dot -Tsvg arbol.dot > arbol.svg)."""
+
+    def write_header(self):
+        self.file.write('digraph search {\n  node [shape=box, fontname="monospace"];\n')
+
+    def write_footer(self):
+        self.file.write('}\n')
+
+    def write_node(self, node_id, parent_id, ply, move, alpha, beta, score, cutoff, aborted):
+        label = 'ROOT' if move is None else repr(move)
+        value = 'aborted' if aborted else _number(score)
+        details = f"{label}\\nscore={value} [{_number(alpha)}, {_number(beta)}]"
+        style = ', color=red' if cutoff else ''
+        self.file.write(f'  n{node_id} [label="{details}"{style}];\n')
+        if parent_id is not None:
+            self.file.write(f'  n{parent_id} -> n{node_id};\n')
@@ -0,0 +1,235 @@
+'''
+Ajuste de los pesos de GameState.evaluate() por autojuego en paralelo.
+
+Se juegan muchas partidas IA contra IA repartidas en un pool de procesos (uno
+por núcleo). De cada partida se guardan, para sus posiciones de decisión, los
+tres términos de la heurística (ventaja de LP, de mano y de poder en campo)
+junto con el resultado final. Después se ajusta un modelo logístico al estilo
+Texel:
+
+    P(gana la IA) = sigmoid(c_lp·ΔLP + c_hand·ΔMano + c_board·ΔCampo)
+
+Como MiniMax sólo depende del orden de las puntuaciones, los pesos se
+normalizan con LP_WEIGHT = 1 (HAND_WEIGHT = c_hand / c_lp, etc.) y se escriben
+en data/eval_weights.json, que GameState carga al importarse.
+
+Cada partida terminada se añade a <state-dir>/games.jsonl, así que si se
+interrumpe el proceso basta con volver a lanzarlo: las semillas ya jugadas se
+saltan. Con --rounds > 1, cada ronda juega con los pesos ajustados en la anterior.
+
+Uso (desde src/):
+    python -m model.ai.tuning --games 2000 --depth 1 --rounds 2
+'''
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model.game import gamestate
+from model.game.gamestate import GameState
+from model.game.setup import DATA_DIR, load_catalog
+from model.ai.selfplay import SearchPlayer, play_game
+
+STATE_DIR = os.path.join(DATA_DIR, 'tuning')
+GAMES_FILE = 'games.jsonl'
+
+# Una de cada POSITION_STRIDE posiciones de decisión entra en el ajuste
+# (las consecutivas están muy correlacionadas).
+POSITION_STRIDE = 4
+
+# Escala de cada término para que el ajuste esté bien condicionado
+_TERM_SCALES = np.array([1000.0, 1.0, 1000.0])
+
+# Catálogo del proceso trabajador (se carga una vez por proceso)
+_worker_catalog = None
+
+
+def position_terms(state: GameState) -> Tuple[int, int, int]:
+    """(ΔLP, ΔMano, ΔCampo) desde la perspectiva de la IA, como en evaluate()."""
+    ai, opponent = state.ai_player, state.player
+    return (
+        ai.life_points - opponent.life_points,
+        len(ai.hand) - len(opponent.hand),
+        ai.field.power - opponent.field.power,
+    )
+
+
+def current_weights() -> Dict[str, float]:
+    return {
+        'LP_WEIGHT': gamestate.LP_WEIGHT,
+        'HAND_WEIGHT': gamestate.HAND_WEIGHT,
+        'BOARD_POWER_WEIGHT': gamestate.BOARD_POWER_WEIGHT,
+    }
+
+
+# ----------------------------------------------------------------------
+# --- Trabajadores ---
+# ----------------------------------------------------------------------
+
+def _init_worker():
+    global _worker_catalog
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _worker_catalog = load_catalog()
+
+
+def _play(job: Tuple[int, int, int, Dict[str, float]]) -> dict:
+    """Juega una partida con los pesos indicados y devuelve su registro serializable."""
+    round_index, seed, depth, weights = job
+    gamestate.set_eval_weights(weights['LP_WEIGHT'], weights['HAND_WEIGHT'], weights['BOARD_POWER_WEIGHT'])
+    all_cards, all_recipes = _worker_catalog
+    config = SearchPlayer(depth=depth)
+    record = play_game(all_cards, all_recipes, seed, ai=config, player=config, exploration=0.1)
+    return {
+        'round': round_index,
+        'seed': seed,
+        'winner': record.winner,
+        'outcome': record.outcome('ai'),
+        'terms': [position_terms(state) for state in record.positions[::POSITION_STRIDE]],
+    }
+
+
+def play_round(
+    round_index: int,
+    seeds: Sequence[int],
+    depth: int,
+    weights: Dict[str, float],
+    games_path: str,
+    workers: Optional[int] = None
+) -> int:
+    """
+    Juega en paralelo las partidas de `seeds` que aún no estén en `games_path`
+    y las va añadiendo al fichero según terminan. Devuelve las partidas jugadas.
+    """
+    done = {(game['round'], game['seed']) for game in read_games(games_path)}
+    jobs = [(round_index, seed, depth, weights) for seed in seeds if (round_index, seed) not in done]
+    if not jobs:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Ronda {round_index}: {len(jobs)} partidas pendientes en {workers} procesos "
+          f"(ya jugadas: {len(seeds) - len(jobs)}).")
+    start = time.perf_counter()
+    played = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool, open(games_path, 'a', encoding='utf-8') as out:
+        for game in pool.imap_unordered(_play, jobs, chunksize=4):
+            out.write(json.dumps(game) + '\n')
+            out.flush()
+            played += 1
+            if played % 100 == 0:
+                rate = played / (time.perf_counter() - start)
+                print(f"  {played}/{len(jobs)} partidas ({rate:.1f}/s)")
+    return played
+
+
+def read_games(games_path: str) -> List[dict]:
+    """Lee las partidas guardadas (ignora una última línea truncada por una interrupción)."""
+    if not os.path.exists(games_path):
+        return []
+    games = []
+    with open(games_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                games.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return games
+
+
+# ----------------------------------------------------------------------
+# --- Ajuste (Texel) ---
+# ----------------------------------------------------------------------
+
+def build_dataset(games: Sequence[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Matriz de términos (escalados) y resultados; cada posición se añade también espejada."""
+    rows: List[Tuple[int, int, int]] = []
+    labels: List[float] = []
+    for game in games:
+        for terms in game['terms']:
+            rows.append(tuple(terms))
+            labels.append(game['outcome'])
+            rows.append(tuple(-t for t in terms))
+            labels.append(1.0 - game['outcome'])
+    X = np.array(rows, dtype=np.float64).reshape(len(rows), 3) / _TERM_SCALES
+    return X, np.array(labels, dtype=np.float64)
+
+
+def fit_weights(X: np.ndarray, y: np.ndarray, l2: float = 1e-3, iterations: int = 50) -> Dict[str, float]:
+    """
+    Regresión logística sin término independiente (Newton) y normalización de
+    los coeficientes a LP_WEIGHT = 1.
+    """
+    coef = np.zeros(X.shape[1])
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(X @ coef)))
+        gradient = X.T @ (p - y) / len(y) + l2 * coef
+        hessian = (X.T * (p * (1 - p))) @ X / len(y) + l2 * np.eye(X.shape[1])
+        step = np.linalg.solve(hessian, gradient)
+        coef -= step
+        if np.max(np.abs(step)) < 1e-9:
+            break
+
+    c_lp, c_hand, c_board = coef / _TERM_SCALES
+    if c_lp <= 0:
+        raise ValueError("El ajuste no da peso positivo a los LP; hacen falta más partidas.")
+    return {
+        'LP_WEIGHT': 1.0,
+        'HAND_WEIGHT': float(c_hand / c_lp),
+        'BOARD_POWER_WEIGHT': float(c_board / c_lp),
+    }
+
+
+def save_weights(weights: Dict[str, float], path: str = gamestate.EVAL_WEIGHTS_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(weights, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajusta los pesos de la heurística por autojuego.")
+    parser.add_argument('--games', type=int, default=2000, help="Partidas por ronda")
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--depth', type=int, default=1, help="Profundidad de búsqueda en el autojuego")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--state-dir', default=STATE_DIR, help="Directorio de progreso (para reanudar)")
+    parser.add_argument('--out', default=gamestate.EVAL_WEIGHTS_FILE)
+    args = parser.parse_args()
+
+    os.makedirs(args.state_dir, exist_ok=True)
+    games_path = os.path.join(args.state_dir, GAMES_FILE)
+    weights_path = os.path.join(args.state_dir, 'weights.json')
+
+    # Pesos de cada ronda: la 0 usa los actuales; las siguientes, el ajuste de la anterior
+    history: Dict[str, Dict[str, float]] = {}
+    if os.path.exists(weights_path):
+        with open(weights_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history.setdefault('0', current_weights())
+
+    for round_index in range(args.rounds):
+        weights = history[str(round_index)]
+        seeds = range(args.seed + round_index * args.games, args.seed + (round_index + 1) * args.games)
+        play_round(round_index, seeds, args.depth, weights, games_path, workers=args.workers)
+
+        games = [game for game in read_games(games_path) if game['round'] == round_index]
+        X, y = build_dataset(games)
+        fitted = fit_weights(X, y)
+        print(f"Ronda {round_index}: {len(games)} partidas, {len(X)} posiciones -> {fitted}")
+
+        history[str(round_index + 1)] = fitted
+        with open(weights_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+
+    final = history[str(args.rounds)]
+    save_weights(final, args.out)
+    print(f"Pesos guardados en {args.out}: {final}")
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,8 @@ class Card:
         self.stars = stars
         self.position = 'atk'  # 'atk' o 'def' (ataque o defensa)
         self.image = image
+        # Id entero denso dentro del catálogo; lo asigna CardTable (model.cards.card_table)
+        self.id: Optional[int] = None
 
     def __repr__(self):
 
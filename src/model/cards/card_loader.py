@@ -6,6 +6,7 @@ JSON y convertirlos en instancias de la clase Card.
 '''
 import json
 from .card import Card
+from .card_table import get_card_table
 import os
 
 
@@ -65,5 +66,8 @@ def load_cards(filepath: str) -> dict:
             print(f"Error inesperado al procesar carta: {e}")
             continue
 
+    # Ids enteros densos y columnas del catálogo (asigna card.id)
+    get_card_table(all_cards)
+
     print(f"Las cartas han sido cargadas correctamente desde {filepath}.")
     return all_cards
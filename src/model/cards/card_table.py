@@ -0,0 +1,74 @@
+'''
+Catálogo de cartas en columnas NumPy con ids enteros densos.
+
+Cada carta del catálogo recibe un id entero (0..N-1, en orden de número de
+carta) que se guarda en card.id. Los atributos que usan el motor y la IA se
+guardan en columnas indexadas por id:
+
+    attack, defense   int32
+    stars             int8
+    image_index       int16 (índice en `images`, -1 si la carta no tiene imagen)
+
+Los objetos Card siguen disponibles (table.cards[id]) para la interfaz. Sobre
+estos ids trabajan la tabla de combates, la tabla de fusiones, el estado
+empaquetado y el tablero de búsqueda.
+'''
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .card import Card
+
+
+class CardTable:
+    """Columnas del catálogo e índice número -> id."""
+
+    def __init__(self, all_cards: Dict[str, Card]):
+        cards = sorted(all_cards.values(), key=lambda card: card.number)
+        self.size = len(all_cards)
+        self.cards: List[Card] = cards
+        self.numbers: List[str] = [card.number for card in cards]
+        self.names: List[str] = [card.name for card in cards]
+        self.index: Dict[str, int] = {number: i for i, number in enumerate(self.numbers)}
+
+        self.images: List[str] = sorted({card.image for card in cards if card.image})
+        image_ids = {image: i for i, image in enumerate(self.images)}
+
+        self.attack = np.array([card.attack for card in cards], dtype=np.int32)
+        self.defense = np.array([card.defense for card in cards], dtype=np.int32)
+        self.stars = np.array([card.stars for card in cards], dtype=np.int8)
+        self.image_index = np.array([image_ids.get(card.image, -1) for card in cards], dtype=np.int16)
+
+        for i, card in enumerate(cards):
+            card.id = i
+
+    def card(self, card_id: int) -> Card:
+        """Vista Card de un id (para la interfaz)."""
+        return self.cards[card_id]
+
+    def id_of(self, card: Card) -> Optional[int]:
+        """Id de `card` en este catálogo, o None si no pertenece a él."""
+        card_id = card.id
+        if card_id is not None and card_id < self.size and self.cards[card_id] is card:
+            return card_id
+        return self.index.get(card.number)
+
+
+# Caché de tablas por catálogo: id(all_cards) -> (all_cards, tabla)
+_tables: Dict[int, Tuple[Dict[str, Card], CardTable]] = {}
+
+
+def get_card_table(all_cards: Dict[str, Card]) -> CardTable:
+    """Devuelve la tabla del catálogo, construyéndola si es nuevo o ha cambiado de tamaño."""
+    cached = _tables.get(id(all_cards))
+    if cached is not None and cached[0] is all_cards and cached[1].size == len(all_cards):
+        return cached[1]
+    table = CardTable(all_cards)
+    _tables[id(all_cards)] = (all_cards, table)
+    return table
+
+
+def invalidate_card_tables():
+    """Descarta todas las tablas (p. ej. tras modificar cartas del catálogo en el sitio)."""
+    _tables.clear()
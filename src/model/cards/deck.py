@@ -1,13 +1,13 @@
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
-def random_deck(all_cards: Dict[str, Any], deck_size: int) -> List[Any]:
+def random_deck(all_cards: Dict[str, Any], deck_size: int, seed: Optional[int] = None) -> List[Any]:
     '''
     Crea un mazo de cartas seleccionando aleatoriamente 'deck_size' cartas
-    del conjunto de cartas disponibles.
+    del conjunto de cartas disponibles. Con 'seed' el mazo es reproducible.
     '''
     # === CORRECCIÓN CLAVE: deck_size viene del argumento, no es fijo ===
-    rng = np.random.default_rng() 
+    rng = np.random.default_rng(seed)
     
     card_array = np.array(list(all_cards.values()))
     
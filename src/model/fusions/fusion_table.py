@@ -0,0 +1,112 @@
+'''
+Tabla de fusiones por pareja de ids de carta.
+
+get_fusion_result compara los números de carta (strings) contra todas las
+recetas en cada consulta. Con el catálogo y las recetas conocidos, el resultado
+de cada pareja se precalcula en una matriz NumPy N x N de ids (-1 si no hay
+fusión), con la misma regla: gana la primera receta que coincide y, si su
+resultado no está en el catálogo, la pareja no fusiona.
+'''
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model.cards.card import Card
+from model.cards.card_table import get_card_table
+from .fusion_recipe import FusionRecipe, get_fusion_result
+
+NO_FUSION = -1
+
+
+class FusionTable:
+    """Resultados de fusión precalculados para un catálogo y sus recetas."""
+
+    def __init__(self, all_cards: Dict[str, Card], all_recipes: Sequence[FusionRecipe]):
+        self.all_cards = all_cards
+        self.all_recipes = all_recipes
+        self.cards = get_card_table(all_cards)
+        self.size = len(all_cards)
+        self.recipe_count = len(all_recipes)
+
+        index = self.cards.index
+        n = self.cards.size
+        result = np.full((n, n), NO_FUSION, dtype=np.int32)
+        # En orden inverso, para que la primera receta que coincide sea la que queda
+        for recipe in reversed(all_recipes):
+            a = index.get(recipe.material_1_id)
+            b = index.get(recipe.material_2_id)
+            if a is None or b is None:
+                continue
+            result_id = index[recipe.result_id] if recipe.result_id in all_cards else NO_FUSION
+            result[a, b] = result_id
+            result[b, a] = result_id
+        self.result = result
+        # Copia en listas para las consultas sueltas desde Python (más rápidas que indexar el array)
+        self.rows: List[List[int]] = result.tolist()
+
+    def result_id(self, card_id1: int, card_id2: int) -> int:
+        """Id del resultado de fusionar dos ids, o NO_FUSION."""
+        return self.rows[card_id1][card_id2]
+
+    def fuse(self, card1: Card, card2: Card) -> Optional[Card]:
+        """Carta resultante de fusionar dos cartas, o None (como get_fusion_result + catálogo)."""
+        a = self.cards.id_of(card1)
+        b = self.cards.id_of(card2)
+        if a is None or b is None:
+            # Cartas fuera del catálogo: se consultan las recetas directamente
+            result_number = get_fusion_result(card1, card2, self.all_recipes)
+            return self.all_cards.get(result_number) if result_number else None
+        result = self.rows[a][b]
+        return self.cards.cards[result] if result != NO_FUSION else None
+
+    def fusion_pairs(self, cards: Sequence[Card], distinct: bool = False) -> List[Tuple[int, int, Card]]:
+        """
+        (i, j, resultado) para cada pareja i < j de `cards` que fusiona, en orden.
+        Con distinct=True sólo la primera pareja de cada par distinto de cartas
+        (la mano como multiconjunto).
+        """
+        ids = [self.cards.id_of(card) for card in cards]
+        if None in ids:
+            pairs = [
+                (i, j, result)
+                for i in range(len(cards)) for j in range(i + 1, len(cards))
+                for result in (self.fuse(cards[i], cards[j]),) if result is not None
+            ]
+            return _distinct_pairs(pairs, [id(card) for card in cards]) if distinct else pairs
+        rows, views = self.rows, self.cards.cards
+        pairs = []
+        for i, a in enumerate(ids):
+            row = rows[a]
+            for j in range(i + 1, len(ids)):
+                result = row[ids[j]]
+                if result != NO_FUSION:
+                    pairs.append((i, j, views[result]))
+        return _distinct_pairs(pairs, ids) if distinct else pairs
+
+
+def _distinct_pairs(pairs: List[Tuple[int, int, Card]], keys: Sequence[int]) -> List[Tuple[int, int, Card]]:
+    """Deja la primera pareja (i, j) de cada par no ordenado de claves."""
+    seen = set()
+    result = []
+    for pair in pairs:
+        a, b = keys[pair[0]], keys[pair[1]]
+        key = (a, b) if a <= b else (b, a)
+        if key not in seen:
+            seen.add(key)
+            result.append(pair)
+    return result
+
+# Caché de tablas por catálogo: (id(all_cards), id(all_recipes)) -> tabla
+_tables: Dict[Tuple[int, int], FusionTable] = {}
+
+
+def get_fusion_table(all_cards: Dict[str, Card], all_recipes: Sequence[FusionRecipe]) -> FusionTable:
+    """Devuelve la tabla del catálogo, construyéndola si es nueva o ha cambiado de tamaño."""
+    key = (id(all_cards), id(all_recipes))
+    table = _tables.get(key)
+    if (table is not None and table.all_cards is all_cards and table.all_recipes is all_recipes
+            and table.size == len(all_cards) and table.recipe_count == len(all_recipes)):
+        return table
+    table = _tables[key] = FusionTable(all_cards, all_recipes)
+    return table
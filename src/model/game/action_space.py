@@ -0,0 +1,291 @@
+'''
+Espacio de acciones fijo: cada jugada como un entero pequeño.
+
+Move es una dataclass de nueve campos que el generador crea para cada jugada
+legal de cada nodo. Aquí el conjunto de todas las jugadas posibles se numera
+de una vez (para un tamaño máximo de mano) y las jugadas legales de un estado
+se devuelven como una máscara booleana NumPy, sin crear ningún Move:
+
+    PASS_BASE      4 PASS: a Main, a Battle, a End y cambio de turno
+    SUMMON_BASE    2 por índice de mano: SUMMON en ATK y SET en DEF
+    FUSION_BASE    1 por pareja de índices de mano i < j (orden i, j)
+    POSITION_BASE  2 por slot propio: cambio a ATK y cambio a DEF
+    ATTACK_BASE    (slots + 1) por slot atacante: ataque directo y a cada slot rival
+
+El slot destino de invocaciones y fusiones y la carta de card_id no forman
+parte de la acción: se deducen del estado al decodificar. Los índices están
+ordenados como el generador, así que np.flatnonzero(mask) da las jugadas en el
+orden de GameState.get_possible_moves() y decode() devuelve Moves iguales a los
+suyos. Las invocaciones con tributos (que sólo crea la interfaz) no están en el
+espacio.
+
+Las jugadas se decodifican a Move sólo en la frontera con el controlador (o,
+sobre un SearchBoard, a los Move cacheados del códec, sin crear objetos).
+'''
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model.fusions.fusion_table import NO_FUSION, get_fusion_table
+from .field import Field
+from .gamestate import GameState
+from .move import ActionType, Move, Position
+from .packed import ATTACKED_FLAG, BATTLE, DEF_FLAG, DRAW, EMPTY, END, MAIN, PHASES
+from .search_board import SearchBoard
+
+MONSTER_SLOTS = Field.MONSTER_SLOTS
+
+# Mano máxima representable: mazo de 40 más la mano inicial, con margen
+MAX_HAND = 64
+
+PASS_TARGETS = ('main', 'battle', 'end', 'change_turn')
+PASS_MAIN, PASS_BATTLE, PASS_END, PASS_CHANGE_TURN = range(len(PASS_TARGETS))
+
+
+class ActionSpace:
+    """Numeración de las jugadas para manos de hasta `max_hand` cartas."""
+
+    def __init__(self, max_hand: int = MAX_HAND):
+        self.max_hand = max_hand
+        self.summon_base = len(PASS_TARGETS)
+        self.fusion_base = self.summon_base + 2 * max_hand
+        self.pairs: List[Tuple[int, int]] = [(i, j) for i in range(max_hand) for j in range(i + 1, max_hand)]
+        self.pair_index: Dict[Tuple[int, int], int] = {pair: k for k, pair in enumerate(self.pairs)}
+        self.position_base = self.fusion_base + len(self.pairs)
+        self.attack_base = self.position_base + 2 * MONSTER_SLOTS
+        self.size = self.attack_base + MONSTER_SLOTS * (MONSTER_SLOTS + 1)
+
+    # ------------------------------------------------------------------
+    # --- Codificación ---
+    # ------------------------------------------------------------------
+
+    def pass_action(self, target_zone: str) -> int:
+        return PASS_TARGETS.index(target_zone)
+
+    def summon_action(self, hand_index: int, set_card: bool = False) -> int:
+        return self.summon_base + 2 * hand_index + (1 if set_card else 0)
+
+    def fusion_action(self, i: int, j: int) -> int:
+        return self.fusion_base + self.pair_index[(i, j) if i < j else (j, i)]
+
+    def position_action(self, slot: int, position: Position) -> int:
+        return self.position_base + 2 * slot + (1 if position == Position.FACE_UP_DEF else 0)
+
+    def attack_action(self, attacker: int, target: int) -> int:
+        return self.attack_base + attacker * (MONSTER_SLOTS + 1) + target + 1
+
+    def encode(self, move: Move) -> int:
+        """Índice de la jugada. ValueError si no pertenece al espacio."""
+        try:
+            action = move.action_type
+            if action == ActionType.PASS:
+                return self.pass_action(move.target_zone)
+            if action in (ActionType.SUMMON, ActionType.SET) and not move.fusion_materials_indices:
+                if move.source_index < self.max_hand:
+                    return self.summon_action(move.source_index, action == ActionType.SET)
+            elif action == ActionType.FUSION_SUMMON:
+                return self.fusion_action(*move.fusion_materials_indices)
+            elif action == ActionType.CHANGE_POSITION:
+                if 0 <= move.source_index < MONSTER_SLOTS:
+                    return self.position_action(move.source_index, move.position)
+            elif action == ActionType.ATTACK:
+                if 0 <= move.source_index < MONSTER_SLOTS and -1 <= move.target_index < MONSTER_SLOTS:
+                    return self.attack_action(move.source_index, move.target_index)
+        except (KeyError, TypeError, ValueError):
+            pass
+        raise ValueError(f"La jugada no pertenece al espacio de acciones: {move}")
+
+    # ------------------------------------------------------------------
+    # --- Decodificación ---
+    # ------------------------------------------------------------------
+
+    def describe(self, action: int) -> Tuple:
+        """(tipo, a, b) de un índice, sin estado: a y b son índices de mano o de slot."""
+        if not 0 <= action < self.size:
+            raise ValueError(f"Acción fuera del espacio: {action}")
+        if action < self.summon_base:
+            return ActionType.PASS, action, None
+        if action < self.fusion_base:
+            index, is_set = divmod(action - self.summon_base, 2)
+            return (ActionType.SET if is_set else ActionType.SUMMON), index, None
+        if action < self.position_base:
+            i, j = self.pairs[action - self.fusion_base]
+            return ActionType.FUSION_SUMMON, i, j
+        if action < self.attack_base:
+            slot, to_def = divmod(action - self.position_base, 2)
+            return ActionType.CHANGE_POSITION, slot, (Position.FACE_UP_DEF if to_def else Position.FACE_UP_ATK)
+        attacker, target = divmod(action - self.attack_base, MONSTER_SLOTS + 1)
+        return ActionType.ATTACK, attacker, target - 1
+
+    def decode(self, state: GameState, action: int) -> Move:
+        """El Move que get_possible_moves() generaría para `action` en `state`."""
+        kind, a, b = self.describe(action)
+        if kind == ActionType.PASS:
+            return Move(action_type=ActionType.PASS, target_zone=PASS_TARGETS[a])
+        if kind == ActionType.CHANGE_POSITION:
+            return Move(action_type=ActionType.CHANGE_POSITION, source_index=a, position=b)
+        if kind == ActionType.ATTACK:
+            return Move(action_type=ActionType.ATTACK, source_index=a, target_index=b)
+
+        acting = state.ai_player if state.current_turn == 'ai' else state.player
+        empty = acting.field.get_empty_slot_index()
+        if kind == ActionType.FUSION_SUMMON:
+            result = get_fusion_table(state.all_cards, state.all_recipes).fuse(
+                acting.hand.cards[a], acting.hand.cards[b]
+            )
+            if result is None:
+                raise ValueError(f"Las cartas {a} y {b} de la mano no fusionan.")
+            return Move(
+                action_type=ActionType.FUSION_SUMMON, card_id=result.number, source_zone='hand',
+                target_zone='field', target_index=empty, fusion_materials_indices=(a, b)
+            )
+        return Move(
+            action_type=kind, card_id=acting.hand.cards[a].number, source_zone='hand',
+            target_index=empty, source_index=a,
+            position=Position.FACE_UP_DEF if kind == ActionType.SET else Position.FACE_UP_ATK
+        )
+
+    def decode_board(self, board: SearchBoard, action: int) -> Move:
+        """Como decode() sobre un SearchBoard, devolviendo los Move cacheados del códec."""
+        codec = board.codec
+        move = codec._move
+        kind, a, b = self.describe(action)
+        if kind == ActionType.PASS:
+            zone = PASS_TARGETS[a]
+            return move(('pass', zone), action_type=ActionType.PASS, target_zone=zone)
+        if kind == ActionType.CHANGE_POSITION:
+            return move((ActionType.CHANGE_POSITION, a, b), action_type=ActionType.CHANGE_POSITION, source_index=a, position=b)
+        if kind == ActionType.ATTACK:
+            return move((ActionType.ATTACK, a, b), action_type=ActionType.ATTACK, source_index=a, target_index=b)
+
+        acting = board.players[board.turn]
+        empty = acting.slots.index(EMPTY) if EMPTY in acting.slots else None
+        if kind == ActionType.FUSION_SUMMON:
+            result = codec.fusions[acting.hand[a]][acting.hand[b]]
+            if result == NO_FUSION:
+                raise ValueError(f"Las cartas {a} y {b} de la mano no fusionan.")
+            return move(
+                (ActionType.FUSION_SUMMON, result, empty, a, b),
+                action_type=ActionType.FUSION_SUMMON, card_id=codec.numbers[result], source_zone='hand',
+                target_zone='field', target_index=empty, fusion_materials_indices=(a, b)
+            )
+        number = codec.numbers[acting.hand[a]]
+        position = Position.FACE_UP_DEF if kind == ActionType.SET else Position.FACE_UP_ATK
+        return move(
+            (kind, number, empty, a),
+            action_type=kind, card_id=number, source_zone='hand',
+            target_index=empty, source_index=a, position=position
+        )
+
+    # ------------------------------------------------------------------
+    # --- Máscaras de legalidad ---
+    # ------------------------------------------------------------------
+
+    def legal_mask(self, state: GameState, distinct: bool = False, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Máscara booleana de las jugadas de state.get_possible_moves(distinct)."""
+        mask = self._clear(out)
+        if state.is_game_over():
+            return mask
+        acting, opponent = (state.ai_player, state.player) if state.current_turn == 'ai' else (state.player, state.ai_player)
+        slots = acting.field.monsters
+        hand = acting.hand
+        summons = pairs = ()
+        if state.phase == 'main':
+            summons = hand.distinct_indices() if distinct else range(len(hand))
+            if len(hand) >= 2:
+                fusions = get_fusion_table(state.all_cards, state.all_recipes)
+                pairs = [(i, j) for i, j, _ in fusions.fusion_pairs(hand.cards, distinct)]
+        self._fill(
+            mask, PHASES.index(state.phase), len(hand), summons, pairs, acting.can_normal_summon,
+            [slot is not None for slot in slots],
+            [slot is not None and slot[1] == Position.FACE_UP_DEF for slot in slots],
+            [slot is not None and slot[2] for slot in slots],
+            [slot is not None for slot in opponent.field.monsters]
+        )
+        return mask
+
+    def board_mask(self, board: SearchBoard, distinct: bool = False, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Máscara de las jugadas de board.moves(distinct), leída de las listas del tablero."""
+        mask = self._clear(out)
+        if board.is_game_over():
+            return mask
+        acting, opponent = board.players[board.turn], board.players[1 - board.turn]
+        hand = acting.hand
+        summons = pairs = ()
+        if board.phase == MAIN:
+            summons = [i for i, card in enumerate(hand) if not distinct or card not in hand[:i]]
+            rows = board.codec.fusions
+            seen = set()
+            pairs = []
+            for i in range(len(hand)):
+                row = rows[hand[i]]
+                for j in range(i + 1, len(hand)):
+                    if row[hand[j]] != NO_FUSION:
+                        if distinct:
+                            key = (hand[i], hand[j]) if hand[i] <= hand[j] else (hand[j], hand[i])
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                        pairs.append((i, j))
+        self._fill(
+            mask, board.phase, len(hand), summons, pairs, acting.can_summon,
+            [card != EMPTY for card in acting.slots],
+            [bool(flags & DEF_FLAG) for flags in acting.flags],
+            [bool(flags & ATTACKED_FLAG) for flags in acting.flags],
+            [card != EMPTY for card in opponent.slots]
+        )
+        return mask
+
+    def legal_masks(self, states: Sequence[GameState], distinct: bool = False) -> np.ndarray:
+        """Máscaras de varios estados como una matriz (len(states), size), p. ej. para una política por lotes."""
+        masks = np.zeros((len(states), self.size), dtype=bool)
+        for row, state in zip(masks, states):
+            self.legal_mask(state, distinct, out=row)
+        return masks
+
+    def legal_actions(self, state: GameState, distinct: bool = False) -> np.ndarray:
+        """Índices de las jugadas legales, en el orden de get_possible_moves()."""
+        return np.flatnonzero(self.legal_mask(state, distinct))
+
+    def _clear(self, out: Optional[np.ndarray]) -> np.ndarray:
+        if out is None:
+            return np.zeros(self.size, dtype=bool)
+        out[:] = False
+        return out
+
+    def _fill(
+        self, mask: np.ndarray, phase: int, hand_size: int, summons, pairs, can_summon: bool,
+        occupied: List[bool], in_defense: List[bool], attacked: List[bool], opponent_occupied: List[bool]
+    ):
+        """Reglas de get_possible_moves sobre una vista mínima del jugador que actúa."""
+        if hand_size > self.max_hand:
+            raise ValueError(f"Mano de {hand_size} cartas: el espacio admite {self.max_hand}.")
+        if phase == DRAW:
+            mask[PASS_MAIN] = True
+        elif phase == MAIN:
+            mask[PASS_BATTLE] = mask[PASS_END] = True
+            has_empty = not all(occupied)
+            if can_summon and has_empty:
+                for index in summons:
+                    base = self.summon_base + 2 * index
+                    mask[base] = mask[base + 1] = True
+            if has_empty:
+                for i, j in pairs:
+                    mask[self.fusion_base + self.pair_index[(i, j)]] = True
+            for slot in range(MONSTER_SLOTS):
+                if occupied[slot]:
+                    # Sólo el cambio a la posición contraria
+                    mask[self.position_base + 2 * slot + (0 if in_defense[slot] else 1)] = True
+        elif phase == BATTLE:
+            mask[PASS_END] = True
+            targets = [j for j in range(MONSTER_SLOTS) if opponent_occupied[j]] or [-1]
+            for i in range(MONSTER_SLOTS):
+                if occupied[i] and not in_defense[i] and not attacked[i]:
+                    for j in targets:
+                        mask[self.attack_base + i * (MONSTER_SLOTS + 1) + j + 1] = True
+        elif phase == END:
+            mask[PASS_CHANGE_TURN] = True
+
+
+ACTION_SPACE = ActionSpace()
@@ -0,0 +1,111 @@
+'''
+Tabla precalculada de resultados de combate para todas las parejas de cartas.
+
+Con el catálogo conocido al cargar las cartas, el resultado de cualquier
+ataque depende sólo de (atacante, defensor, posición del defensor). La tabla
+guarda, en un array NumPy de forma (N, N, 2, 4), para cada combinación:
+
+    [atacante destruido, defensor destruido, daño al atacante, daño al defensor]
+
+donde el daño es a los LP del dueño de cada monstruo, con filas y columnas
+indexadas por id de carta (model.cards.card_table). La usan la resolución de
+ataques en apply_move, la ordenación de jugadas y la detección de ataques
+letales. Se reconstruye sola cuando cambia el catálogo (otro diccionario de
+cartas o distinto número de cartas); si el catálogo se modifica en el sitio,
+hay que llamar a invalidate_battle_tables().
+'''
+
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from model.cards.card import Card
+from model.cards.card_table import get_card_table, invalidate_card_tables
+from .move import Position
+
+# Índice de la posición del defensor en la tabla
+POSITION_INDEX = {Position.FACE_UP_ATK: 0, Position.FACE_UP_DEF: 1}
+
+ATTACKER_DESTROYED, DEFENDER_DESTROYED, ATTACKER_DAMAGE, DEFENDER_DAMAGE = range(4)
+
+
+class BattleOutcome(NamedTuple):
+    """Resultado de un ataque contra un monstruo."""
+    attacker_destroyed: bool
+    defender_destroyed: bool
+    attacker_damage: int
+    defender_damage: int
+
+
+def resolve_battle(attacker: Card, defender: Card, defender_position: Position) -> BattleOutcome:
+    """Reglas de combate para una pareja concreta (sin tabla)."""
+    if defender_position == Position.FACE_UP_ATK:
+        # ATK vs ATK: el de menor ATK es destruido y su dueño recibe la diferencia
+        diff = attacker.attack - defender.attack
+        return BattleOutcome(diff <= 0, diff >= 0, max(-diff, 0), max(diff, 0))
+    # ATK vs DEF: el defensor sólo es destruido si su DEF es menor; si es mayor,
+    # el atacante recibe la diferencia. No hay daño al dueño del defensor.
+    diff = defender.defense - attacker.attack
+    return BattleOutcome(False, diff < 0, max(diff, 0), 0)
+
+
+class BattleTable:
+    """Resultados de combate precalculados para un catálogo de cartas."""
+
+    def __init__(self, all_cards: Dict[str, Card]):
+        # Filas y columnas son los ids de carta de CardTable
+        cards = get_card_table(all_cards)
+        self.size = len(all_cards)
+        self.cards = cards
+        self.index: Dict[str, int] = cards.index
+
+        attack = cards.attack.astype(np.int64)
+        defense = cards.defense.astype(np.int64)
+        n = cards.size
+
+        table = np.zeros((n, n, 2, 4), dtype=np.int64)
+
+        # Defensor en ATK: diferencia de ATK (filas = atacante, columnas = defensor)
+        diff = attack[:, None] - attack[None, :]
+        atk = table[:, :, POSITION_INDEX[Position.FACE_UP_ATK]]
+        atk[..., ATTACKER_DESTROYED] = diff <= 0
+        atk[..., DEFENDER_DESTROYED] = diff >= 0
+        atk[..., ATTACKER_DAMAGE] = np.maximum(-diff, 0)
+        atk[..., DEFENDER_DAMAGE] = np.maximum(diff, 0)
+
+        # Defensor en DEF: DEF del defensor contra ATK del atacante
+        diff = defense[None, :] - attack[:, None]
+        dfn = table[:, :, POSITION_INDEX[Position.FACE_UP_DEF]]
+        dfn[..., DEFENDER_DESTROYED] = diff < 0
+        dfn[..., ATTACKER_DAMAGE] = np.maximum(diff, 0)
+
+        self.table = table
+
+    def outcome(self, attacker: Card, defender: Card, defender_position: Position) -> BattleOutcome:
+        """Resultado del ataque; si alguna carta no está en el catálogo se calcula directamente."""
+        i = self.cards.id_of(attacker)
+        j = self.cards.id_of(defender)
+        if i is None or j is None:
+            return resolve_battle(attacker, defender, defender_position)
+        a_destroyed, d_destroyed, a_damage, d_damage = self.table[i, j, POSITION_INDEX[defender_position]].tolist()
+        return BattleOutcome(bool(a_destroyed), bool(d_destroyed), a_damage, d_damage)
+
+
+# Caché de tablas por catálogo: id(all_cards) -> (all_cards, tabla)
+_tables: Dict[int, Tuple[Dict[str, Card], BattleTable]] = {}
+
+
+def get_battle_table(all_cards: Dict[str, Card]) -> BattleTable:
+    """Devuelve la tabla del catálogo, construyéndola si es nuevo o ha cambiado de tamaño."""
+    cached = _tables.get(id(all_cards))
+    if cached is not None and cached[0] is all_cards and cached[1].size == len(all_cards):
+        return cached[1]
+    table = BattleTable(all_cards)
+    _tables[id(all_cards)] = (all_cards, table)
+    return table
+
+
+def invalidate_battle_tables():
+    """Descarta todas las tablas (p. ej. tras modificar cartas del catálogo en el sitio)."""
+    invalidate_card_tables()
+    _tables.clear()
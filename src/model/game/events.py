@@ -0,0 +1,110 @@
+'''
+Eventos de juego emitidos por GameState.apply_move.
+
+apply_move ya no imprime: cada ataque directo, cada combate resuelto y cada
+jugada rechazada se describe con un evento inmutable que se entrega al
+sumidero (`events`) que recibe la jugada. Un sumidero es cualquier función
+que acepta un evento; sin sumidero (el caso de la búsqueda) no se construye
+ningún evento ni se hace E/S.
+
+- print_events: reproduce en consola los mensajes de siempre (partida real).
+- EventLog: guarda los últimos eventos para mostrarlos en la interfaz y,
+  opcionalmente, los reenvía a otro sumidero.
+
+Cada evento sabe escribir su mensaje con text().
+'''
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, List, Optional, Union
+
+from model.cards.card import Card
+from .battle_table import BattleOutcome
+from .move import Move, Position
+
+
+@dataclass(frozen=True, slots=True)
+class DirectAttackEvent:
+    """Un monstruo ataca directamente a los LP del rival."""
+    attacker: str
+    defender: str
+    card: Card
+    damage: int
+
+    def text(self) -> str:
+        return f"¡{self.attacker} ataca directamente a {self.defender} por {self.damage} de daño!"
+
+
+@dataclass(frozen=True, slots=True)
+class BattleEvent:
+    """Combate entre dos monstruos y su resultado (tabla de combate)."""
+    attacker: str
+    defender: str
+    attacking_card: Card
+    defending_card: Card
+    defending_position: Position
+    outcome: BattleOutcome
+
+    def text(self) -> str:
+        outcome = self.outcome
+        if self.defending_position == Position.FACE_UP_ATK:
+            if outcome.attacker_destroyed and outcome.defender_destroyed:
+                return "Ambos monstruos son destruidos en una explosiva batalla (ATK vs ATK)."
+            if outcome.defender_destroyed:
+                return f"El monstruo de {self.attacker} destruye al de {self.defender} en batalla (ATK vs ATK)."
+            return f"El monstruo de {self.defender} destruye al de {self.attacker} en batalla (ATK vs ATK)."
+        if outcome.defender_destroyed:
+            return f"El monstruo de {self.attacker} destruye al de {self.defender} en batalla (ATK vs DEF)."
+        if outcome.attacker_damage:
+            return f"{self.attacker} recibe {outcome.attacker_damage} de daño por el contraataque del monstruo en DEF."
+        return f"El ataque de {self.attacker} no puede penetrar la defensa de {self.defender}."
+
+
+@dataclass(frozen=True, slots=True)
+class MoveErrorEvent:
+    """La jugada lanzó una excepción al aplicarse y se descartó."""
+    move: Move
+    error: Exception
+
+    def text(self) -> str:
+        if isinstance(self.error, ValueError):
+            return f"[GameState] Movimiento inválido al aplicar move: {self.error}"
+        return f"[GameState] Error al aplicar move: {self.error}"
+
+
+GameEvent = Union[DirectAttackEvent, BattleEvent, MoveErrorEvent]
+EventSink = Callable[[GameEvent], None]
+
+
+def print_events(event: GameEvent):
+    """Sumidero de consola: imprime el mensaje del evento."""
+    print(event.text())
+
+
+class EventLog:
+    """
+    Registro de los últimos eventos (para la interfaz). Es un sumidero: se
+    pasa directamente como `events` a apply_move.
+    """
+
+    def __init__(self, maxlen: Optional[int] = 50, forward: Optional[EventSink] = None):
+        self.events: Deque[GameEvent] = deque(maxlen=maxlen)
+        self.forward = forward
+
+    def __call__(self, event: GameEvent):
+        self.events.append(event)
+        if self.forward is not None:
+            self.forward(event)
+
+    def __iter__(self) -> Iterator[GameEvent]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def messages(self) -> List[str]:
+        """Mensajes de los eventos guardados, del más antiguo al más reciente."""
+        return [event.text() for event in self.events]
+
+    def clear(self):
+        self.events.clear()
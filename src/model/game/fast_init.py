@@ -0,0 +1,73 @@
+'''
+Constructores rápidos para las dataclasses inmutables del estado de juego.
+
+GameState, Player, Hand y Field son dataclasses frozen con __slots__. Su
+__init__ (y sobre todo dataclasses.replace, que además recorre los campos y
+llama a __init__ y __post_init__) cuesta varias veces más que escribir los
+slots directamente. fast_constructor(cls) genera una función que crea la
+instancia con object.__new__ y asigna cada slot con su descriptor, sin
+__post_init__: quien la llama debe pasar valores ya válidos (los métodos de
+copia de las propias clases y los builders de Player y GameState).
+
+Los campos con init=False no son parámetros: toman su valor por defecto o, si
+están en `derived`, el que calcula su función a partir de la instancia ya
+rellenada (p. ej. el hash cacheado). Los que estén en `cached` sí son
+parámetros, detrás de los campos init: son cachés que los métodos de copia
+mantienen de forma incremental (Field.power, el hash de Hand) y que no deben
+poder pasarse a __init__ ni a dataclasses.replace, donde se recalculan. Con
+`intern` el objeto construido se pasa por esa función (ver
+model.game.interning) y se devuelve su resultado.
+
+Los hashes cacheados dependen de la identidad de las cartas del proceso, así
+que recompute_on_load(cls, ...) instala un __setstate__ que los recalcula al
+deserializar.
+'''
+
+from dataclasses import fields
+from typing import Callable, Dict, Optional, Sequence
+
+
+def fast_constructor(
+    cls: type,
+    derived: Optional[Dict[str, Callable]] = None,
+    intern: Optional[Callable] = None,
+    cached: Sequence[str] = ()
+) -> Callable:
+    """Función make(campo1, campo2, ..., *cached) con los campos init de `cls` en orden de declaración."""
+    derived = derived or {}
+    all_fields = fields(cls)
+    names = [f.name for f in all_fields if f.init] + list(cached)
+    defaults = {
+        f.name: f.default for f in all_fields
+        if not f.init and f.name not in derived and f.name not in cached
+    }
+    namespace = {'_new': object.__new__, '_cls': cls, '_intern': intern}
+    for f in all_fields:
+        namespace[f'_set_{f.name}'] = getattr(cls, f.name).__set__
+    for name, value in defaults.items():
+        namespace[f'_default_{name}'] = value
+    for name, function in derived.items():
+        namespace[f'_derive_{name}'] = function
+    body = [f'    _set_{name}(obj, {name})' for name in names]
+    body += [f'    _set_{name}(obj, _default_{name})' for name in defaults]
+    body += [f'    _set_{name}(obj, _derive_{name}(obj))' for name in derived]
+    source = f"def make({', '.join(names)}):\n    obj = _new(_cls)\n" + '\n'.join(body)
+    source += "\n    return _intern(obj)\n" if intern is not None else "\n    return obj\n"
+    exec(source, namespace)
+    make = namespace['make']
+    make.__qualname__ = f'{cls.__name__}._new'
+    make.__doc__ = f"Construye un {cls.__name__} sin validación ni __post_init__."
+    return make
+
+
+def recompute_on_load(cls: type, recompute: Dict[str, Callable]):
+    """Al deserializar un `cls`, recalcula cada campo de `recompute` con su función."""
+    all_fields = fields(cls)
+
+    def __setstate__(obj, state):
+        for f, value in zip(all_fields, state):
+            object.__setattr__(obj, f.name, value)
+        for name, function in recompute.items():
+            object.__setattr__(obj, name, function(obj))
+
+    cls.__setstate__ = __setstate__
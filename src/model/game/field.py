@@ -1,18 +1,56 @@
-from typing import Optional, Tuple
+from typing import ClassVar, Optional, Tuple
 from model.cards.card import Card
 from model.game.move import Position
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field
+from .fast_init import fast_constructor, recompute_on_load
+from .interning import get_pool
 
-@dataclass(frozen=True)
+
+def slot_power(card: Card, position: Position) -> int:
+    """Poder de un monstruo en campo: ATK si está en ataque, DEF si está en defensa."""
+    return card.attack if position == Position.FACE_UP_ATK else card.defense
+
+
+@dataclass(frozen=True, slots=True, eq=False, weakref_slot=True)
 class Field:
     """
     Representa la zona de monstruos de un jugador de manera inmutable.
     Cada slot guarda una tupla (Card, Position, has_attacked) o None.
+
+    `power` es la suma de slot_power de todos los monstruos. Se calcula una vez
+    al construir el campo y después se actualiza de forma incremental en
+    place_monster, remove_monster y change_monster_position, de modo que la
+    heurística no tiene que recorrer los slots. No es un parámetro de __init__:
+    al construir con Field(...) o dataclasses.replace se recalcula.
+
+    El hash de los slots se calcula una vez al construir el campo; la igualdad
+    compara primero identidad y hash.
     """
 
-    MONSTER_SLOTS: int = 5
+    MONSTER_SLOTS: ClassVar[int] = 5
 
     monsters: Tuple[Optional[Tuple[Card, Position, bool]], ...] = (None,) * MONSTER_SLOTS
+    power: int = field(default=0, init=False, compare=False)
+    _hash: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        # Construcción pública (o dataclasses.replace): la caché se recalcula siempre
+        object.__setattr__(self, 'power', self.recompute_power())
+        object.__setattr__(self, '_hash', _field_hash(self))
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Field):
+            return NotImplemented
+        return self._hash == other._hash and self.monsters == other.monsters
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def recompute_power(self) -> int:
+        """Recalcula `power` recorriendo todos los slots (para verificación)."""
+        return sum(slot_power(slot[0], slot[1]) for slot in self.monsters if slot)
 
     def get_card_at(self, index: int) -> Optional[Card]:
         if 0 <= index < self.MONSTER_SLOTS and self.monsters[index]:
@@ -43,17 +81,18 @@ class Field:
         # When placing a monster, it hasn't attacked yet
         new_monsters_list[index] = (card, position, False)
 
-        return replace(self, monsters=tuple(new_monsters_list))
+        return _new_field(tuple(new_monsters_list), self.power + slot_power(card, position))
 
     def remove_monster(self, index: int) -> Tuple['Field', Card]:
         if not (0 <= index < self.MONSTER_SLOTS and self.monsters[index] is not None):
             raise ValueError("Slot de monstruo inválido o vacío.")
 
-        card_removed = self.monsters[index][0]
+        card_removed, position, _ = self.monsters[index]
         new_monsters_list = list(self.monsters)
         new_monsters_list[index] = None
 
-        return replace(self, monsters=tuple(new_monsters_list)), card_removed
+        new_field = _new_field(tuple(new_monsters_list), self.power - slot_power(card_removed, position))
+        return new_field, card_removed
 
     def change_monster_position(self, index: int, new_position: Position) -> 'Field':
         if not (0 <= index < self.MONSTER_SLOTS and self.monsters[index] is not None):
@@ -63,7 +102,10 @@ class Field:
         new_monsters_list = list(self.monsters)
         new_monsters_list[index] = (card, new_position, has_attacked)
 
-        return replace(self, monsters=tuple(new_monsters_list))
+        return _new_field(
+            tuple(new_monsters_list),
+            self.power - slot_power(card, current_pos) + slot_power(card, new_position)
+        )
 
     def mark_monster_attacked(self, index: int) -> 'Field':
         """Marca el monstruo del slot `index` como ya atacado."""
@@ -72,7 +114,7 @@ class Field:
         card, pos, _ = self.monsters[index]
         new_monsters_list = list(self.monsters)
         new_monsters_list[index] = (card, pos, True)
-        return replace(self, monsters=tuple(new_monsters_list))
+        return _new_field(tuple(new_monsters_list), self.power)
 
     def reset_attacks(self) -> 'Field':
         """Resetea el flag de ataque a False para todos los monstruos."""
@@ -83,11 +125,21 @@ class Field:
                 new_monsters_list.append((card, pos, False))
             else:
                 new_monsters_list.append(None)
-        return replace(self, monsters=tuple(new_monsters_list))
+        return _new_field(tuple(new_monsters_list), self.power)
 
     def __repr__(self) -> str:
         monsters_info = [
             f"[{i}]: {m[0].name[:10]} ({m[1].name[5:]}){'*' if m and m[2] else ''}" if m else f"[{i}]: Empty"
             for i, m in enumerate(self.monsters)
         ]
-        return f"Field({', '.join(monsters_info)})"
\ No newline at end of file
+        return f"Field({', '.join(monsters_info)})"
+
+
+def _field_hash(field: Field) -> int:
+    return hash(field.monsters)
+
+
+_pool = get_pool('Field', lambda a, b: a.monsters == b.monsters)
+# _new_field(monsters, power): los métodos de copia pasan el poder ya actualizado
+_new_field = fast_constructor(Field, derived={'_hash': _field_hash}, intern=_pool.intern, cached=('power',))
+recompute_on_load(Field, {'_hash': _field_hash})
@@ -1,22 +1,73 @@
+import json
+import os
 from dataclasses import dataclass, field, replace
-from typing import List, Dict, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 # Importaciones de los componentes modulares
 from model.cards.card import Card
-from model.fusions.fusion_recipe import FusionRecipe, get_fusion_result
-from .player import Player
+from model.fusions.fusion_recipe import FusionRecipe
+from model.fusions.fusion_table import get_fusion_table
+from .battle_table import get_battle_table
+from .events import BattleEvent, DirectAttackEvent, EventSink, MoveErrorEvent
+from .fast_init import fast_constructor, recompute_on_load
+from .player import Player, PlayerBuilder
 from .move import Move, ActionType, Position
 from model.cards.deck import random_deck
 
 # Constante para MiniMax (se asume que existe en un módulo ai/minimax o se define aquí)
 INF = float('inf') 
 
-@dataclass(frozen=True)
+# Ponderación de factores de la heurística (ajustada para el ejemplo). Si existe
+# data/eval_weights.json (generado por model.ai.tuning) se usan sus valores.
+LP_WEIGHT = 1.0
+HAND_WEIGHT = 50.0
+BOARD_POWER_WEIGHT = 0.2
+
+EVAL_WEIGHTS_FILE = os.environ.get(
+    'YUGIOH_EVAL_WEIGHTS',
+    os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'data', 'eval_weights.json'))
+)
+
+# Modo depuración: cada evaluate() se compara con la recomputación completa
+# (evaluate_full) y lanza AssertionError si difieren. Activar con YUGIOH_CHECK_EVAL=1.
+CHECK_INCREMENTAL_EVAL = os.environ.get('YUGIOH_CHECK_EVAL') == '1'
+
+# Modo depuración: cada apply_trusted() se compara con apply_move (el camino que
+# valida) y lanza AssertionError si difieren. Activar con YUGIOH_CHECK_APPLY=1.
+CHECK_TRUSTED_APPLY = os.environ.get('YUGIOH_CHECK_APPLY') == '1'
+
+
+def set_eval_weights(lp_weight: float, hand_weight: float, board_power_weight: float):
+    """Cambia los pesos de la heurística para todo el proceso."""
+    global LP_WEIGHT, HAND_WEIGHT, BOARD_POWER_WEIGHT
+    LP_WEIGHT, HAND_WEIGHT, BOARD_POWER_WEIGHT = float(lp_weight), float(hand_weight), float(board_power_weight)
+
+
+def load_eval_weights(path: str = EVAL_WEIGHTS_FILE) -> bool:
+    """Carga los pesos desde un JSON {"LP_WEIGHT", "HAND_WEIGHT", "BOARD_POWER_WEIGHT"}, si existe."""
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            weights = json.load(f)
+        set_eval_weights(weights['LP_WEIGHT'], weights['HAND_WEIGHT'], weights['BOARD_POWER_WEIGHT'])
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Advertencia: no se pudieron cargar los pesos de evaluación de {path}: {e}")
+        return False
+    return True
+
+
+load_eval_weights()
+
+@dataclass(frozen=True, slots=True, eq=False)
 class GameState:
     """
     El contenedor central que define el estado completo del juego.
     Utiliza instancias de Player para delegar el estado de mano, campo, etc.
     Es inmutable (frozen=True) para ser utilizado en el algoritmo MiniMax.
+
+    Como Player, Hand y Field, cachea su hash al construirse (a partir de los
+    hashes de los jugadores) y compara primero identidad y hash.
     """
     
     # --- Estructura Básica del Juego: DELEGACIÓN ---
@@ -28,6 +79,8 @@ class GameState:
     # --- Datos de Referencia (Se inicializan una vez) ---
     all_cards: Dict[str, Card] = field(default_factory=dict, compare=False)
     all_recipes: List[FusionRecipe] = field(default_factory=list, compare=False)
+
+    _hash: int = field(default=0, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Asegura la validez del estado (inmutable)."""
@@ -35,6 +88,20 @@ class GameState:
             raise ValueError("Turno inválido.")
         if self.phase not in ('draw', 'main', 'battle', 'end'):
             raise ValueError("Fase inválida.")
+        object.__setattr__(self, '_hash', _state_hash(self))
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (
+            self._hash == other._hash and self.current_turn == other.current_turn and self.phase == other.phase
+            and self.player == other.player and self.ai_player == other.ai_player
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
 
     def __repr__(self) -> str:
         return (
@@ -54,6 +121,7 @@ class GameState:
         """
         Función heurística para evaluar el estado desde la perspectiva de la IA (MAX player).
         Retorna un valor alto si la IA está ganando.
+        Es O(1): usa Field.power, que se mantiene de forma incremental.
         """
         # Devuelve un valor muy alto/bajo para los estados terminales
         if self.ai_player.life_points <= 0:
@@ -61,15 +129,39 @@ class GameState:
         if self.player.life_points <= 0:
             return INF # La IA ganó
 
-        # Ponderación de factores (ajustada para el ejemplo)
-        LP_WEIGHT = 1.0
-        HAND_WEIGHT = 50.0 
-        BOARD_POWER_WEIGHT = 0.2
-
         # 1. Ventaja de Life Points
         lp_advantage = self.ai_player.life_points - self.player.life_points
-        
-        # 2. Ventaja de Campo (ATK/DEF total en campo)
+
+        # 2. Ventaja de Campo (ATK/DEF total en campo, mantenido por Field.power)
+        field_advantage = (self.ai_player.field.power - self.player.field.power) * BOARD_POWER_WEIGHT
+
+        # 3. Cartas en mano (potencial)
+        hand_advantage = (len(self.ai_player.hand) - len(self.player.hand)) * HAND_WEIGHT
+
+        # Puntuación final: (Ventaja de la IA)
+        final_score = (lp_advantage * LP_WEIGHT) + field_advantage + hand_advantage
+
+        if CHECK_INCREMENTAL_EVAL:
+            expected = self.evaluate_full()
+            if final_score != expected:
+                raise AssertionError(
+                    f"Evaluación incremental {final_score} distinta de la completa {expected} en {self!r}"
+                )
+
+        return final_score
+
+    def evaluate_full(self) -> float:
+        """
+        Misma heurística que evaluate() pero recorriendo los slots de ambos
+        campos en lugar de usar Field.power. Sirve de referencia en modo depuración.
+        """
+        if self.ai_player.life_points <= 0:
+            return -INF
+        if self.player.life_points <= 0:
+            return INF
+
+        lp_advantage = self.ai_player.life_points - self.player.life_points
+
         ai_field_power = 0
         for slot in self.ai_player.field.monsters:
             if slot:
@@ -77,23 +169,18 @@ class GameState:
                 # ATK cuenta si está en ataque, DEF si está en defensa
                 power = card.attack if position == Position.FACE_UP_ATK else card.defense
                 ai_field_power += power
-                
+
         player_field_power = 0
         for slot in self.player.field.monsters:
             if slot:
                 card, position, _ = slot
                 power = card.attack if position == Position.FACE_UP_ATK else card.defense
                 player_field_power += power
-                
+
         field_advantage = (ai_field_power - player_field_power) * BOARD_POWER_WEIGHT
-        
-        # 3. Cartas en mano (potencial)
         hand_advantage = (len(self.ai_player.hand) - len(self.player.hand)) * HAND_WEIGHT
-        
-        # Puntuación final: (Ventaja de la IA)
-        final_score = (lp_advantage * LP_WEIGHT) + field_advantage + hand_advantage
-        
-        return final_score
+
+        return (lp_advantage * LP_WEIGHT) + field_advantage + hand_advantage
 
 
     # ----------------------------------------------------------------------
@@ -109,10 +196,15 @@ class GameState:
             
     # El método apply_move ahora debe actualizar las copias de los jugadores y crear un nuevo estado.
 
-    def get_possible_moves(self) -> List[Move]:
+    def get_possible_moves(self, distinct: bool = False) -> List[Move]:
         """
         Genera todos los movimientos legales posibles para el jugador actual 
         en la fase actual.
+
+        Con distinct=True la mano se trata como multiconjunto: las invocaciones
+        se generan una vez por carta distinta (con el índice de su primera
+        copia) y las fusiones una vez por pareja distinta de cartas. Las jugadas
+        omitidas llevan a posiciones equivalentes; es lo que usa la búsqueda.
         """
         if self.is_game_over():
             return []
@@ -134,101 +226,18 @@ class GameState:
             empty_slot_index = current_p.field.get_empty_slot_index()
 
             # 2. Invocación Normal / Set (si puede y hay slot)
-            if current_p.can_normal_summon and empty_slot_index is not None:
-                for idx, card in enumerate(current_p.hand.cards):
-                    # Asumimos que todas las cartas son Monstruos Invocables
-                    
-                    # Invocación en ATK
-                    moves.append(Move(
-                        action_type=ActionType.SUMMON, 
-                        card_id=card.number,
-                        source_zone='hand', 
-                        target_index=empty_slot_index,
-                        source_index=idx,
-                        position=Position.FACE_UP_ATK
-                    ))
-                    # Set en DEF (boca abajo)
-                    moves.append(Move(
-                        action_type=ActionType.SET, 
-                        card_id=card.number,
-                        source_zone='hand', 
-                        target_index=empty_slot_index,
-                        source_index=idx,
-                        position=Position.FACE_UP_DEF # Usamos esta para representar SET
-                    ))
-
+            moves += self._summon_moves(current_p, empty_slot_index, distinct)
             # 3. Fusión
-            if empty_slot_index is not None and len(current_p.hand) >= 2:
-                # Iterar sobre todas las combinaciones de 2 cartas en la mano
-                for i in range(len(current_p.hand)):
-                    for j in range(i + 1, len(current_p.hand)):
-                        card1 = current_p.hand.get_card_at(i)
-                        card2 = current_p.hand.get_card_at(j)
-                        
-                        if card1 and card2:
-                            result_id = get_fusion_result(card1, card2, self.all_recipes)
-                            
-                            if result_id and result_id in self.all_cards:
-                                moves.append(Move(
-                                    action_type=ActionType.FUSION_SUMMON, 
-                                    card_id=result_id,
-                                    source_zone='hand',
-                                    target_zone='field',
-                                    target_index=empty_slot_index,
-                                    fusion_materials_indices=(i, j)
-                                ))
-                                
+            moves += self._fusion_moves(current_p, empty_slot_index, distinct)
             # 4. Cambiar Posición 
-            for idx in range(current_p.field.MONSTER_SLOTS):
-                monster_slot = current_p.field.monsters[idx]
-                if monster_slot:
-                    # Permite cambiar de posición solo una vez por turno (simplificación)
-                    
-                    card, current_pos, _ = monster_slot
-                    # Cambio a ATK
-                    if current_pos != Position.FACE_UP_ATK:
-                        moves.append(Move(
-                            action_type=ActionType.CHANGE_POSITION,
-                            source_index=idx,
-                            position=Position.FACE_UP_ATK
-                        ))
-                    # Cambio a DEF
-                    if current_pos != Position.FACE_UP_DEF:
-                        moves.append(Move(
-                            action_type=ActionType.CHANGE_POSITION,
-                            source_index=idx,
-                            position=Position.FACE_UP_DEF
-                        ))
+            moves += self._position_moves(current_p)
 
         # --- FASE DE BATALLA (Battle Phase) ---
         elif self.phase == 'battle':
             # 1. Pasar a End
             moves.append(Move(action_type=ActionType.PASS, target_zone='end'))
-
             # 2. Ataque
-            # Monstruos que pueden atacar (asumimos que todos en ATK pueden atacar y que no hayan atacado ya)
-            for i in range(current_p.field.MONSTER_SLOTS):
-                monster_slot = current_p.field.monsters[i]
-                if monster_slot:
-                    # monster_slot is (Card, Position, has_attacked)
-                    _, pos, has_attacked = monster_slot
-                    if pos == Position.FACE_UP_ATK and not has_attacked:
-                        # a) Ataque directo a LP (si no hay monstruos en campo oponente)
-                        if all(slot is None for slot in opponent_p.field.monsters):
-                            moves.append(Move(
-                                action_type=ActionType.ATTACK,
-                                source_index=i,
-                                target_index=-1
-                            ))
-                        else:
-                            # b) Ataque a monstruos del oponente
-                            for j in range(opponent_p.field.MONSTER_SLOTS):
-                                if opponent_p.field.monsters[j] is not None:
-                                    moves.append(Move(
-                                        action_type=ActionType.ATTACK,
-                                        source_index=i,
-                                        target_index=j
-                                    ))
+            moves += self._attack_moves(current_p, opponent_p)
 
         # --- FASE FINAL (End Phase) ---
         elif self.phase == 'end':
@@ -237,249 +246,417 @@ class GameState:
 
         return moves
 
-    def apply_move(self, move: Move) -> 'GameState':
+    def get_distinct_moves(self) -> List[Move]:
+        """get_possible_moves(distinct=True), con la firma que espera la búsqueda."""
+        return self.get_possible_moves(True)
+
+    def iter_moves(self, distinct: bool = True) -> Iterator[Move]:
+        """
+        Las mismas jugadas que get_possible_moves(distinct), por etapas y en
+        orden de interés para la búsqueda. Cada etapa se genera sólo cuando
+        se llega a ella, así que tras una poda no se calculan las siguientes:
+
+            Main:   los PASS, fusiones, invocaciones y cambios de posición.
+            Battle: ataques letales, PASS a End y el resto de ataques.
+
+        Los PASS de Main van primero, como en get_possible_moves: con la
+        alternancia MAX/MIN por ply de la búsqueda son los que antes podan
+        (probar antes las fusiones multiplica los nodos).
+        """
+        if self.is_game_over():
+            return
+        current_p, opponent_p = self._get_current_players()
+
+        if self.phase == 'draw':
+            yield Move(action_type=ActionType.PASS, target_zone='main')
+
+        elif self.phase == 'main':
+            yield Move(action_type=ActionType.PASS, target_zone='battle')
+            yield Move(action_type=ActionType.PASS, target_zone='end')
+            empty_slot_index = current_p.field.get_empty_slot_index()
+            yield from self._fusion_moves(current_p, empty_slot_index, distinct)
+            yield from self._summon_moves(current_p, empty_slot_index, distinct)
+            yield from self._position_moves(current_p)
+
+        elif self.phase == 'battle':
+            attacks = self._attack_moves(current_p, opponent_p)
+            # Ataques que dejan al rival sin LP, leídos de la tabla de combates
+            table = get_battle_table(self.all_cards)
+            lethal = opponent_p.life_points
+            rest = []
+            for move in attacks:
+                attacker = current_p.field.monsters[move.source_index][0]
+                if move.target_index == -1:
+                    damage = attacker.attack
+                else:
+                    defender, defender_pos, _ = opponent_p.field.monsters[move.target_index]
+                    damage = table.outcome(attacker, defender, defender_pos).defender_damage
+                if damage >= lethal:
+                    yield move
+                else:
+                    rest.append(move)
+            yield Move(action_type=ActionType.PASS, target_zone='end')
+            yield from rest
+
+        elif self.phase == 'end':
+            yield Move(action_type=ActionType.PASS, target_zone='change_turn')
+
+    # --- Etapas del generador de jugadas ---
+
+    def _summon_moves(self, current_p: Player, empty_slot_index, distinct: bool) -> List[Move]:
+        """Invocación Normal / Set de cada carta de la mano (si puede y hay slot)."""
+        moves: List[Move] = []
+        if current_p.can_normal_summon and empty_slot_index is not None:
+            hand_cards = current_p.hand.cards
+            indices = current_p.hand.distinct_indices() if distinct else range(len(hand_cards))
+            for idx in indices:
+                card = hand_cards[idx]
+                # Asumimos que todas las cartas son Monstruos Invocables
+                
+                # Invocación en ATK
+                moves.append(Move(
+                    action_type=ActionType.SUMMON, 
+                    card_id=card.number,
+                    source_zone='hand', 
+                    target_index=empty_slot_index,
+                    source_index=idx,
+                    position=Position.FACE_UP_ATK
+                ))
+                # Set en DEF (boca abajo)
+                moves.append(Move(
+                    action_type=ActionType.SET, 
+                    card_id=card.number,
+                    source_zone='hand', 
+                    target_index=empty_slot_index,
+                    source_index=idx,
+                    position=Position.FACE_UP_DEF # Usamos esta para representar SET
+                ))
+        return moves
+
+    def _fusion_moves(self, current_p: Player, empty_slot_index, distinct: bool) -> List[Move]:
+        """Fusiones de cada pareja de cartas de la mano (si hay slot)."""
+        moves: List[Move] = []
+        if empty_slot_index is not None and len(current_p.hand) >= 2:
+            # Todas las combinaciones de 2 cartas de la mano, consultadas en la tabla de fusiones
+            fusions = get_fusion_table(self.all_cards, self.all_recipes)
+            for i, j, result_card in fusions.fusion_pairs(current_p.hand.cards, distinct):
+                moves.append(Move(
+                    action_type=ActionType.FUSION_SUMMON,
+                    card_id=result_card.number,
+                    source_zone='hand',
+                    target_zone='field',
+                    target_index=empty_slot_index,
+                    fusion_materials_indices=(i, j)
+                ))
+        return moves
+
+    def _position_moves(self, current_p: Player) -> List[Move]:
+        """Cambios de posición de los monstruos propios."""
+        moves: List[Move] = []
+        for idx in range(current_p.field.MONSTER_SLOTS):
+            monster_slot = current_p.field.monsters[idx]
+            if monster_slot:
+                # Permite cambiar de posición solo una vez por turno (simplificación)
+                
+                card, current_pos, _ = monster_slot
+                # Cambio a ATK
+                if current_pos != Position.FACE_UP_ATK:
+                    moves.append(Move(
+                        action_type=ActionType.CHANGE_POSITION,
+                        source_index=idx,
+                        position=Position.FACE_UP_ATK
+                    ))
+                # Cambio a DEF
+                if current_pos != Position.FACE_UP_DEF:
+                    moves.append(Move(
+                        action_type=ActionType.CHANGE_POSITION,
+                        source_index=idx,
+                        position=Position.FACE_UP_DEF
+                    ))
+        return moves
+
+    def _attack_moves(self, current_p: Player, opponent_p: Player) -> List[Move]:
+        """Ataques de los monstruos en ATK que aún no han atacado."""
+        moves: List[Move] = []
+        # Monstruos que pueden atacar (asumimos que todos en ATK pueden atacar y que no hayan atacado ya)
+        for i in range(current_p.field.MONSTER_SLOTS):
+            monster_slot = current_p.field.monsters[i]
+            if monster_slot:
+                # monster_slot is (Card, Position, has_attacked)
+                _, pos, has_attacked = monster_slot
+                if pos == Position.FACE_UP_ATK and not has_attacked:
+                    # a) Ataque directo a LP (si no hay monstruos en campo oponente)
+                    if all(slot is None for slot in opponent_p.field.monsters):
+                        moves.append(Move(
+                            action_type=ActionType.ATTACK,
+                            source_index=i,
+                            target_index=-1
+                        ))
+                    else:
+                        # b) Ataque a monstruos del oponente
+                        for j in range(opponent_p.field.MONSTER_SLOTS):
+                            if opponent_p.field.monsters[j] is not None:
+                                moves.append(Move(
+                                    action_type=ActionType.ATTACK,
+                                    source_index=i,
+                                    target_index=j
+                                ))
+        return moves
+
+    def apply_move(self, move: Move, events: Optional[EventSink] = None) -> 'GameState':
         """
         Retorna un NUEVO GameState que resulta de aplicar el movimiento dado.
+        Los cambios se acumulan en un GameStateBuilder, de modo que cada objeto
+        inmutable (GameState y cada Player modificado) se construye una sola vez.
+
+        Los ataques, combates y errores se notifican como eventos a `events`
+        (ver model.game.events); sin sumidero la jugada no hace ninguna E/S.
+
+        Es el camino que valida: acepta cualquier Move (entrada del usuario) y
+        devuelve el mismo estado si no es válido. Para las jugadas generadas por
+        el motor, la búsqueda usa apply_trusted().
+        """
+        tx = self.edit()
+        return tx.build() if self._apply_to(tx, move, events) else self
+
+    def try_move(self, move: Move, events: Optional[EventSink] = None) -> Tuple['GameState', bool]:
+        """
+        Como apply_move, pero devuelve también si la jugada cambió algo. Los
+        controladores lo usan para detectar jugadas sin efecto sin comparar
+        los estados en profundidad.
+        """
+        tx = self.edit()
+        if not self._apply_to(tx, move, events):
+            return self, False
+        return tx.build(), tx.changed()
+
+    def apply_trusted(self, move: Move) -> 'GameState':
         """
+        apply_move para jugadas generadas por el motor (get_possible_moves,
+        iter_moves y sus variantes): sin validación defensiva, sin try/except y
+        sin eventos. Una jugada que no venga del generador puede lanzar una
+        excepción o dejar un estado incoherente.
+
+        La única regla que se mantiene es la de los sacrificios: el generador
+        propone invocar cartas de 5 o más estrellas sin tributos y, como en
+        apply_move, esas jugadas devuelven el mismo estado.
+
+        Con YUGIOH_CHECK_APPLY=1 cada resultado se compara con el de apply_move.
+        """
+        tx = self.edit()
+        new_state = tx.build() if self._apply_unchecked(tx, move, None) else self
+        if CHECK_TRUSTED_APPLY:
+            _check_trusted_apply(self, move, new_state)
+        return new_state
+
+    def _apply_to(self, tx: 'GameStateBuilder', move: Move, events: Optional[EventSink] = None) -> bool:
+        """Valida la jugada y la aplica sobre `tx`. Devuelve False si no es válida."""
         # if self.is_game_over():
-        #     return self
+        #     return False
 
         try:
-            # Obtener copias de los jugadores (para modificar y crear un nuevo estado)
-            # Esto es crucial para la inmutabilidad
-            new_player, new_ai_player = self.player, self.ai_player
-
-            # Identificar quién está actuando
-            is_ai_turn = self.current_turn == 'ai'
-            acting_p = new_ai_player if is_ai_turn else new_player
-            opponent_p = new_player if is_ai_turn else new_ai_player
-
-            new_phase = self.phase
-            new_turn = self.current_turn
-
-            # --- Lógica de Transición de Fases (PASS) ---
-            if move.action_type == ActionType.PASS:
-                if move.target_zone == 'main':
-                    new_phase = 'main'
-                    # RESET: Permitir invocación normal al entrar a Main Phase
-                    acting_p = acting_p.get_copy_with_summon_used(False)
-                elif move.target_zone == 'battle':
-                    new_phase = 'battle'
-                    # Reset attack flags for acting player's field when entering Battle Phase
-                    try:
-                        new_field = acting_p.field.reset_attacks()
-                        acting_p = acting_p.get_copy_with_field(new_field)
-                    except Exception:
-                        pass
-                elif move.target_zone == 'end':
-                    new_phase = 'end'
-                elif move.target_zone == 'change_turn':
-
-                    # 1. Cambiar turno y fase
-                    new_turn = 'player' if self.current_turn == 'ai' else 'ai'
-                    new_phase = 'draw'
-
-                    # 2. Resetear flag de Invocación Normal para ambos jugadores
-                    new_player = new_player.get_copy_with_summon_used(False)
-                    new_ai_player = new_ai_player.get_copy_with_summon_used(False)
-
-                    # 3. Ejecutar Robo (Draw) para el jugador que recibe el turno
-                    next_acting_p = new_ai_player if new_turn == 'ai' else new_player
-                    next_acting_p, _ = next_acting_p.draw_card()
-
-                    if new_turn == 'ai':
-                        new_ai_player = next_acting_p
-                    else:
-                        new_player = next_acting_p
-
-            # --- Lógica de Acciones en Main Phase ---
-            elif self.phase == 'main':
-
-                if move.action_type in (ActionType.SUMMON, ActionType.SET):
-                    if move.target_index is None or move.source_index is None or not acting_p.can_normal_summon: return self
-
-                    card_to_place = acting_p.hand.get_card_at(move.source_index)
-                    if not card_to_place: return self
-
-                    # Verificar si la carta necesita sacrificios (tributos)
-                    tributes_needed = 0
-                    if card_to_place.stars >= 6:
-                        tributes_needed = 2
-                    elif card_to_place.stars >= 5:
-                        tributes_needed = 1
-
-                    # Si se necesitan sacrificios, validar que estén proporcionados
-                    if tributes_needed > 0:
-                        if not move.fusion_materials_indices or len(move.fusion_materials_indices) != tributes_needed:
-                            return self  # Sacrificios insuficientes
-
-                        # 1. Remover tributos (sacrificios) del campo, en orden descendente para evitar cambio de índices
-                        tribute_indices = sorted(move.fusion_materials_indices, reverse=True)
-                        new_field = acting_p.field
-                        for tribute_idx in tribute_indices:
-                            new_field, sacrificed_card = new_field.remove_monster(tribute_idx)
-                            # Opcionalmente, enviar al cementerio
-                            acting_p = acting_p.send_card_to_graveyard(sacrificed_card)
-
-                        acting_p = acting_p.get_copy_with_field(new_field)
-
-                    # 2. Retirar carta de la mano
-                    new_hand, _ = acting_p.hand.remove_card_at(move.source_index)
-
-                    # 3. Colocar carta en el campo
-                    position = move.position if move.position else Position.FACE_UP_ATK
-                    new_field = acting_p.field.place_monster(card_to_place, move.target_index, position)
-
-                    # 4. Actualizar jugador
-                    acting_p = acting_p.get_copy_with_hand(new_hand)
-                    acting_p = acting_p.get_copy_with_field(new_field)
-                    acting_p = acting_p.get_copy_with_summon_used(True) # Usa la invocación normal
-
-                elif move.action_type == ActionType.FUSION_SUMMON:
-                    if not move.fusion_materials_indices or move.target_index is None: return self
-
-                    idx1, idx2 = move.fusion_materials_indices
-                    card1 = acting_p.hand.get_card_at(idx1)
-                    card2 = acting_p.hand.get_card_at(idx2)
-
-                    # Obtener resultado de fusión
-                    result_id = get_fusion_result(card1, card2, self.all_recipes)
-                    if not result_id or result_id not in self.all_cards: return self
-
-                    result_card = self.all_cards[result_id]
-
-                    # 1. Remover materiales (el índice mayor primero para no cambiar el menor)
-                    remove_idx1 = max(idx1, idx2)
-                    remove_idx2 = min(idx1, idx2)
-
-                    new_hand, material1 = acting_p.hand.remove_card_at(remove_idx1)
-                    new_hand, material2 = new_hand.remove_card_at(remove_idx2)
-
-                    # 2. Enviar materiales al cementerio
-                    acting_p = acting_p.send_card_to_graveyard(material1)
-                    acting_p = acting_p.send_card_to_graveyard(material2)
-
-                    # 3. Colocar resultado en campo (ATK por defecto)
-                    new_field = acting_p.field.place_monster(result_card, move.target_index, Position.FACE_UP_ATK)
-
-                    # 4. Actualizar jugador con nuevo Hand y Field
-                    acting_p = acting_p.get_copy_with_hand(new_hand)
-                    acting_p = acting_p.get_copy_with_field(new_field)
-                    # 5. MARCAR: Fusion Summon también cuenta como la invocación normal del turno
-                    acting_p = acting_p.get_copy_with_summon_used(True)
-
-                elif move.action_type == ActionType.CHANGE_POSITION:
-                    if move.source_index is None or move.position is None: return self
-
-                    new_field = acting_p.field.change_monster_position(move.source_index, move.position)
-                    acting_p = acting_p.get_copy_with_field(new_field)
-
-            # --- Lógica de Acciones en Battle Phase ---
-            elif self.phase == 'battle':
-
-                if move.action_type == ActionType.ATTACK:
-                    if move.source_index is None: return self
-                    
-                    attacking_slot = acting_p.field.monsters[move.source_index]
-                    if not attacking_slot or attacking_slot[1] != Position.FACE_UP_ATK: return self
-                    
-                    attacking_card = attacking_slot[0]
-                    
-                    # A. Ataque Directo a LP
-                    if move.target_index == -1:
-                        damage = attacking_card.attack
-                        opponent_p = opponent_p.take_damage(damage)
-                        print(f"¡{acting_p.name} ataca directamente a {opponent_p.name} por {damage} de daño!")
-                    # B. Ataque a Monstruo
-                    elif move.target_index is not None:
-                        # VALIDATE: Ensure target slot has a card
-                        if move.target_index < 0 or move.target_index >= opponent_p.field.MONSTER_SLOTS:
-                            return self  # Invalid target index
-                        
-                        target_slot = opponent_p.field.monsters[move.target_index]
-                        if not target_slot: 
-                            return self  # Target slot is empty
-                        
-                        defending_card, defending_pos, _ = target_slot
-                        
-                        # Only one battle outcome per attack
-                        if defending_pos == Position.FACE_UP_ATK:
-                            # Battle ATK vs ATK: Compare ATK values
-                            atk_diff = attacking_card.attack - defending_card.attack
-                            if atk_diff > 0:
-                                opponent_p = opponent_p.take_damage(atk_diff)
-                                new_opp_field, destroyed = opponent_p.field.remove_monster(move.target_index)
-                                opponent_p = opponent_p.get_copy_with_field(new_opp_field).send_card_to_graveyard(destroyed)
-                                print(f"El monstruo de {acting_p.name} destruye al de {opponent_p.name} en batalla (ATK vs ATK).")
-                            elif atk_diff < 0:
-                                acting_p = acting_p.take_damage(abs(atk_diff))
-                                new_act_field, destroyed = acting_p.field.remove_monster(move.source_index)
-                                acting_p = acting_p.get_copy_with_field(new_act_field).send_card_to_graveyard(destroyed)
-                                print(f"El monstruo de {opponent_p.name} destruye al de {acting_p.name} en batalla (ATK vs ATK).")
-                            else:  # atk_diff == 0
-                                new_opp_field, destroyed_opp = opponent_p.field.remove_monster(move.target_index)
-                                opponent_p = opponent_p.get_copy_with_field(new_opp_field).send_card_to_graveyard(destroyed_opp)
-                                new_act_field, destroyed_act = acting_p.field.remove_monster(move.source_index)
-                                acting_p = acting_p.get_copy_with_field(new_act_field).send_card_to_graveyard(destroyed_act)
-                                print(f"Ambos monstruos son destruidos en una explosiva batalla (ATK vs ATK).")
-                                
-                        elif defending_pos == Position.FACE_UP_DEF:
-                            # Battle ATK vs DEF
-                            def_diff = defending_card.defense - attacking_card.attack
-                            if def_diff < 0:
-                                # Monstruo defendedor es destruido (no hay daño a LP)
-                                new_opp_field, destroyed = opponent_p.field.remove_monster(move.target_index)
-                                opponent_p = opponent_p.get_copy_with_field(new_opp_field).send_card_to_graveyard(destroyed)
-                                print(f"El monstruo de {acting_p.name} destruye al de {opponent_p.name} en batalla (ATK vs DEF).")
-                            else:  # def_diff >= 0
-                                # Jugador atacante recibe daño igual a la diferencia (no hay destrucción)
-                                if def_diff > 0:
-                                    acting_p = acting_p.take_damage(def_diff)
-                                    print(f"{acting_p.name} recibe {def_diff} de daño por el contraataque del monstruo en DEF.")
-                                else:
-                                    print(f"El ataque de {acting_p.name} no puede penetrar la defensa de {opponent_p.name}.")
-
-            # Finalmente, marcar que el monstruo atacante ya atacó (si aún está en campo)
-            try:
-                if 0 <= move.source_index < acting_p.field.MONSTER_SLOTS and acting_p.field.monsters[move.source_index] is not None:
-                    new_field = acting_p.field.mark_monster_attacked(move.source_index)
-                    acting_p = acting_p.get_copy_with_field(new_field)
-            except Exception:
-                # Si por algún motivo el índice ya no existe o el slot fue destruido durante la batalla,
-                # no hacemos nada (es seguro continuar).
-                pass
-
-            # --- Asignación de Jugadores Actualizados ---
-            if is_ai_turn:
-                final_player = opponent_p
-                final_ai_player = acting_p
-            else:
-                final_player = acting_p
-                final_ai_player = opponent_p
-
-            # Retornar el nuevo estado inmutable
-            # Si la acción es PASS para cambiar de turno, se usa el new_turn y new_phase
-            is_turn_change = (move.action_type == ActionType.PASS and move.target_zone == 'change_turn')
-
-            return GameState(
-                player=final_player,
-                ai_player=final_ai_player,
-                current_turn=new_turn if is_turn_change else self.current_turn,
-                phase=new_phase if move.action_type == ActionType.PASS else self.phase,
-                all_cards=self.all_cards,
-                all_recipes=self.all_recipes
-            )
-
-        except ValueError as ve:
-            print(f"[GameState] Movimiento inválido al aplicar move: {ve}")
-            return self
+            if not self._is_applicable(move):
+                return False
+            return self._apply_unchecked(tx, move, events)
+
         except Exception as e:
-            print(f"[GameState] Error al aplicar move: {e}")
-            return self
+            # ValueError = jugada inválida; el evento distingue ambos casos en su mensaje
+            if events is not None:
+                events(MoveErrorEvent(move, e))
+            return False
+
+    def _is_applicable(self, move: Move) -> bool:
+        """
+        Comprobaciones de apply_move sobre los datos de la jugada (índices,
+        carta de origen, resultado de la fusión, objetivo del ataque). Puede
+        lanzar con índices fuera de rango: lo captura _apply_to.
+        """
+        acting_p, opponent_p = self._get_current_players()
+
+        if move.action_type == ActionType.PASS:
+            return True
+
+        if self.phase == 'main':
+            if move.action_type in (ActionType.SUMMON, ActionType.SET):
+                if move.target_index is None or move.source_index is None or not acting_p.can_normal_summon:
+                    return False
+                if not acting_p.hand.get_card_at(move.source_index):
+                    return False
+
+            elif move.action_type == ActionType.FUSION_SUMMON:
+                if not move.fusion_materials_indices or move.target_index is None:
+                    return False
+                idx1, idx2 = move.fusion_materials_indices
+                card1 = acting_p.hand.get_card_at(idx1)
+                card2 = acting_p.hand.get_card_at(idx2)
+                if get_fusion_table(self.all_cards, self.all_recipes).fuse(card1, card2) is None:
+                    return False
+
+            elif move.action_type == ActionType.CHANGE_POSITION:
+                if move.source_index is None or move.position is None:
+                    return False
+
+        elif self.phase == 'battle' and move.action_type == ActionType.ATTACK:
+            if move.source_index is None:
+                return False
+
+            attacking_slot = acting_p.field.monsters[move.source_index]
+            if not attacking_slot or attacking_slot[1] != Position.FACE_UP_ATK:
+                return False
+
+            if move.target_index is not None and move.target_index != -1:
+                # VALIDATE: Ensure target slot has a card
+                if move.target_index < 0 or move.target_index >= opponent_p.field.MONSTER_SLOTS:
+                    return False  # Invalid target index
+                if not opponent_p.field.monsters[move.target_index]:
+                    return False  # Target slot is empty
+
+        return True
+
+    def _apply_unchecked(self, tx: 'GameStateBuilder', move: Move, events: Optional[EventSink]) -> bool:
+        """
+        Aplica sobre `tx` una jugada ya comprobada (por _is_applicable o por
+        venir del generador). Devuelve False sólo si faltan los sacrificios.
+        """
+        # Identificar quién está actuando (builders mutables de cada jugador)
+        acting_p = tx.acting()
+        opponent_p = tx.opponent()
+
+        # --- Lógica de Transición de Fases (PASS) ---
+        if move.action_type == ActionType.PASS:
+            if move.target_zone == 'main':
+                tx.phase = 'main'
+                # RESET: Permitir invocación normal al entrar a Main Phase
+                acting_p.set_summon_used(False)
+            elif move.target_zone == 'battle':
+                tx.phase = 'battle'
+                # Reset attack flags for acting player's field when entering Battle Phase
+                acting_p.field = acting_p.field.reset_attacks()
+            elif move.target_zone == 'end':
+                tx.phase = 'end'
+            elif move.target_zone == 'change_turn':
+                # Sólo cambian turno y fase: el robo y el reinicio de la invocación
+                # los hacen los controladores al empezar el turno (Draw -> Main).
+                tx.current_turn = 'player' if self.current_turn == 'ai' else 'ai'
+                tx.phase = 'draw'
+
+        # --- Lógica de Acciones en Main Phase ---
+        elif self.phase == 'main':
+
+            if move.action_type in (ActionType.SUMMON, ActionType.SET):
+                card_to_place = acting_p.hand.cards[move.source_index]
+
+                # Verificar si la carta necesita sacrificios (tributos)
+                tributes_needed = 0
+                if card_to_place.stars >= 6:
+                    tributes_needed = 2
+                elif card_to_place.stars >= 5:
+                    tributes_needed = 1
+
+                # Si se necesitan sacrificios, validar que estén proporcionados
+                if tributes_needed > 0:
+                    if not move.fusion_materials_indices or len(move.fusion_materials_indices) != tributes_needed:
+                        return False  # Sacrificios insuficientes
+
+                    # 1. Remover tributos (sacrificios) del campo, en orden descendente para evitar cambio de índices
+                    tribute_indices = sorted(move.fusion_materials_indices, reverse=True)
+                    for tribute_idx in tribute_indices:
+                        acting_p.field, sacrificed_card = acting_p.field.remove_monster(tribute_idx)
+                        # Opcionalmente, enviar al cementerio
+                        acting_p.send_card_to_graveyard(sacrificed_card)
+
+                # 2. Retirar carta de la mano
+                new_hand, _ = acting_p.hand.remove_card_at(move.source_index)
+
+                # 3. Colocar carta en el campo
+                position = move.position if move.position else Position.FACE_UP_ATK
+                acting_p.field = acting_p.field.place_monster(card_to_place, move.target_index, position)
+
+                # 4. Actualizar jugador
+                acting_p.hand = new_hand
+                acting_p.set_summon_used(True) # Usa la invocación normal
+
+            elif move.action_type == ActionType.FUSION_SUMMON:
+                idx1, idx2 = move.fusion_materials_indices
+                card1 = acting_p.hand.cards[idx1]
+                card2 = acting_p.hand.cards[idx2]
+
+                # Obtener resultado de fusión (tabla precalculada por ids de carta)
+                result_card = get_fusion_table(self.all_cards, self.all_recipes).fuse(card1, card2)
+
+                # 1. Remover materiales (el índice mayor primero para no cambiar el menor)
+                remove_idx1 = max(idx1, idx2)
+                remove_idx2 = min(idx1, idx2)
+
+                new_hand, material1 = acting_p.hand.remove_card_at(remove_idx1)
+                new_hand, material2 = new_hand.remove_card_at(remove_idx2)
+
+                # 2. Enviar materiales al cementerio
+                acting_p.send_card_to_graveyard(material1)
+                acting_p.send_card_to_graveyard(material2)
+
+                # 3. Colocar resultado en campo (ATK por defecto)
+                acting_p.field = acting_p.field.place_monster(result_card, move.target_index, Position.FACE_UP_ATK)
+
+                # 4. Actualizar la mano
+                acting_p.hand = new_hand
+                # 5. MARCAR: Fusion Summon también cuenta como la invocación normal del turno
+                acting_p.set_summon_used(True)
+
+            elif move.action_type == ActionType.CHANGE_POSITION:
+                acting_p.field = acting_p.field.change_monster_position(move.source_index, move.position)
+
+        # --- Lógica de Acciones en Battle Phase ---
+        elif self.phase == 'battle':
+
+            if move.action_type == ActionType.ATTACK:
+                attacking_card = acting_p.field.monsters[move.source_index][0]
+
+                # A. Ataque Directo a LP
+                if move.target_index == -1:
+                    damage = attacking_card.attack
+                    opponent_p.take_damage(damage)
+                    if events is not None:
+                        events(DirectAttackEvent(acting_p.name, opponent_p.name, attacking_card, damage))
+                # B. Ataque a Monstruo
+                elif move.target_index is not None:
+                    defending_card, defending_pos, _ = opponent_p.field.monsters[move.target_index]
+
+                    # Una sola resolución por ataque, leída de la tabla precalculada
+                    outcome = get_battle_table(self.all_cards).outcome(attacking_card, defending_card, defending_pos)
+
+                    if outcome.defender_damage:
+                        opponent_p.take_damage(outcome.defender_damage)
+                    if outcome.defender_destroyed:
+                        opponent_p.field, destroyed_opp = opponent_p.field.remove_monster(move.target_index)
+                        opponent_p.send_card_to_graveyard(destroyed_opp)
+                    if outcome.attacker_damage:
+                        acting_p.take_damage(outcome.attacker_damage)
+                    if outcome.attacker_destroyed:
+                        acting_p.field, destroyed_act = acting_p.field.remove_monster(move.source_index)
+                        acting_p.send_card_to_graveyard(destroyed_act)
+
+                    if events is not None:
+                        events(BattleEvent(
+                            acting_p.name, opponent_p.name, attacking_card, defending_card, defending_pos, outcome
+                        ))
+
+        # Finalmente, marcar que el monstruo del slot de origen ya atacó (si aún está
+        # en campo). Las jugadas sin source_index (PASS, fusiones) no marcan nada.
+        source = move.source_index
+        if source is not None and 0 <= source < acting_p.field.MONSTER_SLOTS and acting_p.field.monsters[source] is not None:
+            acting_p.field = acting_p.field.mark_monster_attacked(source)
+
+        # Jugada aplicada: el nuevo estado lo construye quien llama (turno y fase sólo cambian con PASS)
+        return True
+
+    def edit(self) -> 'GameStateBuilder':
+        """Abre una transacción sobre este estado (ver GameStateBuilder)."""
+        return GameStateBuilder(self)
 
     def get_copy_with_players(self, player: Player, ai_player: Player) -> 'GameState':
         """Retorna una copia del GameState con los jugadores provistos (inmutable)."""
-        return replace(self, player=player, ai_player=ai_player)
+        return _new_state(player, ai_player, self.current_turn, self.phase, self.all_cards, self.all_recipes)
     
     def reinitialize_decks(self, deck_size: int) -> 'GameState':
         """
@@ -502,4 +679,88 @@ class GameState:
         new_ai_player = self.ai_player.get_copy_with_new_deck(new_ai_deck)
 
         # 4. Retornar el GameState actualizado
-        return replace(self, player=new_player, ai_player=new_ai_player)
\ No newline at end of file
+        return replace(self, player=new_player, ai_player=new_ai_player)
+
+
+def _state_hash(state: GameState) -> int:
+    return hash((state.player._hash, state.ai_player._hash, state.current_turn, state.phase))
+
+
+_new_state = fast_constructor(GameState, derived={'_hash': _state_hash})
+recompute_on_load(GameState, {'_hash': _state_hash})
+
+
+def _check_trusted_apply(state: GameState, move: Move, result: GameState):
+    """Modo depuración de apply_trusted: el resultado debe ser el de apply_move."""
+    expected = state.apply_move(move)
+    # Igualdad estricta: las manos también en orden (Hand.__eq__ es de multiconjunto)
+    same = (
+        (result is state) == (expected is state) and result == expected
+        and result.player.hand.cards == expected.player.hand.cards
+        and result.ai_player.hand.cards == expected.ai_player.hand.cards
+    )
+    if not same:
+        raise AssertionError(
+            f"apply_trusted({move!r}) da {result!r}, distinto de apply_move ({expected!r}) en {state!r}"
+        )
+
+
+class GameStateBuilder:
+    """
+    Transacción mutable sobre un GameState. acting() y opponent() devuelven
+    PlayerBuilder de los jugadores (se crean al pedirlos) y build() construye
+    cada Player modificado y el GameState una sola vez.
+
+    A diferencia de PlayerBuilder, build() crea siempre un GameState nuevo
+    aunque no haya cambios: apply_move devuelve el mismo objeto sólo cuando la
+    jugada no es válida. changed() dice si el resultado difiere del original.
+    """
+
+    __slots__ = ('base', 'player', 'ai_player', 'current_turn', 'phase')
+
+    def __init__(self, state: GameState):
+        self.base = state
+        self.player = state.player
+        self.ai_player = state.ai_player
+        self.current_turn = state.current_turn
+        self.phase = state.phase
+
+    def acting(self) -> PlayerBuilder:
+        """Builder del jugador que tiene el turno en el estado original."""
+        return self._builder('ai_player' if self.base.current_turn == 'ai' else 'player')
+
+    def opponent(self) -> PlayerBuilder:
+        return self._builder('player' if self.base.current_turn == 'ai' else 'ai_player')
+
+    def _builder(self, attr: str) -> PlayerBuilder:
+        current = getattr(self, attr)
+        if not isinstance(current, PlayerBuilder):
+            current = PlayerBuilder(current)
+            setattr(self, attr, current)
+        return current
+
+    def changed(self) -> bool:
+        """True si el estado construido sería distinto del original."""
+        base = self.base
+        if self.current_turn != base.current_turn or self.phase != base.phase:
+            return True
+        for current, original in ((self.player, base.player), (self.ai_player, base.ai_player)):
+            if isinstance(current, PlayerBuilder):
+                if current.changed():
+                    return True
+            elif current != original:
+                return True
+        return False
+
+    def build(self) -> GameState:
+        if self.current_turn not in ('player', 'ai'):
+            raise ValueError("Turno inválido.")
+        if self.phase not in ('draw', 'main', 'battle', 'end'):
+            raise ValueError("Fase inválida.")
+        player, ai_player = self.player, self.ai_player
+        if isinstance(player, PlayerBuilder):
+            player = player.build()
+        if isinstance(ai_player, PlayerBuilder):
+            ai_player = ai_player.build()
+        base = self.base
+        return _new_state(player, ai_player, self.current_turn, self.phase, base.all_cards, base.all_recipes)
@@ -1,13 +1,57 @@
-from typing import Tuple, Optional
+from collections import Counter
+from typing import FrozenSet, List, Tuple, Optional
 from model.cards.card import Card
-from dataclasses import dataclass, replace, field
+from dataclasses import dataclass, field
+from .fast_init import fast_constructor, recompute_on_load
+from .interning import get_pool
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False, weakref_slot=True)
 class Hand:
     """
     Representa la mano de cartas de un jugador de manera inmutable.
+
+    El orden de `cards` es el de la interfaz (y el de los índices de las
+    jugadas), pero no tiene efecto en el juego: la mano es un multiconjunto.
+    Dos manos son iguales si tienen las mismas copias de cada carta.
+
+    `_hash` es la suma de los hashes de las cartas, que no depende del orden.
+    Se calcula al construir la mano y add_card / remove_card_at lo actualizan
+    de forma incremental. No es un parámetro de __init__: al construir con
+    Hand(...) o dataclasses.replace se recalcula.
     """
     cards: Tuple[Card, ...] = field(default_factory=tuple)
+    _hash: int = field(default=0, init=False, repr=False)
+    # Multiconjunto carta -> copias, calculado la primera vez que se compara la mano
+    _counts: Optional[FrozenSet[Tuple[Card, int]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_hash', _hand_hash(self))
+
+    @property
+    def counts(self) -> FrozenSet[Tuple[Card, int]]:
+        """Pares (carta, copias) de la mano."""
+        counts = self._counts
+        if counts is None:
+            counts = frozenset(Counter(self.cards).items())
+            object.__setattr__(self, '_counts', counts)
+        return counts
+
+    def distinct_indices(self) -> List[int]:
+        """Índice de la primera copia de cada carta distinta, en orden de mano."""
+        seen = set()
+        indices = []
+        for idx, card in enumerate(self.cards):
+            if card not in seen:
+                seen.add(card)
+                indices.append(idx)
+        return indices
+
+    def index_of(self, card: Card) -> Optional[int]:
+        """Índice concreto de una copia de `card` en la mano (la primera), o None."""
+        for idx, hand_card in enumerate(self.cards):
+            if hand_card is card:
+                return idx
+        return None
 
     def get_card_at(self, index: int) -> Optional[Card]:
         """Devuelve la carta en un índice dado si existe."""
@@ -17,7 +61,7 @@ class Hand:
 
     def add_card(self, card: Card) -> 'Hand':
         """Retorna un nuevo Hand con una carta añadida."""
-        return replace(self, cards=self.cards + (card,))
+        return _new_hand(self.cards + (card,), self._hash + hash(card))
 
     def remove_card_at(self, index: int) -> Tuple['Hand', Card]:
         """
@@ -30,10 +74,35 @@ class Hand:
         new_cards_list = list(self.cards)
         new_cards_list.pop(index)
         
-        return replace(self, cards=tuple(new_cards_list)), card_removed
+        return _new_hand(tuple(new_cards_list), self._hash - hash(card_removed)), card_removed
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Hand):
+            return NotImplemented
+        if self._hash != other._hash:
+            return False
+        return self.cards == other.cards or (
+            len(self.cards) == len(other.cards) and self.counts == other.counts
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._hash)
         
     def __len__(self) -> int:
         return len(self.cards)
 
     def __repr__(self) -> str:
-        return f"Hand(Cards: {len(self.cards)})"
\ No newline at end of file
+        return f"Hand(Cards: {len(self.cards)})"
+
+
+def _hand_hash(hand: Hand) -> int:
+    return sum(map(hash, hand.cards))
+
+
+# Internado: misma secuencia de cartas (en orden, no como multiconjunto)
+_pool = get_pool('Hand', lambda a, b: a.cards == b.cards)
+# _new_hand(cards, hash): add_card / remove_card_at pasan el hash ya actualizado
+_new_hand = fast_constructor(Hand, intern=_pool.intern, cached=('_hash',))
+recompute_on_load(Hand, {'_hash': _hand_hash, '_counts': lambda hand: None})
@@ -0,0 +1,110 @@
+'''
+Internado (hash-consing) de Hand, Field y Player.
+
+Muchos nodos de la búsqueda comparten sub-objetos iguales: el Player del
+oponente que no cambia, campos vacíos, la misma mano tras un PASS... pero cada
+copia (mark_monster_attacked, reset_attacks, los builders) crea instancias
+iguales y distintas. Un InternPool devuelve, para cada valor, una instancia
+canónica compartida: los constructores rápidos de las tres clases pasan por su
+pool, así que los valores iguales construidos por el motor son el mismo objeto
+y la igualdad se resuelve por identidad.
+
+El pool guarda referencias débiles indexadas por el hash cacheado del objeto,
+con un objeto por hash: si dos valores distintos colisionan, el último
+sustituye al anterior (el internado es "mejor esfuerzo", nunca incorrecto).
+Cuando la instancia canónica deja de usarse, su entrada desaparece.
+
+La comparación del pool es estricta: las manos se comparan en orden (los
+índices de las jugadas dependen de él, aunque Hand.__eq__ las trate como
+multiconjunto) y los hijos de Player por identidad, ya que están internados.
+
+Se activa/desactiva para todo el proceso con set_interning() o con la
+variable de entorno YUGIOH_INTERN=0.
+'''
+
+import os
+import weakref
+from typing import Callable, Dict, Tuple, TypeVar
+
+T = TypeVar('T')
+
+INTERNING = os.environ.get('YUGIOH_INTERN', '1') != '0'
+
+
+class _Ref(weakref.ref):
+    __slots__ = ('key',)
+
+
+class InternPool:
+    """Instancias canónicas por hash cacheado (`_hash`), con referencias débiles."""
+
+    def __init__(self, name: str, same: Callable[[object, object], bool]):
+        self.name = name
+        self.same = same
+        self.refs: Dict[int, _Ref] = {}
+        self.hits = 0
+        self.misses = 0
+
+        # El callback no debe mantener vivo el pool
+        refs = self.refs
+
+        def discard(ref: _Ref, refs=refs):
+            if refs.get(ref.key) is ref:
+                refs.pop(ref.key, None)
+
+        self._discard = discard
+
+    def intern(self, obj: T) -> T:
+        """Devuelve la instancia canónica igual a `obj` (o `obj`, que pasa a serlo)."""
+        if not INTERNING:
+            return obj
+        key = obj._hash
+        ref = self.refs.get(key)
+        if ref is not None:
+            canonical = ref()
+            if canonical is not None and self.same(canonical, obj):
+                self.hits += 1
+                return canonical
+        self.misses += 1
+        ref = _Ref(obj, self._discard)
+        ref.key = key
+        self.refs[key] = ref
+        return obj
+
+    def cache_counts(self) -> Tuple[int, int]:
+        """(consultas, aciertos) acumulados, para SearchStats."""
+        return self.hits + self.misses, self.hits
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def clear(self):
+        self.refs.clear()
+        self.hits = self.misses = 0
+
+
+def set_interning(enabled: bool):
+    """Activa o desactiva el internado para los objetos que se creen a partir de ahora."""
+    global INTERNING
+    INTERNING = bool(enabled)
+
+
+_pools: Dict[str, InternPool] = {}
+
+
+def get_pool(name: str, same: Callable[[object, object], bool]) -> InternPool:
+    """Pool registrado con ese nombre (uno por clase internada)."""
+    pool = _pools.get(name)
+    if pool is None:
+        pool = _pools[name] = InternPool(name, same)
+    return pool
+
+
+def intern_stats() -> Dict[str, tuple]:
+    """{clase: (instancias vivas, aciertos, fallos)} de cada pool."""
+    return {name: (len(pool), pool.hits, pool.misses) for name, pool in _pools.items()}
+
+
+def cache_counters() -> Dict[str, Callable[[], Tuple[int, int]]]:
+    """Contadores de cada pool con el formato de SearchStats ({nombre: cache_counts})."""
+    return {f'intern {name}': pool.cache_counts for name, pool in _pools.items()}
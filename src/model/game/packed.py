@@ -0,0 +1,486 @@
+'''
+Codificación compacta de GameState para la búsqueda.
+
+Cada nodo de la búsqueda es un árbol de dataclasses inmutables (GameState ->
+Player -> Hand/Field -> tuplas de Card y de (Card, Position, bool)), caro de
+construir y de guardar. Aquí un estado se guarda como un único objeto `bytes`:
+
+    cabecera   '<BB'   turno (0 = player, 1 = ai), fase (índice en PHASES)
+    por jugador (player y después ai):
+               '<BiBiBHH'  nombre (índice en la tabla de nombres), LP,
+                           puede invocar, poder en campo, tamaño de mano,
+                           de mazo y de cementerio
+               5 x '<HB'   id de la carta del slot (EMPTY si está vacío) y
+                           flags (DEF_FLAG = en defensa, ATTACKED_FLAG = ya atacó)
+    variable   '<H' * n    ids de mano, mazo y cementerio de player y de ai
+
+Los ids de carta son los de model.cards.card_table. El códec convierte en
+ambos sentidos sin pérdida (pack/unpack) y ofrece moves/apply/evaluate
+equivalentes a los de GameState: mismas jugadas en el mismo orden, mismo
+estado resultante y misma puntuación. apply() no emite eventos de combate
+(como apply_move sin sumidero).
+'''
+
+import struct
+from typing import Dict, List, Tuple
+
+from model.cards.card import Card
+from model.cards.card_table import get_card_table
+from model.fusions.fusion_recipe import FusionRecipe
+from model.fusions.fusion_table import NO_FUSION, get_fusion_table
+from . import gamestate
+from .battle_table import ATTACKER_DAMAGE, ATTACKER_DESTROYED, DEFENDER_DAMAGE, DEFENDER_DESTROYED, get_battle_table
+from .field import Field
+from .gamestate import GameState, INF
+from .hand import Hand
+from .move import ActionType, Move, Position
+from .player import Player
+
+TURNS = ('player', 'ai')
+PHASES = ('draw', 'main', 'battle', 'end')
+DRAW, MAIN, BATTLE, END = range(len(PHASES))
+
+MONSTER_SLOTS = Field.MONSTER_SLOTS
+
+# Id de slot vacío y flags de cada slot
+EMPTY = 0xFFFF
+DEF_FLAG = 1
+ATTACKED_FLAG = 2
+
+_HEADER_FORMAT = 'BB'
+_PLAYER_FORMAT = 'BiBiBHH' + 'HB' * MONSTER_SLOTS
+_FIXED = struct.Struct('<' + _HEADER_FORMAT + _PLAYER_FORMAT * 2)
+_PLAYER_VALUES = 7 + 2 * MONSTER_SLOTS
+
+# Lectura directa de (LP, poder, tamaño de mano) de ambos jugadores para evaluate()
+_PLAYER_SIZE = struct.calcsize('<' + _PLAYER_FORMAT)
+_SUMMARY = struct.Struct('<2x' + ('xixiB%dx' % (_PLAYER_SIZE - 11)) * 2)
+
+# Structs completos (parte fija + n ids) por número de ids
+_full_structs: Dict[int, struct.Struct] = {}
+
+
+def _full_struct(count: int) -> struct.Struct:
+    packer = _full_structs.get(count)
+    if packer is None:
+        packer = _full_structs[count] = struct.Struct(_FIXED.format + 'H' * count)
+    return packer
+
+
+class _PackedPlayer:
+    """Vista mutable de un jugador mientras se aplica una jugada."""
+    __slots__ = ('name', 'lp', 'can_summon', 'power', 'hand', 'deck', 'graveyard', 'slots', 'flags')
+
+
+class PackedCodec:
+    """Conversión y reglas del juego sobre estados empaquetados para un catálogo."""
+
+    def __init__(self, all_cards: Dict[str, Card], all_recipes: List[FusionRecipe]):
+        self.all_cards = all_cards
+        self.all_recipes = all_recipes
+        self.size = len(all_cards)
+        self.recipe_count = len(all_recipes)
+
+        # Columnas del catálogo como listas (más rápidas que NumPy para accesos sueltos)
+        table = get_card_table(all_cards)
+        self.table = table
+        self.cards: List[Card] = table.cards
+        self.attack: List[int] = table.attack.tolist()
+        self.defense: List[int] = table.defense.tolist()
+        self.stars: List[int] = table.stars.tolist()
+        self.numbers: List[str] = table.numbers
+        # Resultados de combate: battle[i][j][pos] = (a_destr, d_destr, a_dmg, d_dmg)
+        self.battle = get_battle_table(all_cards).table.tolist()
+        # Fusiones: fusions[i][j] = id del resultado o NO_FUSION
+        self.fusions: List[List[int]] = get_fusion_table(all_cards, all_recipes).rows
+
+        self.names: List[str] = []
+        self.name_index: Dict[str, int] = {}
+        self._moves: Dict[tuple, Move] = {}
+        self.move_lookups = 0
+        self.move_misses = 0
+
+    # ------------------------------------------------------------------
+    # --- Conversión con GameState ---
+    # ------------------------------------------------------------------
+
+    def _card_id(self, card: Card) -> int:
+        i = self.table.id_of(card)
+        if i is None or self.cards[i] is not card:
+            raise ValueError(f"La carta {card!r} no pertenece al catálogo del códec.")
+        return i
+
+    def _name_id(self, name: str) -> int:
+        i = self.name_index.get(name)
+        if i is None:
+            if len(self.names) >= 256:
+                raise ValueError("Demasiados nombres de jugador distintos para el códec.")
+            i = self.name_index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def pack(self, state: GameState) -> bytes:
+        """Empaqueta un GameState (del mismo catálogo que el códec)."""
+        players = []
+        for player in (state.player, state.ai_player):
+            packed = _PackedPlayer()
+            packed.name = self._name_id(player.name)
+            packed.lp = player.life_points
+            packed.can_summon = player.can_normal_summon
+            packed.hand = [self._card_id(card) for card in player.hand.cards]
+            packed.deck = [self._card_id(card) for card in player.deck]
+            packed.graveyard = [self._card_id(card) for card in player.graveyard]
+            packed.slots = [EMPTY] * MONSTER_SLOTS
+            packed.flags = [0] * MONSTER_SLOTS
+            for i, slot in enumerate(player.field.monsters):
+                if slot is not None:
+                    card, position, has_attacked = slot
+                    packed.slots[i] = self._card_id(card)
+                    packed.flags[i] = (DEF_FLAG if position == Position.FACE_UP_DEF else 0) | (ATTACKED_FLAG if has_attacked else 0)
+            players.append(packed)
+        return self._pack(TURNS.index(state.current_turn), PHASES.index(state.phase), players)
+
+    def unpack(self, blob: bytes) -> GameState:
+        """Reconstruye el GameState equivalente (con las cartas del catálogo)."""
+        return self.build_state(*self._unpack(blob))
+
+    def build_state(self, turn: int, phase: int, players: List[_PackedPlayer]) -> GameState:
+        """GameState a partir de la vista por jugadores (la de _unpack o la de SearchBoard)."""
+        cards = self.cards
+        built = []
+        for packed in players:
+            monsters = tuple(
+                None if card_id == EMPTY else (
+                    cards[card_id],
+                    Position.FACE_UP_DEF if flags & DEF_FLAG else Position.FACE_UP_ATK,
+                    bool(flags & ATTACKED_FLAG)
+                )
+                for card_id, flags in zip(packed.slots, packed.flags)
+            )
+            built.append(Player(
+                name=self.names[packed.name],
+                life_points=packed.lp,
+                hand=Hand(tuple(cards[i] for i in packed.hand)),
+                field=Field(monsters=monsters),
+                deck=tuple(cards[i] for i in packed.deck),
+                graveyard=tuple(cards[i] for i in packed.graveyard),
+                can_normal_summon=bool(packed.can_summon)
+            ))
+        return GameState(
+            player=built[0],
+            ai_player=built[1],
+            current_turn=TURNS[turn],
+            phase=PHASES[phase],
+            all_cards=self.all_cards,
+            all_recipes=self.all_recipes
+        )
+
+    def _pack(self, turn: int, phase: int, players: List[_PackedPlayer]) -> bytes:
+        values = [turn, phase]
+        ids: List[int] = []
+        attack, defense = self.attack, self.defense
+        for packed in players:
+            power = 0
+            for card_id, flags in zip(packed.slots, packed.flags):
+                if card_id != EMPTY:
+                    power += defense[card_id] if flags & DEF_FLAG else attack[card_id]
+            values += (packed.name, packed.lp, packed.can_summon, power,
+                       len(packed.hand), len(packed.deck), len(packed.graveyard))
+            for card_id, flags in zip(packed.slots, packed.flags):
+                values += (card_id, flags)
+            ids += packed.hand
+            ids += packed.deck
+            ids += packed.graveyard
+        return _full_struct(len(ids)).pack(*values, *ids)
+
+    def _unpack(self, blob: bytes) -> Tuple[int, int, List[_PackedPlayer]]:
+        fixed = _FIXED.unpack_from(blob)
+        ids = struct.unpack_from('<%dH' % ((len(blob) - _FIXED.size) // 2), blob, _FIXED.size)
+        players = []
+        offset = 0
+        for base in (2, 2 + _PLAYER_VALUES):
+            packed = _PackedPlayer()
+            packed.name, packed.lp, packed.can_summon, packed.power, hand_len, deck_len, gy_len = fixed[base:base + 7]
+            packed.slots = list(fixed[base + 7:base + _PLAYER_VALUES:2])
+            packed.flags = list(fixed[base + 8:base + _PLAYER_VALUES:2])
+            packed.hand = list(ids[offset:offset + hand_len])
+            offset += hand_len
+            packed.deck = ids[offset:offset + deck_len]
+            offset += deck_len
+            packed.graveyard = list(ids[offset:offset + gy_len])
+            offset += gy_len
+            players.append(packed)
+        return fixed[0], fixed[1], players
+
+    # ------------------------------------------------------------------
+    # --- Reglas (equivalentes a las de GameState) ---
+    # ------------------------------------------------------------------
+
+    def is_game_over(self, blob: bytes) -> bool:
+        player_lp, _, _, ai_lp, _, _ = _SUMMARY.unpack_from(blob)
+        return player_lp <= 0 or ai_lp <= 0
+
+    def evaluate(self, blob: bytes) -> float:
+        """Misma heurística que GameState.evaluate(), leída directamente de la cabecera."""
+        player_lp, player_power, player_hand, ai_lp, ai_power, ai_hand = _SUMMARY.unpack_from(blob)
+        if ai_lp <= 0:
+            return -INF
+        if player_lp <= 0:
+            return INF
+        lp_advantage = ai_lp - player_lp
+        field_advantage = (ai_power - player_power) * gamestate.BOARD_POWER_WEIGHT
+        hand_advantage = (ai_hand - player_hand) * gamestate.HAND_WEIGHT
+        return (lp_advantage * gamestate.LP_WEIGHT) + field_advantage + hand_advantage
+
+    def _move(self, key: tuple, **kwargs) -> Move:
+        """Jugadas compartidas entre nodos (Move es inmutable)."""
+        self.move_lookups += 1
+        move = self._moves.get(key)
+        if move is None:
+            self.move_misses += 1
+            move = self._moves[key] = Move(**kwargs)
+        return move
+
+    def cache_counts(self) -> Tuple[int, int]:
+        """(consultas, aciertos) acumulados de la caché de jugadas, para SearchStats."""
+        return self.move_lookups, self.move_lookups - self.move_misses
+
+    def moves(self, blob: bytes, distinct: bool = False) -> List[Move]:
+        """Las mismas jugadas, en el mismo orden, que GameState.get_possible_moves(distinct)."""
+        if self.is_game_over(blob):
+            return []
+        turn, phase, players = self._unpack(blob)
+        return self.generate_moves(phase, players[turn], players[1 - turn], distinct)
+
+    def distinct_moves(self, blob: bytes) -> List[Move]:
+        """moves(blob, distinct=True): la mano como multiconjunto, para la búsqueda."""
+        return self.moves(blob, True)
+
+    def generate_moves(self, phase: int, acting: _PackedPlayer, opponent: _PackedPlayer, distinct: bool = False) -> List[Move]:
+        """Generador de jugadas sobre la vista por jugadores (sin comprobar fin de partida)."""
+        move = self._move
+        moves: List[Move] = []
+
+        if phase == DRAW:
+            moves.append(move(('pass', 'main'), action_type=ActionType.PASS, target_zone='main'))
+
+        elif phase == MAIN:
+            moves.append(move(('pass', 'battle'), action_type=ActionType.PASS, target_zone='battle'))
+            moves.append(move(('pass', 'end'), action_type=ActionType.PASS, target_zone='end'))
+            empty = acting.slots.index(EMPTY) if EMPTY in acting.slots else None
+            hand = acting.hand
+
+            if acting.can_summon and empty is not None:
+                for idx, card_id in enumerate(hand):
+                    if distinct and card_id in hand[:idx]:
+                        continue
+                    number = self.numbers[card_id]
+                    for action, position in ((ActionType.SUMMON, Position.FACE_UP_ATK), (ActionType.SET, Position.FACE_UP_DEF)):
+                        moves.append(move(
+                            (action, number, empty, idx),
+                            action_type=action, card_id=number, source_zone='hand',
+                            target_index=empty, source_index=idx, position=position
+                        ))
+
+            if empty is not None and len(hand) >= 2:
+                fusions = self.fusions
+                seen = set() if distinct else None
+                for i in range(len(hand)):
+                    row = fusions[hand[i]]
+                    for j in range(i + 1, len(hand)):
+                        result = row[hand[j]]
+                        if result != NO_FUSION:
+                            if seen is not None:
+                                pair = (hand[i], hand[j]) if hand[i] <= hand[j] else (hand[j], hand[i])
+                                if pair in seen:
+                                    continue
+                                seen.add(pair)
+                            moves.append(move(
+                                (ActionType.FUSION_SUMMON, result, empty, i, j),
+                                action_type=ActionType.FUSION_SUMMON, card_id=self.numbers[result], source_zone='hand',
+                                target_zone='field', target_index=empty, fusion_materials_indices=(i, j)
+                            ))
+
+            for idx in range(MONSTER_SLOTS):
+                if acting.slots[idx] != EMPTY:
+                    in_defense = acting.flags[idx] & DEF_FLAG
+                    position = Position.FACE_UP_ATK if in_defense else Position.FACE_UP_DEF
+                    moves.append(move(
+                        (ActionType.CHANGE_POSITION, idx, position),
+                        action_type=ActionType.CHANGE_POSITION, source_index=idx, position=position
+                    ))
+
+        elif phase == BATTLE:
+            moves.append(move(('pass', 'end'), action_type=ActionType.PASS, target_zone='end'))
+            targets = [j for j in range(MONSTER_SLOTS) if opponent.slots[j] != EMPTY] or [-1]
+            for i in range(MONSTER_SLOTS):
+                if acting.slots[i] != EMPTY and not acting.flags[i] & (DEF_FLAG | ATTACKED_FLAG):
+                    for j in targets:
+                        moves.append(move(
+                            (ActionType.ATTACK, i, j),
+                            action_type=ActionType.ATTACK, source_index=i, target_index=j
+                        ))
+
+        elif phase == END:
+            moves.append(move(('pass', 'change_turn'), action_type=ActionType.PASS, target_zone='change_turn'))
+
+        return moves
+
+    def apply(self, blob: bytes, move: Move) -> bytes:
+        """
+        Equivalente silencioso de GameState.apply_move(): si la jugada no es
+        válida devuelve el mismo objeto, como hace apply_move.
+        """
+        turn, phase, players = self._unpack(blob)
+        acting, opponent = players[turn], players[1 - turn]
+        action = move.action_type
+        new_turn, new_phase = turn, phase
+
+        if action == ActionType.PASS:
+            zone = move.target_zone
+            if zone == 'main':
+                new_phase = MAIN
+                acting.can_summon = 1
+            elif zone == 'battle':
+                new_phase = BATTLE
+                acting.flags = [flags & ~ATTACKED_FLAG for flags in acting.flags]
+            elif zone == 'end':
+                new_phase = END
+            elif zone == 'change_turn':
+                # Como en apply_move, sólo cambian turno y fase: el robo lo hacen los controladores
+                new_turn = 1 - turn
+                new_phase = DRAW
+
+        elif phase == MAIN:
+            if action in (ActionType.SUMMON, ActionType.SET):
+                source, target = move.source_index, move.target_index
+                if target is None or source is None or not acting.can_summon:
+                    return blob
+                if not 0 <= source < len(acting.hand):
+                    return blob
+                card_id = acting.hand[source]
+
+                stars = self.stars[card_id]
+                tributes_needed = 2 if stars >= 6 else 1 if stars >= 5 else 0
+                if tributes_needed > 0:
+                    tributes = move.fusion_materials_indices
+                    if not tributes or len(tributes) != tributes_needed:
+                        return blob
+                    for tribute in sorted(tributes, reverse=True):
+                        if not 0 <= tribute < MONSTER_SLOTS or acting.slots[tribute] == EMPTY:
+                            return blob
+                        acting.graveyard.append(acting.slots[tribute])
+                        acting.slots[tribute] = EMPTY
+                        acting.flags[tribute] = 0
+
+                del acting.hand[source]
+                if not 0 <= target < MONSTER_SLOTS or acting.slots[target] != EMPTY:
+                    return blob
+                acting.slots[target] = card_id
+                acting.flags[target] = DEF_FLAG if move.position == Position.FACE_UP_DEF else 0
+                acting.can_summon = 0
+
+            elif action == ActionType.FUSION_SUMMON:
+                materials, target = move.fusion_materials_indices, move.target_index
+                if not materials or target is None:
+                    return blob
+                if len(materials) != 2:
+                    return blob
+                idx1, idx2 = materials
+                hand = acting.hand
+                if not (0 <= idx1 < len(hand) and 0 <= idx2 < len(hand)):
+                    return blob
+                result = self.fusions[hand[idx1]][hand[idx2]]
+                if result == NO_FUSION:
+                    return blob
+
+                # El índice mayor primero; con índices repetidos se retira la siguiente carta, como en Hand
+                material1 = hand.pop(max(idx1, idx2))
+                remove_idx2 = min(idx1, idx2)
+                if remove_idx2 >= len(hand):
+                    return blob
+                material2 = hand.pop(remove_idx2)
+                acting.graveyard.append(material1)
+                acting.graveyard.append(material2)
+
+                if not 0 <= target < MONSTER_SLOTS or acting.slots[target] != EMPTY:
+                    return blob
+                acting.slots[target] = result
+                acting.flags[target] = 0
+                acting.can_summon = 0
+
+            elif action == ActionType.CHANGE_POSITION:
+                source = move.source_index
+                if source is None or move.position is None:
+                    return blob
+                if not 0 <= source < MONSTER_SLOTS or acting.slots[source] == EMPTY:
+                    return blob
+                if move.position == Position.FACE_UP_DEF:
+                    acting.flags[source] |= DEF_FLAG
+                else:
+                    acting.flags[source] &= ~DEF_FLAG
+
+        elif phase == BATTLE and action == ActionType.ATTACK:
+            source, target = move.source_index, move.target_index
+            if source is None:
+                return blob
+            # Índices negativos válidos en Python, como monsters[source] en apply_move
+            if not -MONSTER_SLOTS <= source < MONSTER_SLOTS:
+                return blob
+            attacker = acting.slots[source]
+            if attacker == EMPTY or acting.flags[source] & DEF_FLAG:
+                return blob
+
+            if target == -1:
+                opponent.lp = max(0, opponent.lp - self.attack[attacker])
+            elif target is not None:
+                if target < 0 or target >= MONSTER_SLOTS:
+                    return blob
+                defender = opponent.slots[target]
+                if defender == EMPTY:
+                    return blob
+                outcome = self.battle[attacker][defender][1 if opponent.flags[target] & DEF_FLAG else 0]
+
+                if outcome[DEFENDER_DAMAGE]:
+                    opponent.lp = max(0, opponent.lp - outcome[DEFENDER_DAMAGE])
+                if outcome[DEFENDER_DESTROYED]:
+                    opponent.graveyard.append(defender)
+                    opponent.slots[target] = EMPTY
+                    opponent.flags[target] = 0
+                if outcome[ATTACKER_DAMAGE]:
+                    acting.lp = max(0, acting.lp - outcome[ATTACKER_DAMAGE])
+                if outcome[ATTACKER_DESTROYED]:
+                    if source < 0:
+                        return blob
+                    acting.graveyard.append(attacker)
+                    acting.slots[source] = EMPTY
+                    acting.flags[source] = 0
+
+        # Igual que apply_move: el monstruo del slot de origen queda marcado como atacado
+        source = move.source_index
+        if source is not None and 0 <= source < MONSTER_SLOTS and acting.slots[source] != EMPTY:
+            acting.flags[source] |= ATTACKED_FLAG
+
+        if action != ActionType.PASS:
+            new_phase = phase
+        return self._pack(new_turn, new_phase, players)
+
+
+# Caché de códecs por catálogo: (id(all_cards), id(all_recipes)) -> códec
+_codecs: Dict[Tuple[int, int], PackedCodec] = {}
+
+
+def get_codec(all_cards: Dict[str, Card], all_recipes: List[FusionRecipe]) -> PackedCodec:
+    """Devuelve el códec del catálogo, construyéndolo si es nuevo o ha cambiado de tamaño."""
+    key = (id(all_cards), id(all_recipes))
+    codec = _codecs.get(key)
+    if (codec is not None and codec.all_cards is all_cards and codec.all_recipes is all_recipes
+            and codec.size == len(all_cards) and codec.recipe_count == len(all_recipes)):
+        return codec
+    codec = _codecs[key] = PackedCodec(all_cards, all_recipes)
+    return codec
+
+
+def pack(state: GameState) -> bytes:
+    """Atajo: empaqueta `state` con el códec de su catálogo."""
+    return get_codec(state.all_cards, state.all_recipes).pack(state)
@@ -1,14 +1,23 @@
 from typing import List, Tuple, Optional
-from cards.card import Card
+from model.cards.card import Card
 from .hand import Hand
 from .field import Field 
-from dataclasses import dataclass, replace, field as dataclass_field
+from dataclasses import dataclass, field as dataclass_field
+from .fast_init import fast_constructor, recompute_on_load
+from .interning import get_pool
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False, weakref_slot=True)
 class Player:
     """
     Representa a un jugador y todo su estado de juego de manera inmutable.
     Delega la gestión de cartas a Hand y Field.
+
+    Los métodos get_copy_* cambian un solo campo. Para aplicar varios cambios
+    construyendo un único Player nuevo se usa edit() (ver PlayerBuilder).
+
+    El hash se calcula una vez al construir el jugador a partir de los hashes
+    ya cacheados de Hand y Field (del mazo y el cementerio sólo entra su
+    tamaño). La igualdad compara primero identidad y hash.
     """
     
     name: str
@@ -23,6 +32,26 @@ class Player:
     graveyard: Tuple[Card, ...] = dataclass_field(default_factory=tuple)
     
     can_normal_summon: bool = True # Flag para limitar 1 invocación normal por Main Phase
+
+    _hash: int = dataclass_field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_hash', _player_hash(self))
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Player):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self.life_points == other.life_points and self.can_normal_summon == other.can_normal_summon
+            and self.name == other.name and self.hand == other.hand and self.field == other.field
+            and self.deck == other.deck and self.graveyard == other.graveyard
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
     
     def __repr__(self) -> str:
         # Nota: Usamos len(self.field) para simplificar la representación
@@ -43,39 +72,47 @@ class Player:
         new_deck = self.deck[1:]
         new_hand = self.hand.add_card(card_drawn)
         
-        # Usamos replace() para crear el nuevo objeto inmutable
-        return replace(self, deck=new_deck, hand=new_hand), card_drawn
+        return _new_player(self.name, self.life_points, new_hand, self.field, new_deck, self.graveyard,
+                           self.can_normal_summon), card_drawn
 
     def send_card_to_graveyard(self, card: Card) -> 'Player':
         """Retorna un nuevo Player con la carta añadida al Graveyard."""
         new_graveyard = self.graveyard + (card,)
-        return replace(self, graveyard=new_graveyard)
+        return _new_player(self.name, self.life_points, self.hand, self.field, self.deck, new_graveyard,
+                           self.can_normal_summon)
 
     def take_damage(self, damage: int) -> 'Player':
         """Retorna un nuevo Player con los Life Points reducidos."""
         new_lp = max(0, self.life_points - damage)
-        return replace(self, life_points=new_lp)
+        return _new_player(self.name, new_lp, self.hand, self.field, self.deck, self.graveyard,
+                           self.can_normal_summon)
         
     def gain_lp(self, lp: int) -> 'Player':
         """Retorna un nuevo Player con los Life Points incrementados."""
         new_lp = self.life_points + lp
-        return replace(self, life_points=new_lp)
+        return _new_player(self.name, new_lp, self.hand, self.field, self.deck, self.graveyard,
+                           self.can_normal_summon)
 
     def get_copy_with_field(self, new_field: Field) -> 'Player':
         """Retorna un nuevo Player con el campo (Field) actualizado."""
-        return replace(self, field=new_field)
+        return _new_player(self.name, self.life_points, self.hand, new_field, self.deck, self.graveyard,
+                           self.can_normal_summon)
 
     def get_copy_with_hand(self, new_hand: Hand) -> 'Player':
         """Retorna un nuevo Player con la mano (Hand) actualizada."""
-        return replace(self, hand=new_hand)
+        return _new_player(self.name, self.life_points, new_hand, self.field, self.deck, self.graveyard,
+                           self.can_normal_summon)
 
     def get_copy_with_summon_used(self, used: bool) -> 'Player':
         """Retorna un nuevo Player actualizando el flag de invocación."""
         # Se usa 'not used' para indicar si la próxima invocación *está disponible*
-        return replace(self, can_normal_summon=not used)
+        return _new_player(self.name, self.life_points, self.hand, self.field, self.deck, self.graveyard,
+                           not used)
+
     def get_copy_with_new_deck(self, new_deck: Tuple[Card, ...]) -> 'Player':
         """Retorna un nuevo Player con el deck actualizado."""
-        return replace(self, deck=new_deck)
+        return _new_player(self.name, self.life_points, self.hand, self.field, new_deck, self.graveyard,
+                           self.can_normal_summon)
 
     def draw_starting_hand(self) -> Tuple['Player', List[Card]]:
         """Roba las 5 primeras cartas para la mano inicial."""
@@ -92,4 +129,92 @@ class Player:
             new_hand = new_hand.add_card(card)
 
         # Retorna el estado del jugador después del robo y las cartas robadas
-        return replace(self, deck=new_deck, hand=new_hand), drawn_cards
\ No newline at end of file
+        return _new_player(self.name, self.life_points, new_hand, self.field, new_deck, self.graveyard,
+                           self.can_normal_summon), drawn_cards
+
+    def edit(self) -> 'PlayerBuilder':
+        """Abre una transacción sobre este jugador (ver PlayerBuilder)."""
+        return PlayerBuilder(self)
+
+
+def _player_hash(player: Player) -> int:
+    return hash((
+        player.name, player.life_points, player.hand._hash, player.field._hash,
+        len(player.deck), len(player.graveyard), player.can_normal_summon
+    ))
+
+
+def _same_player(a: Player, b: Player) -> bool:
+    """Igualdad estricta para el internado: mano y campo (ya internados) por identidad."""
+    return (
+        a.hand is b.hand and a.field is b.field and a.life_points == b.life_points
+        and a.can_normal_summon == b.can_normal_summon and a.name == b.name
+        and a.deck == b.deck and a.graveyard == b.graveyard
+    )
+
+
+_pool = get_pool('Player', _same_player)
+_new_player = fast_constructor(Player, derived={'_hash': _player_hash}, intern=_pool.intern)
+recompute_on_load(Player, {'_hash': _player_hash})
+
+
+class PlayerBuilder:
+    """
+    Transacción mutable sobre un Player: acumula varios cambios y build()
+    construye un único Player nuevo. Si al final ningún campo cambió, build()
+    devuelve el Player original.
+
+    Ofrece las mismas operaciones que Player (draw_card, send_card_to_graveyard,
+    take_damage, ...) pero modificando el builder; hand, field y el resto de
+    campos se pueden asignar directamente.
+    """
+
+    __slots__ = ('base', 'name', 'life_points', 'hand', 'field', 'deck', 'graveyard', 'can_normal_summon')
+
+    def __init__(self, player: Player):
+        self.base = player
+        self.name = player.name
+        self.life_points = player.life_points
+        self.hand = player.hand
+        self.field = player.field
+        self.deck = player.deck
+        self.graveyard = player.graveyard
+        self.can_normal_summon = player.can_normal_summon
+
+    def draw_card(self) -> Optional[Card]:
+        if not self.deck:
+            return None
+        card_drawn = self.deck[0]
+        self.deck = self.deck[1:]
+        self.hand = self.hand.add_card(card_drawn)
+        return card_drawn
+
+    def send_card_to_graveyard(self, card: Card):
+        self.graveyard = self.graveyard + (card,)
+
+    def take_damage(self, damage: int):
+        self.life_points = max(0, self.life_points - damage)
+
+    def gain_lp(self, lp: int):
+        self.life_points = self.life_points + lp
+
+    def set_summon_used(self, used: bool):
+        self.can_normal_summon = not used
+
+    def changed(self) -> bool:
+        """True si algún campo difiere del Player original (mano y campo, por valor)."""
+        base = self.base
+        return not (
+            self.life_points == base.life_points and self.can_normal_summon == base.can_normal_summon
+            and self.name == base.name and self.deck == base.deck and self.graveyard == base.graveyard
+            and self.hand == base.hand and self.field == base.field
+        )
+
+    def build(self) -> Player:
+        base = self.base
+        if (self.life_points == base.life_points and self.hand is base.hand and self.field is base.field
+                and self.deck is base.deck and self.graveyard is base.graveyard
+                and self.can_normal_summon == base.can_normal_summon and self.name is base.name):
+            return base
+        return _new_player(self.name, self.life_points, self.hand, self.field, self.deck, self.graveyard,
+                           self.can_normal_summon)
\ No newline at end of file
@@ -0,0 +1,318 @@
+'''
+Tablero mutable para la búsqueda: make/unmake con pila de deshacer.
+
+GameState.apply_move crea en cada nodo un GameState nuevo, dos Player y
+Hand/Field nuevos. SearchBoard guarda el mismo estado en listas de ids de carta
+(los del códec de model.game.packed) y lo modifica en el sitio: make(move)
+aplica la jugada anotando en la pila sólo lo que cambia y unmake() lo deshace.
+Se usa únicamente dentro de la búsqueda; fuera de ella se sigue trabajando con
+GameState (from_state / to_state convierten sin pérdida).
+
+Las reglas son las de GameState.apply_move, jugada a jugada: si la jugada no es
+válida el tablero no cambia (pero make() apila igualmente una entrada, para
+que cada make tenga su unmake). make() es silencioso.
+'''
+
+from typing import List
+
+from . import gamestate
+from .gamestate import GameState, INF
+from .move import ActionType, Move, Position
+from .packed import (
+    ATTACKED_FLAG, BATTLE, DEF_FLAG, DRAW, EMPTY, END, MAIN, MONSTER_SLOTS, PHASES, TURNS,
+    PackedCodec, get_codec
+)
+from model.fusions.fusion_table import NO_FUSION
+from .battle_table import ATTACKER_DAMAGE, ATTACKER_DESTROYED, DEFENDER_DAMAGE, DEFENDER_DESTROYED
+
+# Tipos de cambio en la pila de deshacer
+_SLOT, _HAND, _GRAVEYARD = range(3)
+
+
+class _InvalidMove(Exception):
+    """Interna: la jugada no es válida y hay que deshacer lo ya cambiado."""
+
+
+class SearchBoard:
+    """
+    Estado de juego mutable con make/unmake.
+
+    Cada make() apila en `_undo` los cambios de slots, mano y cementerio como
+    tuplas (tipo, jugador, ...) y en `_frames` los escalares anteriores (turno,
+    fase, LP, invocación y poder de ambos jugadores) junto con el número de
+    cambios. unmake() restaura en orden inverso.
+    """
+
+    __slots__ = ('codec', 'turn', 'phase', 'players', '_undo', '_frames', '_changes')
+
+    def __init__(self, codec: PackedCodec, turn: int, phase: int, players: list):
+        self.codec = codec
+        self.turn = turn
+        self.phase = phase
+        self.players = players
+        self._undo: List[tuple] = []
+        self._frames: List[tuple] = []
+        self._changes = 0
+
+    @classmethod
+    def from_state(cls, state: GameState) -> 'SearchBoard':
+        codec = get_codec(state.all_cards, state.all_recipes)
+        turn, phase, players = codec._unpack(codec.pack(state))
+        return cls(codec, turn, phase, players)
+
+    def to_state(self) -> GameState:
+        return self.codec.build_state(self.turn, self.phase, self.players)
+
+    def __repr__(self) -> str:
+        player, ai = self.players
+        return (
+            f"SearchBoard(Turn: {TURNS[self.turn].upper()}, Phase: {PHASES[self.phase].upper()}, "
+            f"Player LP: {player.lp}, AI LP: {ai.lp}, Depth: {self.depth})"
+        )
+
+    @property
+    def depth(self) -> int:
+        """Número de make() pendientes de deshacer."""
+        return len(self._frames)
+
+    # ------------------------------------------------------------------
+    # --- Consultas ---
+    # ------------------------------------------------------------------
+
+    def is_game_over(self) -> bool:
+        return self.players[0].lp <= 0 or self.players[1].lp <= 0
+
+    def evaluate(self) -> float:
+        """Misma heurística que GameState.evaluate()."""
+        player, ai = self.players
+        if ai.lp <= 0:
+            return -INF
+        if player.lp <= 0:
+            return INF
+        lp_advantage = ai.lp - player.lp
+        field_advantage = (ai.power - player.power) * gamestate.BOARD_POWER_WEIGHT
+        hand_advantage = (len(ai.hand) - len(player.hand)) * gamestate.HAND_WEIGHT
+        return (lp_advantage * gamestate.LP_WEIGHT) + field_advantage + hand_advantage
+
+    def moves(self, distinct: bool = False) -> List[Move]:
+        """Las mismas jugadas, en el mismo orden, que GameState.get_possible_moves(distinct)."""
+        if self.is_game_over():
+            return []
+        return self.codec.generate_moves(self.phase, self.players[self.turn], self.players[1 - self.turn], distinct)
+
+    def distinct_moves(self) -> List[Move]:
+        """moves(distinct=True): la mano como multiconjunto, para la búsqueda."""
+        return self.moves(True)
+
+    # ------------------------------------------------------------------
+    # --- Cambios con registro ---
+    # ------------------------------------------------------------------
+
+    def _set_slot(self, who: int, index: int, card_id: int, flags: int):
+        player = self.players[who]
+        self._undo.append((_SLOT, who, index, player.slots[index], player.flags[index]))
+        self._changes += 1
+        player.slots[index] = card_id
+        player.flags[index] = flags
+
+    def _pop_hand(self, who: int, index: int) -> int:
+        card_id = self.players[who].hand.pop(index)
+        self._undo.append((_HAND, who, index, card_id))
+        self._changes += 1
+        return card_id
+
+    def _to_graveyard(self, who: int, card_id: int):
+        self.players[who].graveyard.append(card_id)
+        self._undo.append((_GRAVEYARD, who))
+        self._changes += 1
+
+    def _slot_power(self, card_id: int, flags: int) -> int:
+        return self.codec.defense[card_id] if flags & DEF_FLAG else self.codec.attack[card_id]
+
+    def _remove_monster(self, who: int, index: int):
+        """Como Field.remove_monster + send_card_to_graveyard."""
+        player = self.players[who]
+        if not 0 <= index < MONSTER_SLOTS or player.slots[index] == EMPTY:
+            raise _InvalidMove()
+        card_id, flags = player.slots[index], player.flags[index]
+        player.power -= self._slot_power(card_id, flags)
+        self._set_slot(who, index, EMPTY, 0)
+        self._to_graveyard(who, card_id)
+
+    def _place_monster(self, who: int, index: int, card_id: int, flags: int):
+        """Como Field.place_monster."""
+        player = self.players[who]
+        if not 0 <= index < MONSTER_SLOTS or player.slots[index] != EMPTY:
+            raise _InvalidMove()
+        player.power += self._slot_power(card_id, flags)
+        self._set_slot(who, index, card_id, flags)
+
+    # ------------------------------------------------------------------
+    # --- make / unmake ---
+    # ------------------------------------------------------------------
+
+    def make(self, move: Move) -> 'SearchBoard':
+        """Aplica `move` en el sitio (reglas de GameState.apply_move) y devuelve el tablero."""
+        player, ai = self.players
+        frame = (self.turn, self.phase, player.lp, ai.lp, player.can_summon, ai.can_summon,
+                 player.power, ai.power)
+        self._changes = 0
+        try:
+            self._make(move)
+        except _InvalidMove:
+            # Como apply_move al devolver self: nada cambia
+            self._rollback(self._changes)
+            self._restore(frame)
+            self._changes = 0
+        self._frames.append(frame + (self._changes,))
+        return self
+
+    def unmake(self):
+        """Deshace el último make()."""
+        frame = self._frames.pop()
+        self._rollback(frame[8])
+        self._restore(frame)
+
+    def unmake_all(self):
+        """Deshace todos los make() pendientes (p. ej. tras abortar una búsqueda)."""
+        while self._frames:
+            self.unmake()
+
+    def _restore(self, frame: tuple):
+        player, ai = self.players
+        (self.turn, self.phase, player.lp, ai.lp, player.can_summon, ai.can_summon,
+         player.power, ai.power) = frame[:8]
+
+    def _rollback(self, count: int):
+        undo = self._undo
+        players = self.players
+        for _ in range(count):
+            change = undo.pop()
+            kind = change[0]
+            if kind == _SLOT:
+                _, who, index, card_id, flags = change
+                players[who].slots[index] = card_id
+                players[who].flags[index] = flags
+            elif kind == _HAND:
+                _, who, index, card_id = change
+                players[who].hand.insert(index, card_id)
+            else:
+                players[change[1]].graveyard.pop()
+
+    def _make(self, move: Move):
+        turn, phase = self.turn, self.phase
+        acting_who, opponent_who = turn, 1 - turn
+        acting, opponent = self.players[acting_who], self.players[opponent_who]
+        codec = self.codec
+        action = move.action_type
+
+        if action == ActionType.PASS:
+            zone = move.target_zone
+            if zone == 'main':
+                self.phase = MAIN
+                acting.can_summon = 1
+            elif zone == 'battle':
+                self.phase = BATTLE
+                for index in range(MONSTER_SLOTS):
+                    if acting.flags[index] & ATTACKED_FLAG:
+                        self._set_slot(acting_who, index, acting.slots[index], acting.flags[index] & ~ATTACKED_FLAG)
+            elif zone == 'end':
+                self.phase = END
+            elif zone == 'change_turn':
+                # Como en apply_move, sólo cambian turno y fase: el robo lo hacen los controladores
+                self.turn = 1 - turn
+                self.phase = DRAW
+
+        elif phase == MAIN:
+            if action in (ActionType.SUMMON, ActionType.SET):
+                source, target = move.source_index, move.target_index
+                if target is None or source is None or not acting.can_summon:
+                    raise _InvalidMove()
+                if not 0 <= source < len(acting.hand):
+                    raise _InvalidMove()
+                card_id = acting.hand[source]
+
+                stars = codec.stars[card_id]
+                tributes_needed = 2 if stars >= 6 else 1 if stars >= 5 else 0
+                if tributes_needed > 0:
+                    tributes = move.fusion_materials_indices
+                    if not tributes or len(tributes) != tributes_needed:
+                        raise _InvalidMove()
+                    for tribute in sorted(tributes, reverse=True):
+                        self._remove_monster(acting_who, tribute)
+
+                self._pop_hand(acting_who, source)
+                self._place_monster(acting_who, target, card_id, DEF_FLAG if move.position == Position.FACE_UP_DEF else 0)
+                acting.can_summon = 0
+
+            elif action == ActionType.FUSION_SUMMON:
+                materials, target = move.fusion_materials_indices, move.target_index
+                if not materials or target is None or len(materials) != 2:
+                    raise _InvalidMove()
+                idx1, idx2 = materials
+                hand = acting.hand
+                if not (0 <= idx1 < len(hand) and 0 <= idx2 < len(hand)):
+                    raise _InvalidMove()
+                result = codec.fusions[hand[idx1]][hand[idx2]]
+                if result == NO_FUSION:
+                    raise _InvalidMove()
+
+                # El índice mayor primero; con índices repetidos se retira la siguiente carta, como en Hand
+                material1 = self._pop_hand(acting_who, max(idx1, idx2))
+                remove_idx2 = min(idx1, idx2)
+                if remove_idx2 >= len(hand):
+                    raise _InvalidMove()
+                material2 = self._pop_hand(acting_who, remove_idx2)
+                self._to_graveyard(acting_who, material1)
+                self._to_graveyard(acting_who, material2)
+
+                self._place_monster(acting_who, target, result, 0)
+                acting.can_summon = 0
+
+            elif action == ActionType.CHANGE_POSITION:
+                source = move.source_index
+                if source is None or move.position is None:
+                    raise _InvalidMove()
+                if not 0 <= source < MONSTER_SLOTS or acting.slots[source] == EMPTY:
+                    raise _InvalidMove()
+                card_id, flags = acting.slots[source], acting.flags[source]
+                new_flags = flags | DEF_FLAG if move.position == Position.FACE_UP_DEF else flags & ~DEF_FLAG
+                acting.power += self._slot_power(card_id, new_flags) - self._slot_power(card_id, flags)
+                self._set_slot(acting_who, source, card_id, new_flags)
+
+        elif phase == BATTLE and action == ActionType.ATTACK:
+            source, target = move.source_index, move.target_index
+            if source is None:
+                raise _InvalidMove()
+            # Índices negativos válidos en Python, como monsters[source] en apply_move
+            if not -MONSTER_SLOTS <= source < MONSTER_SLOTS:
+                raise _InvalidMove()
+            attacker = acting.slots[source]
+            if attacker == EMPTY or acting.flags[source] & DEF_FLAG:
+                raise _InvalidMove()
+
+            if target == -1:
+                opponent.lp = max(0, opponent.lp - codec.attack[attacker])
+            elif target is not None:
+                if target < 0 or target >= MONSTER_SLOTS:
+                    raise _InvalidMove()
+                defender = opponent.slots[target]
+                if defender == EMPTY:
+                    raise _InvalidMove()
+                outcome = codec.battle[attacker][defender][1 if opponent.flags[target] & DEF_FLAG else 0]
+
+                if outcome[DEFENDER_DAMAGE]:
+                    opponent.lp = max(0, opponent.lp - outcome[DEFENDER_DAMAGE])
+                if outcome[DEFENDER_DESTROYED]:
+                    self._remove_monster(opponent_who, target)
+                if outcome[ATTACKER_DAMAGE]:
+                    acting.lp = max(0, acting.lp - outcome[ATTACKER_DAMAGE])
+                if outcome[ATTACKER_DESTROYED]:
+                    self._remove_monster(acting_who, source)
+
+        # Igual que apply_move: el monstruo del slot de origen queda marcado como atacado
+        source = move.source_index
+        if source is not None and 0 <= source < MONSTER_SLOTS and acting.slots[source] != EMPTY:
+            flags = acting.flags[source]
+            if not flags & ATTACKED_FLAG:
+                self._set_slot(acting_who, source, acting.slots[source], flags | ATTACKED_FLAG)
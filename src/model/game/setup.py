@@ -0,0 +1,62 @@
+'''
+Creación de partidas sin interfaz gráfica.
+
+Reúne la carga del catálogo (cartas y recetas) y el reparto inicial para las
+herramientas que necesitan un GameState reproducible sin pygame (p. ej. perft).
+'''
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from model.cards.card import Card
+from model.cards.card_loader import load_cards
+from model.cards.deck import random_deck
+from model.fusions.fusion_recipe import FusionRecipe
+from model.fusions.recipe_loader import load_recipes
+from .gamestate import GameState
+from .player import Player
+
+# Ruta base: proyecto raíz (YU-GI-OH/)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+CARDS_FILE = os.path.join(DATA_DIR, 'cards.json')
+RECIPES_FILE = os.path.join(DATA_DIR, 'recipies.json')
+
+DEFAULT_DECK_SIZE = 40
+
+
+def load_catalog(cards_file: str = CARDS_FILE, recipes_file: str = RECIPES_FILE) -> Tuple[Dict[str, Card], List[FusionRecipe]]:
+    """Carga las cartas y recetas del juego."""
+    all_cards = load_cards(cards_file)
+    if not all_cards:
+        raise ValueError(f"No se pudieron cargar las cartas desde {cards_file}.")
+    return all_cards, load_recipes(recipes_file)
+
+
+def new_game(
+    all_cards: Dict[str, Card],
+    all_recipes: List[FusionRecipe],
+    deck_size: int = DEFAULT_DECK_SIZE,
+    seed: Optional[int] = None,
+    first_turn: str = 'player'
+) -> GameState:
+    """
+    Crea una partida nueva: mazos aleatorios (reproducibles con `seed`),
+    mano inicial de 5 cartas para ambos jugadores y Draw Phase del primer turno.
+    """
+    player_seed = seed
+    ai_seed = seed + 1 if seed is not None else None
+
+    player = Player(name="Player 1", deck=tuple(random_deck(all_cards, deck_size, seed=player_seed)))
+    ai_player = Player(name="AI Opponent", deck=tuple(random_deck(all_cards, deck_size, seed=ai_seed)))
+    player, _ = player.draw_starting_hand()
+    ai_player, _ = ai_player.draw_starting_hand()
+
+    return GameState(
+        player=player,
+        ai_player=ai_player,
+        all_cards=all_cards,
+        all_recipes=all_recipes,
+        current_turn=first_turn,
+        phase='draw'
+    )
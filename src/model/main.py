@@ -21,6 +21,7 @@ from model.game.move import Move, ActionType
 
 # Lógica de la IA
 from model.ai.ai_controller import AIController # Se asume que este archivo existe.
+from model.ai.learned_eval import load_learned_evaluator
 
 # CONTROLADOR: Iniciaremos el juego a través del controlador de Pygame
 from controller.game_controller import GameController
@@ -31,6 +32,14 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 CARDS_FILE = os.path.join(BASE_DIR, 'data', 'cards.json')
 RECIPES_FILE = os.path.join(BASE_DIR, 'data', 'recipies.json')
 
+# --- Configuración de la IA (por despliegue) ---
+# Perfil de dificultad: 'easy', 'normal', 'hard' o 'expert'
+AI_DIFFICULTY = os.environ.get('YUGIOH_AI_DIFFICULTY', 'normal')
+# Techo duro (segundos) del turno completo de la IA; vacío = el del perfil
+AI_TURN_CEILING = os.environ.get('YUGIOH_AI_TURN_CEILING')
+# Evaluación de la IA: 'heuristic' (GameState.evaluate) o 'learned' (data/learned_eval.npz)
+AI_EVALUATOR = os.environ.get('YUGIOH_AI_EVAL', 'heuristic')
+
 # --- Funciones de Inicialización ---
 
 def initialize_game_data() -> Tuple[Dict[str, Card], List[FusionRecipe]]:
@@ -95,7 +104,11 @@ def main():
     )
 
     # 4. Inicializar el controlador de la IA
-    ai_controller = AIController(depth=3) 
+    ai_controller = AIController(
+        profile=AI_DIFFICULTY,
+        turn_time_ceiling=float(AI_TURN_CEILING) if AI_TURN_CEILING else None,
+        evaluator=load_learned_evaluator(all_cards, all_recipes) if AI_EVALUATOR == 'learned' else None
+    )
     
     # 5. Inicializar y lanzar el CONTROLADOR de Pygame
     print("\n\n######################################")